@@ -11,10 +11,19 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 import time
+import sys
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+# The session vault is shared with the SELENIUM service next to this folder
+sys.path.append(os.path.join(os.path.dirname(script_dir), "SELENIUM"))
+from session_vault import SessionVault, ensure_logged_in
 
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "http://localhost:5123"}}, supports_credentials=True)
 
+# Each service keeps its own vault file next to it
+session_vault = SessionVault(os.getenv("SESSION_VAULT_PATH", os.path.join(script_dir, "session.vault")))
+
 @app.route('/', methods=['GET'])
 def home():
     print('service is running')
@@ -92,17 +101,13 @@ def execute_selenium_script():
 
         try:
             url = "https://sfg.salestrekker.com/authenticate"
-            print(f"Navigating to {url}")
-            driver.get(url)
-
-            WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.TAG_NAME, "a")))
-            print("Login page is loaded. Pausing for user to input credentials...")
-            time.sleep(30)
+            board_url = "https://sfg.salestrekker.com/board/6e1f0fea-42df-4592-85b8-59fd49f78468"
+            print(f"Navigating to {board_url}")
 
-            WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.TAG_NAME, "img")))
+            # Reuse the stored session; only wait for a manual login when it has expired
+            ensure_logged_in(driver, url, board_url, session_vault)
             print("Login successful. Continuing automation...")
 
-            driver.get("https://sfg.salestrekker.com/board/6e1f0fea-42df-4592-85b8-59fd49f78468")
             WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.TAG_NAME, "header-actions")))
             print("Board page loaded. Ready to add new applications.")
 
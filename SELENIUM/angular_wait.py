@@ -0,0 +1,117 @@
+import os
+import time
+import logging
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+
+# How long the DOM must stay unchanged before the page counts as settled
+ANGULAR_QUIET_MS = int(os.getenv("ANGULAR_QUIET_MS", "300"))
+# Upper bound for a single wait; navigation steps never block longer than this
+ANGULAR_IDLE_TIMEOUT = float(os.getenv("ANGULAR_IDLE_TIMEOUT", "20"))
+# Upper bound for element waits on navigation steps (replaces the old 10000 s waits)
+NAVIGATION_TIMEOUT = float(os.getenv("NAVIGATION_TIMEOUT", "60"))
+# Sections that take longer than this to become ready are logged as slow
+SLOW_LOAD_SECONDS = float(os.getenv("SLOW_LOAD_SECONDS", "5"))
+
+# Resolves once AngularJS has no pending $http requests, is not inside a digest,
+# and the DOM has not mutated for quietMs; resolves early with idle=false on timeout
+ANGULAR_IDLE_SCRIPT = """
+var quietMs = arguments[0], timeoutMs = arguments[1];
+var done = arguments[arguments.length - 1];
+var start = Date.now(), lastActivity = Date.now(), mutations = 0;
+
+var observer = new MutationObserver(function (records) {
+    mutations += records.length;
+    lastActivity = Date.now();
+});
+observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+
+function angularBusy() {
+    if (!window.angular) { return false; }
+    var roots = [document.querySelector('[ng-app],[data-ng-app]'), document.querySelector('.ng-scope'), document.body];
+    for (var i = 0; i < roots.length; i++) {
+        if (!roots[i]) { continue; }
+        try {
+            var injector = angular.element(roots[i]).injector();
+            if (!injector) { continue; }
+            var http = injector.get('$http'), rootScope = injector.get('$rootScope');
+            return http.pendingRequests.length > 0 || !!rootScope.$$phase;
+        } catch (e) {}
+    }
+    return false;
+}
+
+(function poll() {
+    var now = Date.now();
+    if (document.readyState !== 'complete' || angularBusy()) { lastActivity = now; }
+    var idle = now - lastActivity >= quietMs;
+    if (idle || now - start >= timeoutMs) {
+        observer.disconnect();
+        done({idle: idle, waitedMs: now - start, mutations: mutations});
+        return;
+    }
+    setTimeout(poll, 50);
+})();
+"""
+
+
+def wait_for_angular(driver, quiet_ms=ANGULAR_QUIET_MS, timeout=ANGULAR_IDLE_TIMEOUT, label="page"):
+    """Block until the AngularJS app is idle, or until timeout seconds have passed.
+
+    Returns True when the page settled and False when the upper bound was hit.
+    """
+    driver.set_script_timeout(timeout + 5)
+    try:
+        result = driver.execute_async_script(ANGULAR_IDLE_SCRIPT, quiet_ms, int(timeout * 1000))
+    except Exception as e:
+        logging.warning(f"Angular idle check failed for {label}: {e}")
+        return False
+
+    if result and result.get("idle"):
+        logging.info(f"{label} settled in {result['waitedMs']} ms")
+        return True
+    logging.warning(f"{label} still busy after {timeout:.0f}s, continuing")
+    return False
+
+
+def wait_until(driver, condition, timeout=NAVIGATION_TIMEOUT, label="element", settle=True):
+    """Wait for an expected condition with a bounded timeout, then for Angular to go idle"""
+    started = time.time()
+    try:
+        result = WebDriverWait(driver, timeout).until(condition)
+    except TimeoutException:
+        logging.error(f"Timed out after {timeout:.0f}s waiting for {label}")
+        raise
+    if settle:
+        wait_for_angular(driver, timeout=max(1, min(ANGULAR_IDLE_TIMEOUT, timeout - (time.time() - started))), label=label)
+    return result
+
+
+def wait_ready(driver, condition, timeout=NAVIGATION_TIMEOUT, label="section", required=True, timings=None):
+    """Wait for a readiness condition and for Angular to go idle, logging the load time.
+
+    Returns True when ready. On timeout a required section raises TimeoutException;
+    any other is logged and False returned. timings, if given, collects {label: seconds}.
+    """
+    started = time.time()
+    try:
+        WebDriverWait(driver, timeout).until(condition)
+        ready = True
+    except TimeoutException:
+        if required:
+            logging.error(f"Timed out after {timeout:.0f}s waiting for {label}")
+            raise
+        ready = False
+    if ready:
+        wait_for_angular(driver, timeout=max(1, min(ANGULAR_IDLE_TIMEOUT, timeout - (time.time() - started))), label=label)
+
+    elapsed = time.time() - started
+    if timings is not None:
+        timings[label] = elapsed
+    if not ready:
+        logging.warning(f"{label} not ready after {elapsed:.1f}s, continuing")
+    elif elapsed >= SLOW_LOAD_SECONDS:
+        logging.warning(f"{label} slow to load: ready in {elapsed:.1f}s")
+    else:
+        logging.info(f"{label} ready in {elapsed:.1f}s")
+    return ready
@@ -0,0 +1,191 @@
+import os
+import re
+import zipfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from upload_ledger import sha256_file
+
+classified_documents = {
+    "bank_statement": [
+        "bank", "statement", "transaction", "account", "banking",
+        "deposit", "withdrawal", "balance", "credit", "debit",
+        "interest", "overdraft", "transfer", "statement period",
+        "monthly statement", "checking", "savings", "financial summary",
+        "ledger", "IBAN", "SWIFT", "sort code"
+    ],
+    "drivers_license": ["license", "driver", "driving", "licence", "id"],
+    "passport_id": ["passport"],
+    "national_id": ["national", "id", "identification", "citizen", "citizenship", "residency"],
+    "utility_bill": ["bill", "utility", "electric", "water", "gas", "electricity", "utilities"],
+    "application_form": ["application", "form", "forms"],
+    "payslip": ["payslip", "salary", "wage", "payment", "payroll", "pay"],
+    "insurance": ["insurance", "policy", "coverage", "premium"]
+}
+
+# Keywords that say more (or less) than an ordinary match; everything else weighs 1.0,
+# and multi-word phrases weigh 2.0
+KEYWORD_WEIGHTS = {
+    "passport": 3.0, "payslip": 3.0, "payroll": 2.0, "licence": 2.0, "license": 2.0,
+    "statement": 2.0, "insurance": 2.0, "utilities": 2.0, "citizenship": 2.0,
+    "id": 0.5, "pay": 0.5, "form": 0.5, "account": 0.5, "credit": 0.5, "debit": 0.5,
+}
+
+# A file name scoring below this (or tied between two types) is looked at more closely
+CONFIDENT_SCORE = float(os.getenv("CLASSIFIER_CONFIDENT_SCORE", "2.0"))
+CONTENT_SAMPLE_CHARS = 5000
+UNKNOWN_DOCUMENT = "unknown_document"
+
+
+def normalize(text):
+    """Lowercase and turn everything but letters and digits into single spaces, padded"""
+    return " " + " ".join(re.sub(r"[^a-z0-9]+", " ", text.lower()).split()) + " "
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over every keyword of every document type.
+
+    One pass over the text finds all keyword occurrences; a match only counts
+    when it starts at a word boundary, so "id" matches "id card" and
+    "identification" but not "provided".
+    """
+    def __init__(self, keywords_by_type, weights=None):
+        weights = weights or {}
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+        for doc_type, keywords in keywords_by_type.items():
+            for keyword in keywords:
+                phrase = normalize(keyword).strip()
+                weight = weights.get(phrase, 2.0 if " " in phrase else 1.0)
+                self._add(phrase, (doc_type, len(phrase), weight))
+        self._build()
+
+    def _add(self, phrase, output):
+        state = 0
+        for ch in phrase:
+            if ch not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[state][ch] = len(self._goto) - 1
+            state = self._goto[state][ch]
+        self._out[state].append(output)
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def scores(self, text):
+        """{doc_type: weighted score} for already normalized text"""
+        scores = {}
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for doc_type, length, weight in self._out[state]:
+                start = i - length + 1
+                if start > 0 and text[start - 1] == " ":
+                    scores[doc_type] = scores.get(doc_type, 0.0) + weight
+        return scores
+
+
+def extract_first_page_text(file_path):
+    """Text of the first page of a PDF or the start of a DOCX; '' when unavailable"""
+    extension = os.path.splitext(file_path)[1].lower()
+    try:
+        if extension == ".pdf":
+            # Imported here so the file selector still opens without loading pypdf
+            try:
+                from pypdf import PdfReader
+            except ImportError:  # Without pypdf, PDFs are classified by file name only
+                return ""
+            reader = PdfReader(file_path)
+            return (reader.pages[0].extract_text() or "")[:CONTENT_SAMPLE_CHARS] if reader.pages else ""
+        if extension == ".docx":
+            with zipfile.ZipFile(file_path) as docx:
+                xml = docx.read("word/document.xml").decode("utf-8", errors="ignore")
+            return re.sub(r"<[^>]+>", " ", xml)[:CONTENT_SAMPLE_CHARS * 4]
+    except Exception as e:
+        print(f"Could not read text from {file_path}: {str(e)}")
+    return ""
+
+
+class DocumentClassifier:
+    """Classifies documents by file name, falling back to their first page of text"""
+    def __init__(self, keywords_by_type=classified_documents, weights=KEYWORD_WEIGHTS):
+        self.doc_types = list(keywords_by_type)
+        self.matcher = KeywordMatcher(keywords_by_type, weights)
+        self._content_scores = {}  # sha256 -> scores of the document text
+        self._lock = threading.Lock()
+
+    def _best(self, scores):
+        """(doc_type, score, confident) — ties go to the type listed first"""
+        if not scores:
+            return UNKNOWN_DOCUMENT, 0.0, False
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], self.doc_types.index(item[0])))
+        doc_type, score = ranked[0]
+        tied = len(ranked) > 1 and ranked[1][1] == score
+        return doc_type, score, score >= CONFIDENT_SCORE and not tied
+
+    def classify_name(self, file_name):
+        return self._best(self.matcher.scores(normalize(file_name)))[0]
+
+    def content_scores(self, file_path, sha256=None):
+        """Keyword scores of the document text, cached by content hash"""
+        sha256 = sha256 or sha256_file(file_path)
+        with self._lock:
+            if sha256 in self._content_scores:
+                return self._content_scores[sha256]
+        scores = self.matcher.scores(normalize(extract_first_page_text(file_path)))
+        with self._lock:
+            self._content_scores[sha256] = scores
+        return scores
+
+    def classify(self, file_path, sha256=None):
+        """Document type of a file on disk; pass its sha256 when it is already known"""
+        file_name = os.path.basename(file_path)
+        name_scores = self.matcher.scores(normalize(file_name))
+        doc_type, _, confident = self._best(name_scores)
+
+        if not confident and os.path.isfile(file_path):
+            combined = dict(name_scores)
+            for content_type, score in self.content_scores(file_path, sha256).items():
+                combined[content_type] = combined.get(content_type, 0.0) + score
+            doc_type = self._best(combined)[0]
+
+        if doc_type == UNKNOWN_DOCUMENT:
+            print(f"Could not classify {file_name}, marking as unknown_document")
+        else:
+            print(f"Classified {file_name} as {doc_type}")
+        return doc_type
+
+    def classify_files(self, file_paths, workers=4, hashes=None):
+        """{file_path: doc_type} for a batch of files, read in parallel.
+
+        hashes maps file paths to their sha256 so files hashed already are not read twice.
+        """
+        file_paths = list(file_paths)
+        hashes = hashes or {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return dict(zip(file_paths, executor.map(lambda path: self.classify(path, hashes.get(path)), file_paths)))
+
+    def classify_folder(self, folder_path, workers=4):
+        """{file_name: doc_type} for every document in a folder"""
+        paths = [
+            os.path.join(folder_path, name) for name in sorted(os.listdir(folder_path))
+            if not name.startswith(".") and os.path.isfile(os.path.join(folder_path, name))
+        ]
+        return {os.path.basename(path): doc_type for path, doc_type in self.classify_files(paths, workers).items()}
@@ -0,0 +1,192 @@
+import os
+import re
+import time
+import base64
+import hashlib
+import logging
+import threading
+import mimetypes
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse, unquote
+import requests
+from requests.adapters import HTTPAdapter
+
+DOWNLOAD_WORKERS = int(os.getenv("DOWNLOAD_WORKERS", "8"))
+DOWNLOAD_RETRIES = int(os.getenv("DOWNLOAD_RETRIES", "3"))
+DOWNLOAD_TIMEOUT = int(os.getenv("DOWNLOAD_TIMEOUT", "120"))
+CHUNK_SIZE = 256 * 1024
+# Content types that say nothing about the file, so they never count as a mismatch
+GENERIC_CONTENT_TYPES = ("application/octet-stream", "binary/octet-stream", "application/download", "application/force-download")
+
+
+class DownloadRejected(Exception):
+    """The server answered with something other than the file (a login page, an error page).
+
+    Retrying over HTTP will not help; the attachment is left to the browser instead.
+    """
+
+
+def session_from_driver(driver, pool_size=DOWNLOAD_WORKERS):
+    """requests.Session carrying the browser's cookies and user agent"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = driver.execute_script("return navigator.userAgent;")
+    for cookie in driver.get_cookies():
+        session.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain"), path=cookie.get("path", "/"))
+    return session
+
+
+def filename_for(response, attachment):
+    """Pick the file name from Content-Disposition, the attachment name or the URL"""
+    disposition = response.headers.get("Content-Disposition", "")
+    match = re.search(r"filename\*=(?:UTF-8'')?([^;]+)", disposition) or re.search(r'filename="?([^";]+)"?', disposition)
+    if match:
+        name = unquote(match.group(1).strip())
+    else:
+        name = attachment.get("name") or os.path.basename(urlparse(response.url).path) or "document"
+    # Strip anything that is not valid in a Windows file name
+    return re.sub(r'[<>:"/\\|?*\x00-\x1f]', "_", name).strip() or "document"
+
+
+def origin_of(url):
+    parts = urlparse(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def check_response(response, attachment, login_url=None):
+    """Raise DownloadRejected unless the response looks like the attachment itself"""
+    if login_url and response.history:
+        final = urlparse(response.url)
+        # Signed out: the file URL bounced to the login screen instead of serving the file
+        if "/authenticate" in final.path or (
+            origin_of(response.url) == origin_of(login_url) != origin_of(attachment["url"])
+        ):
+            raise DownloadRejected(f"Redirected to the login page ({response.url})")
+
+    content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+    if content_type == "text/html":
+        raise DownloadRejected("Server returned an HTML page instead of the document")
+    expected = mimetypes.guess_type(attachment.get("name") or urlparse(attachment["url"]).path)[0]
+    if content_type and expected and content_type not in GENERIC_CONTENT_TYPES and content_type != expected:
+        raise DownloadRejected(f"Expected {expected} but the server sent {content_type}")
+
+
+def expected_md5(response):
+    """MD5 advertised by the server, if any (Content-MD5 or a plain S3-style ETag)"""
+    content_md5 = response.headers.get("Content-MD5")
+    if content_md5:
+        try:
+            return base64.b64decode(content_md5).hex()
+        except Exception:
+            return None
+    etag = response.headers.get("ETag", "").strip('"')
+    if re.fullmatch(r"[0-9a-fA-F]{32}", etag):
+        return etag.lower()
+    return None
+
+
+class DocumentDownloader:
+    """Fetches timeline attachments over HTTP, several at a time, straight into a folder"""
+    def __init__(self, session, dest_dir, workers=DOWNLOAD_WORKERS, retries=DOWNLOAD_RETRIES, timeout=DOWNLOAD_TIMEOUT, login_url=None):
+        self.session = session
+        self.login_url = login_url
+        self.dest_dir = dest_dir
+        self.workers = workers
+        self.retries = retries
+        self.timeout = timeout
+        self._names_lock = threading.Lock()
+        self._reserved = set()
+
+    def _reserve_path(self, name):
+        """Return a path that no other download is using ('name (1).pdf' like Chrome does)"""
+        stem, ext = os.path.splitext(name)
+        with self._names_lock:
+            candidate, n = name, 1
+            while candidate in self._reserved or os.path.exists(os.path.join(self.dest_dir, candidate)):
+                candidate = f"{stem} ({n}){ext}"
+                n += 1
+            self._reserved.add(candidate)
+        return os.path.join(self.dest_dir, candidate)
+
+    def _fetch(self, attachment):
+        """Stream one attachment to disk and verify its size and checksum"""
+        with self.session.get(attachment["url"], stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            check_response(response, attachment, self.login_url)
+            path = self._reserve_path(filename_for(response, attachment))
+            part_path = f"{path}.partial"
+            sha256 = hashlib.sha256()
+            md5 = hashlib.md5()
+            size = 0
+            try:
+                with open(part_path, "wb") as f:
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        f.write(chunk)
+                        sha256.update(chunk)
+                        md5.update(chunk)
+                        size += len(chunk)
+
+                content_length = response.headers.get("Content-Length")
+                if content_length and "Content-Encoding" not in response.headers and int(content_length) != size:
+                    raise IOError(f"Size mismatch: expected {content_length} bytes, got {size}")
+                advertised = expected_md5(response)
+                if advertised and advertised != md5.hexdigest():
+                    raise IOError("Checksum mismatch")
+
+                os.replace(part_path, path)
+            except Exception:
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+                with self._names_lock:
+                    self._reserved.discard(os.path.basename(path))
+                raise
+
+        return {"url": attachment["url"], "path": path, "bytes": size, "sha256": sha256.hexdigest()}
+
+    def _fetch_with_retry(self, attachment):
+        for attempt in range(1, self.retries + 1):
+            try:
+                return self._fetch(attachment)
+            except DownloadRejected as e:
+                logging.warning(f"Download rejected, leaving it to the browser: {attachment['url']}: {e}")
+                return {"url": attachment["url"], "error": str(e), "rejected": True}
+            except Exception as e:
+                if attempt == self.retries:
+                    logging.error(f"Download failed after {attempt} attempts: {attachment['url']}: {e}")
+                    return {"url": attachment["url"], "error": str(e)}
+                backoff = 2 ** (attempt - 1)
+                logging.warning(f"Download attempt {attempt} failed ({e}), retrying in {backoff}s")
+                time.sleep(backoff)
+
+    def download_all(self, attachments, checkpoint=None):
+        """Download every attachment concurrently; returns one result dict per attachment.
+
+        With a checkpoint, attachments downloaded by an earlier run are skipped and
+        each new one is recorded as soon as it is on disk.
+        """
+        os.makedirs(self.dest_dir, exist_ok=True)
+        if checkpoint:
+            skipped = len(attachments)
+            attachments = checkpoint.pending(attachments)
+            skipped -= len(attachments)
+            if skipped:
+                logging.info(f"Skipping {skipped} documents downloaded by a previous run")
+        started = time.time()
+        results = []
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self._fetch_with_retry, a): a for a in attachments}
+            for future in as_completed(futures):
+                result = future.result()
+                if checkpoint and "error" not in result:
+                    checkpoint.record(futures[future], path=result["path"], sha256=result["sha256"])
+                results.append(result)
+
+        ok = [r for r in results if "error" not in r]
+        total_bytes = sum(r["bytes"] for r in ok)
+        logging.info(
+            f"Downloaded {len(ok)}/{len(attachments)} documents "
+            f"({total_bytes / 1048576:.1f} MB) in {time.time() - started:.1f}s"
+        )
+        return results
@@ -0,0 +1,137 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Without Pillow, images are uploaded as they are
+    Image = None
+
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:  # Without pypdf, PDFs are uploaded as they are
+    PdfReader = None
+
+from upload_ledger import sha256_file
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+OPTIMIZE_UPLOADS = os.getenv("OPTIMIZE_UPLOADS", "1") == "1"
+OPTIMIZED_CACHE_DIR = os.getenv("OPTIMIZED_CACHE_DIR", os.path.join(script_dir, ".optimized"))
+OPTIMIZE_WORKERS = int(os.getenv("OPTIMIZE_WORKERS", str(min(os.cpu_count() or 1, 4))))
+# Long side of an A4 page at 300 DPI; Textract gains nothing from more pixels
+MAX_IMAGE_SIDE = int(os.getenv("MAX_IMAGE_SIDE", "3508"))
+JPEG_QUALITY = int(os.getenv("JPEG_QUALITY", "85"))
+# Smaller files are not worth a worker
+MIN_OPTIMIZE_BYTES = int(os.getenv("MIN_OPTIMIZE_BYTES", str(512 * 1024)))
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+PDF_EXTENSIONS = {".pdf"}
+
+
+def can_optimize(file_path):
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension in IMAGE_EXTENSIONS:
+        return Image is not None
+    if extension in PDF_EXTENSIONS:
+        return PdfReader is not None
+    return False
+
+
+def _downscaled(image):
+    """The image shrunk so its long side fits MAX_IMAGE_SIDE, upright as the camera saw it"""
+    image = ImageOps.exif_transpose(image)
+    if max(image.size) > MAX_IMAGE_SIDE:
+        image.thumbnail((MAX_IMAGE_SIDE, MAX_IMAGE_SIDE), Image.LANCZOS)
+    return image
+
+
+def _optimize_image(source, target):
+    with Image.open(source) as image:
+        image = _downscaled(image)
+        if os.path.splitext(source)[1].lower() == ".png":
+            image.save(target, format="PNG", optimize=True)
+        else:
+            if image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            image.save(target, format="JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+
+
+def _optimize_pdf(source, target):
+    writer = PdfWriter(clone_from=PdfReader(source))
+    for page in writer.pages:
+        if Image is not None:
+            for embedded in page.images:
+                try:
+                    if max(embedded.image.size) > MAX_IMAGE_SIDE:
+                        embedded.replace(_downscaled(embedded.image), quality=JPEG_QUALITY)
+                except Exception as e:
+                    # Unusual colour spaces and masks are left alone
+                    print(f"Keeping an embedded image of {os.path.basename(source)} as is: {str(e)}")
+        page.compress_content_streams()
+    # Drop duplicate and unreferenced objects (fonts, images of removed annotations, ...)
+    writer.compress_identical_objects(remove_identicals=True, remove_orphans=True)
+    with open(target, "wb") as f:
+        writer.write(f)
+
+
+def optimize_file(file_path, sha256, cache_dir=OPTIMIZED_CACHE_DIR):
+    """Process pool worker: write a smaller copy of file_path into the cache.
+
+    Returns (path to upload, its sha256, original size, optimized size). The
+    original is returned when optimizing does not make the file smaller; that
+    outcome is cached too, so the work is never repeated for the same content.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    original_size = os.path.getsize(file_path)
+    cached = os.path.join(cache_dir, sha256 + extension)
+    no_gain = os.path.join(cache_dir, sha256 + ".nogain")
+
+    if os.path.exists(cached):
+        return cached, sha256_file(cached), original_size, os.path.getsize(cached)
+    if os.path.exists(no_gain):
+        return file_path, sha256, original_size, original_size
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{cached}.{os.getpid()}.tmp"
+    try:
+        if extension in IMAGE_EXTENSIONS:
+            _optimize_image(file_path, tmp_path)
+        else:
+            _optimize_pdf(file_path, tmp_path)
+        optimized_size = os.path.getsize(tmp_path)
+    except Exception as e:
+        print(f"Could not optimize {os.path.basename(file_path)}: {str(e)}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return file_path, sha256, original_size, original_size
+
+    if optimized_size >= original_size:
+        os.remove(tmp_path)
+        open(no_gain, "w").close()
+        return file_path, sha256, original_size, original_size
+
+    os.replace(tmp_path, cached)
+    return cached, sha256_file(cached), original_size, optimized_size
+
+
+def optimize_files(files, workers=OPTIMIZE_WORKERS):
+    """{file_path: (upload path, sha256, original size, optimized size)} for [(file_path, sha256)].
+
+    Image decoding and PDF rewriting are CPU bound, so they run in a process
+    pool; files that cannot or need not be optimized are passed through.
+    """
+    results = {}
+    todo = []
+    for file_path, sha256 in files:
+        size = os.path.getsize(file_path)
+        if OPTIMIZE_UPLOADS and size >= MIN_OPTIMIZE_BYTES and can_optimize(file_path):
+            todo.append((file_path, sha256))
+        else:
+            results[file_path] = (file_path, sha256, size, size)
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=min(workers, len(todo))) as executor:
+            paths, hashes = zip(*todo)
+            for file_path, result in zip(paths, executor.map(optimize_file, paths, hashes)):
+                results[file_path] = result
+    return results
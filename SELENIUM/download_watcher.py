@@ -0,0 +1,267 @@
+import os
+import time
+import uuid
+import logging
+import threading
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:  # Without watchdog the watcher polls the folder instead
+    Observer = None
+    FileSystemEventHandler = object
+
+# Chrome writes to .crdownload, the HTTP downloader to .partial
+TEMP_SUFFIXES = ('.crdownload', '.tmp', '.partial')
+DOWNLOAD_POLL_INTERVAL = float(os.getenv("DOWNLOAD_POLL_INTERVAL", "0.5"))
+# With no expected count, the folder must stay quiet this long before downloads count as done
+DOWNLOAD_QUIET_SECONDS = float(os.getenv("DOWNLOAD_QUIET_SECONDS", "3"))
+
+
+def is_temp(name):
+    return name.endswith(TEMP_SUFFIXES)
+
+
+def is_hidden(name):
+    """Bookkeeping files such as the timeline checkpoint are not downloads"""
+    return name.startswith(".")
+
+
+def final_name(name):
+    """'report.pdf.crdownload' -> 'report.pdf'"""
+    for suffix in TEMP_SUFFIXES:
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+class Download:
+    """One file being written into the watched folder, followed across renames"""
+    def __init__(self, name, started_at=None):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.started_at = started_at or time.time()
+        self.finished_at = None
+        self.bytes = 0
+
+    def report(self):
+        seconds = max((self.finished_at or time.time()) - self.started_at, 0.001)
+        return {
+            "id": self.id,
+            "name": self.name,
+            "bytes": self.bytes,
+            "seconds": round(seconds, 2),
+            "throughput_kbps": round(self.bytes / 1024 / seconds, 1),
+        }
+
+
+class _EventHandler(FileSystemEventHandler):
+    def __init__(self, watcher):
+        self.watcher = watcher
+
+    def on_created(self, event):
+        if not event.is_directory and not is_hidden(os.path.basename(event.src_path)):
+            self.watcher._on_created(os.path.basename(event.src_path))
+
+    def on_moved(self, event):
+        if not event.is_directory and not is_hidden(os.path.basename(event.dest_path)):
+            self.watcher._on_moved(os.path.basename(event.src_path), os.path.basename(event.dest_path))
+
+    def on_deleted(self, event):
+        if not event.is_directory and not is_hidden(os.path.basename(event.src_path)):
+            self.watcher._on_deleted(os.path.basename(event.src_path))
+
+
+class DownloadWatcher:
+    """Tracks downloads into one folder from filesystem notifications.
+
+    Start it before the downloads are triggered, then call wait(). Files that
+    were already complete when the watcher started are ignored; partial files
+    that were already there are tracked like new ones.
+    """
+    def __init__(self, directory, expected=None):
+        self.directory = directory
+        self.expected = expected
+        self._cond = threading.Condition()
+        self._active = {}      # current file name -> Download
+        self._finished = []
+        self._last_activity = time.time()
+        self._observer = None
+        self._poller = None
+        self._stopped = False
+        self._known = set()
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with self._cond:
+            for name in self._list():
+                if is_temp(name):
+                    self._active[name] = Download(name)
+                self._known.add(name)
+
+        if Observer:
+            self._observer = Observer()
+            self._observer.schedule(_EventHandler(self), self.directory, recursive=False)
+            self._observer.start()
+        else:
+            logging.info("watchdog is not installed, polling for downloads")
+            self._poller = threading.Thread(target=self._poll_loop, daemon=True)
+            self._poller.start()
+        return self
+
+    def stop(self):
+        self._stopped = True
+        if self._observer:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _list(self):
+        try:
+            return {entry.name for entry in os.scandir(self.directory) if entry.is_file() and not is_hidden(entry.name)}
+        except OSError:
+            return set()
+
+    def _size(self, name):
+        try:
+            return os.path.getsize(os.path.join(self.directory, name))
+        except OSError:
+            return 0
+
+    def _complete(self, download, name):
+        download.name = name
+        download.bytes = self._size(name)
+        download.finished_at = time.time()
+        self._finished.append(download)
+        logging.info(
+            f"Download finished: {name} ({download.bytes / 1024:.0f} KB, "
+            f"{download.report()['throughput_kbps']} KB/s)"
+        )
+
+    def _on_created(self, name):
+        with self._cond:
+            self._last_activity = time.time()
+            self._known.add(name)
+            if is_temp(name):
+                self._active.setdefault(name, Download(name))
+            elif name not in self._active:
+                # Written in place without a temporary name
+                self._complete(Download(name), name)
+            self._cond.notify_all()
+
+    def _on_moved(self, src, dest):
+        with self._cond:
+            self._last_activity = time.time()
+            self._known.discard(src)
+            self._known.add(dest)
+            download = self._active.pop(src, None)
+            if is_temp(dest):
+                self._active[dest] = download or Download(dest)
+            elif download:
+                self._complete(download, dest)
+            self._cond.notify_all()
+
+    def _on_deleted(self, name):
+        with self._cond:
+            self._last_activity = time.time()
+            self._known.discard(name)
+            download = self._active.pop(name, None)
+            if download:
+                logging.warning(f"Download abandoned: {name}")
+            self._cond.notify_all()
+
+    def _poll_loop(self):
+        """Fallback when notifications are unavailable: diff the folder listing"""
+        while not self._stopped:
+            time.sleep(DOWNLOAD_POLL_INTERVAL)
+            current = self._list()
+            with self._cond:
+                added = current - self._known
+                removed = self._known - current
+                self._known = current
+                if not added and not removed:
+                    continue
+                self._last_activity = time.time()
+
+                # Finished files first, matched to the partial file they replaced
+                finals = sorted(n for n in added if not is_temp(n))
+                for name in list(finals):
+                    source = next((r for r in removed if r in self._active and final_name(r) == name), None)
+                    if source:
+                        removed.discard(source)
+                        finals.remove(name)
+                        self._complete(self._active.pop(source), name)
+
+                for name in sorted(n for n in added if is_temp(n)):
+                    # A rename between two temporary names keeps the same download
+                    previous = next((r for r in removed if r in self._active), None)
+                    if previous:
+                        removed.discard(previous)
+                        self._active[name] = self._active.pop(previous)
+                    else:
+                        self._active.setdefault(name, Download(name))
+
+                for name in finals:
+                    source = next((r for r in removed if r in self._active), None)
+                    self._complete(self._active.pop(source) if source else Download(name), name)
+                    removed.discard(source)
+
+                for name in removed:
+                    if self._active.pop(name, None):
+                        logging.warning(f"Download abandoned: {name}")
+                self._cond.notify_all()
+
+    def _done(self):
+        if self._active:
+            return False
+        if self.expected is not None:
+            return len(self._finished) >= self.expected
+        return time.time() - self._last_activity >= DOWNLOAD_QUIET_SECONDS
+
+    def wait(self, timeout=900):
+        """Block until every download has finished; returns True on success, False on timeout"""
+        deadline = time.time() + timeout
+        with self._cond:
+            while not self._done():
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    logging.warning(
+                        f"Download timeout reached after {timeout} seconds "
+                        f"({len(self._active)} still in progress)"
+                    )
+                    return False
+                # Wake up periodically to re-check the quiet period
+                self._cond.wait(min(remaining, DOWNLOAD_QUIET_SECONDS))
+
+        summary = self.summary()
+        logging.info(
+            f"Downloads complete: {summary['files']} files, {summary['bytes'] / 1048576:.1f} MB "
+            f"in {summary['seconds']}s"
+        )
+        return True
+
+    def finished(self):
+        """Finished downloads in the order they started"""
+        with self._cond:
+            return sorted(self._finished, key=lambda d: d.started_at)
+
+    def summary(self):
+        with self._cond:
+            reports = [d.report() for d in self._finished]
+            in_progress = [d.name for d in self._active.values()]
+        total = sum(r["bytes"] for r in reports)
+        started = min((d.started_at for d in self._finished), default=time.time())
+        finished = max((d.finished_at for d in self._finished), default=started)
+        return {
+            "files": len(reports),
+            "bytes": total,
+            "seconds": round(finished - started, 2),
+            "downloads": reports,
+            "in_progress": in_progress,
+        }
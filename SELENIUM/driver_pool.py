@@ -0,0 +1,260 @@
+import os
+import time
+import shutil
+import logging
+import threading
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+# Pool configuration (override through environment variables)
+DRIVER_POOL_SIZE = int(os.getenv("DRIVER_POOL_SIZE", "1"))
+DRIVER_POOL_MIN_IDLE = int(os.getenv("DRIVER_POOL_MIN_IDLE", "1"))
+DRIVER_MAX_USES = int(os.getenv("DRIVER_MAX_USES", "20"))
+DRIVER_IDLE_TIMEOUT = int(os.getenv("DRIVER_IDLE_TIMEOUT", "1800"))
+DRIVER_ACQUIRE_TIMEOUT = int(os.getenv("DRIVER_ACQUIRE_TIMEOUT", "600"))
+REAPER_INTERVAL = 30
+
+# Files and caches that must not be copied when cloning a Chrome profile
+PROFILE_CLONE_IGNORE = shutil.ignore_patterns(
+    "Singleton*", "lockfile", "LOCK", "*.tmp",
+    "Cache", "Code Cache", "GPUCache", "GrShaderCache", "ShaderCache",
+    "Service Worker", "Crashpad", "BrowserMetrics*"
+)
+
+
+def clone_profile(template_dir, clone_dir):
+    """Replace clone_dir with a fresh copy of the template Chrome profile"""
+    if os.path.exists(clone_dir):
+        shutil.rmtree(clone_dir, ignore_errors=True)
+    if os.path.isdir(template_dir):
+        shutil.copytree(template_dir, clone_dir, ignore=PROFILE_CLONE_IGNORE)
+    else:
+        logging.warning(f"Profile template {template_dir} not found, starting {clone_dir} empty")
+        os.makedirs(clone_dir, exist_ok=True)
+    return clone_dir
+
+
+class PooledDriver:
+    """Bookkeeping for a driver owned by the pool"""
+    def __init__(self, driver, slot):
+        self.driver = driver
+        self.slot = slot
+        self.created_at = time.time()
+        self.last_used = time.time()
+        self.uses = 0
+
+
+class DriverPool:
+    """Pool of pre-launched, health-checked Chrome drivers.
+
+    Callers check a driver out with acquire() and give it back with release().
+    Drivers are reset between deals, recycled after max_uses checkouts and
+    evicted once they have been idle for longer than idle_timeout.
+    """
+    def __init__(self, options_factory, size=DRIVER_POOL_SIZE, min_idle=DRIVER_POOL_MIN_IDLE,
+                 max_uses=DRIVER_MAX_USES, idle_timeout=DRIVER_IDLE_TIMEOUT, download_path=None):
+        # options_factory(slot) returns the ChromeOptions for the given pool slot
+        self.options_factory = options_factory
+        self.size = max(1, size)
+        self.min_idle = min(max(0, min_idle), self.size)
+        self.max_uses = max_uses
+        self.idle_timeout = idle_timeout
+        self.download_path = download_path
+
+        self._cond = threading.Condition()
+        self._idle = []          # PooledDriver entries ready to be checked out
+        self._busy = {}          # id(driver) -> PooledDriver
+        self._free_slots = list(range(self.size))
+        self._service_path = None
+        self._closed = False
+        self._reaper = None
+
+    def service_path(self):
+        """Path of the chromedriver binary, resolved once instead of on every launch"""
+        if not self._service_path:
+            self._service_path = ChromeDriverManager().install()
+        return self._service_path
+
+    def _get_service(self):
+        return Service(self.service_path())
+
+    def _launch(self, slot):
+        """Start a new Chrome instance for the given slot"""
+        started = time.time()
+        driver = webdriver.Chrome(service=self._get_service(), options=self.options_factory(slot))
+        logging.info(f"Driver pool: launched driver in slot {slot} ({time.time() - started:.1f}s)")
+        return PooledDriver(driver, slot)
+
+    def _quit(self, entry):
+        try:
+            entry.driver.quit()
+        except Exception as e:
+            logging.error(f"Driver pool: error quitting driver in slot {entry.slot}: {e}")
+
+    def _is_healthy(self, entry):
+        """Cheap liveness probe: the browser answers a script and still has a window"""
+        try:
+            return entry.driver.execute_script("return 1;") == 1 and bool(entry.driver.window_handles)
+        except Exception:
+            return False
+
+    def _reset(self, entry):
+        """Return a driver to a clean state between deals"""
+        driver = entry.driver
+        handles = driver.window_handles
+        # Close every tab except the first one
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.get("about:blank")
+
+        # Point downloads back at the default directory
+        if self.download_path:
+            driver.execute_cdp_cmd(
+                "Page.setDownloadBehavior",
+                {
+                    "behavior": "allow",
+                    "downloadPath": self.download_path,
+                },
+            )
+
+    def _retire(self, entry):
+        """Quit a driver and give its slot back"""
+        self._quit(entry)
+        with self._cond:
+            self._free_slots.append(entry.slot)
+            self._cond.notify()
+
+    def warm(self):
+        """Launch drivers until min_idle of them are waiting"""
+        while True:
+            with self._cond:
+                if self._closed or len(self._idle) >= self.min_idle or not self._free_slots:
+                    return
+                slot = self._free_slots.pop(0)
+            try:
+                entry = self._launch(slot)
+            except Exception as e:
+                logging.error(f"Driver pool: failed to pre-launch driver: {e}")
+                with self._cond:
+                    self._free_slots.append(slot)
+                return
+            with self._cond:
+                self._idle.append(entry)
+                self._cond.notify()
+
+    def start(self):
+        """Pre-launch drivers and start the idle reaper in the background"""
+        threading.Thread(target=self.warm, daemon=True).start()
+        if not self._reaper:
+            self._reaper = threading.Thread(target=self._reap_loop, daemon=True)
+            self._reaper.start()
+
+    def acquire(self, timeout=DRIVER_ACQUIRE_TIMEOUT):
+        """Check a healthy driver out of the pool, launching one if a slot is free"""
+        deadline = time.time() + timeout
+        while True:
+            slot = None
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("Driver pool is shut down")
+
+                if self._idle:
+                    entry = self._idle.pop()
+                elif self._free_slots:
+                    entry = None
+                    slot = self._free_slots.pop(0)
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise TimeoutError("Timed out waiting for a free driver")
+                    self._cond.wait(remaining)
+                    continue
+
+            if entry is None:
+                try:
+                    entry = self._launch(slot)
+                except Exception:
+                    with self._cond:
+                        self._free_slots.append(slot)
+                        self._cond.notify()
+                    raise
+            elif not self._is_healthy(entry):
+                logging.warning(f"Driver pool: driver in slot {entry.slot} failed health check, replacing")
+                self._retire(entry)
+                continue
+
+            entry.uses += 1
+            entry.last_used = time.time()
+            with self._cond:
+                self._busy[id(entry.driver)] = entry
+            logging.info(f"Driver pool: checked out slot {entry.slot} (use {entry.uses}/{self.max_uses})")
+            return entry.driver
+
+    def release(self, driver, discard=False):
+        """Give a driver back; it is reset, or quit if it is worn out or broken"""
+        with self._cond:
+            entry = self._busy.pop(id(driver), None)
+        if entry is None:
+            logging.warning("Driver pool: release() called with an unknown driver")
+            return
+
+        entry.last_used = time.time()
+        if discard or self._closed or entry.uses >= self.max_uses:
+            logging.info(f"Driver pool: recycling driver in slot {entry.slot} after {entry.uses} uses")
+            self._retire(entry)
+            threading.Thread(target=self.warm, daemon=True).start()
+            return
+
+        try:
+            self._reset(entry)
+        except Exception as e:
+            logging.warning(f"Driver pool: reset failed for slot {entry.slot}, recycling: {e}")
+            self._retire(entry)
+            threading.Thread(target=self.warm, daemon=True).start()
+            return
+
+        with self._cond:
+            self._idle.append(entry)
+            self._cond.notify()
+
+    def _reap_loop(self):
+        while not self._closed:
+            time.sleep(REAPER_INTERVAL)
+            self.evict_idle()
+
+    def evict_idle(self):
+        """Quit drivers that have been idle for too long.
+
+        The pool is not topped back up here, so a quiet service really gives the
+        memory back (even below min_idle); the next acquire() launches a driver.
+        """
+        now = time.time()
+        with self._cond:
+            expired = [e for e in self._idle if now - e.last_used > self.idle_timeout]
+            self._idle = [e for e in self._idle if e not in expired]
+        for entry in expired:
+            logging.info(f"Driver pool: evicting idle driver in slot {entry.slot}")
+            self._retire(entry)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "size": self.size,
+                "idle": len(self._idle),
+                "busy": len(self._busy),
+                "free_slots": len(self._free_slots),
+            }
+
+    def shutdown(self):
+        """Quit every driver owned by the pool"""
+        with self._cond:
+            self._closed = True
+            entries = self._idle + list(self._busy.values())
+            self._idle = []
+            self._busy = {}
+            self._cond.notify_all()
+        for entry in entries:
+            self._quit(entry)
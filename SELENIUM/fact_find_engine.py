@@ -0,0 +1,476 @@
+import os
+import re
+import json
+
+# Resolves a whole fact-find section in the browser with one round trip.
+#
+# A section is a nested dict whose leaves are field specs built with the helpers
+# below (or loaded from schemas/fact_find.json). Before it is sent, a section is
+# compiled into a program: every block (the section, or the fields of one $scope
+# or $each element) lists its distinct reads once, as [kind, xpath, index], and
+# a shape that points each field at the read it uses. Fields sharing a selector
+# share one read, and an XPath is evaluated once per element however many reads
+# use it. Absolute XPaths inside $scope/$each are hoisted to the section's own
+# reads, since they resolve to the same elements for every item. Reads are made
+# lazily, so hoisted ones cost nothing when no item uses them.
+#
+# Reads work exactly like the old per-field helpers did:
+#   value   -> get_attribute("value")               (get_input_value)
+#   select  -> Select(...).first_selected_option.text (get_select_text)
+#   text    -> element.text.strip()                 (get_element_text)
+#   content -> get_attribute("textContent")
+#   inner   -> get_attribute("innerText")
+#   radio   -> text of the checked md-radio-button  (get_radio_value)
+# A field whose element is missing, or whose XPath is invalid, is null.
+#
+# In model mode, value and select reads of a plain ng-model selector
+# (//input[@ng-model='...'] or //select[@ng-model='...']) carry a binding and are
+# read from AngularJS instead: the expression is evaluated with scope.$eval on the
+# field's scope. A field that ng-if has removed is evaluated on the scope of
+# another field bound to the same object, so it is read rather than null. Values
+# of rendered inputs come from the ngModel controller ($viewValue, formatted as
+# shown); select values are mapped to the label of their option when the option
+# list is on the page. The bound elements of a context are found with one
+# querySelectorAll('[ng-model]') rather than an XPath per field.
+EXTRACT_SECTION_SCRIPT = """
+var program = arguments[0], root = arguments[1] || document;
+
+function nodes(ctx, xpath) {
+    var found = [];
+    if (!ctx) { return found; }
+    try {
+        var result = document.evaluate(xpath, ctx, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (var i = 0; i < result.snapshotLength; i++) { found.push(result.snapshotItem(i)); }
+    } catch (e) {}
+    return found;
+}
+
+function first(ctx, xpath, index) {
+    return nodes(ctx, xpath)[index || 0] || null;
+}
+
+// WebDriver only returns the text of elements that are rendered
+function shown(el) { return el.getClientRects().length > 0; }
+function visibleText(el) { return shown(el) ? el.innerText.trim() : ''; }
+
+var READERS = {
+    value: function (el) {
+        var v = ('value' in el) ? el.value : el.getAttribute('value');
+        return v === null || v === undefined ? null : String(v);
+    },
+    select: function (el) {
+        if (el.tagName !== 'SELECT') { return null; }
+        for (var i = 0; i < el.options.length; i++) {
+            // An option is displayed when its select is
+            if (el.options[i].selected) { return shown(el) ? el.options[i].text.trim() : ''; }
+        }
+        return null;
+    },
+    text: visibleText,
+    content: function (el) { return el.textContent; },
+    inner: function (el) { return el.innerText; },
+    radio: function (el) {
+        var checked = first(el, ".//md-radio-button[@aria-checked='true']");
+        var label = checked && first(checked, './/span');
+        return label ? visibleText(label) : null;
+    }
+};
+
+// Option values as AngularJS writes them: 'string:Yes', 'number:2', or plain
+function optionMatches(option, v) {
+    return option.value === String(v) || option.value === typeof v + ':' + v;
+}
+
+// el is the bound element (null when ng-if removed it), v the model value
+var MODEL_READERS = {
+    value: function (el, v) {
+        var ngModel = el && angular.element(el).controller('ngModel');
+        if (ngModel) { v = ngModel.$viewValue; }
+        else if (v instanceof Date) { v = v.toLocaleDateString('en-AU'); }
+        return v === null || v === undefined || v !== v ? '' : String(v);
+    },
+    select: function (el, v) {
+        if (!el) { return v === null || v === undefined ? null : String(v); }
+        if (el.tagName !== 'SELECT') { return null; }
+        var i;
+        for (i = 0; i < el.options.length; i++) {
+            if (optionMatches(el.options[i], v)) { return el.options[i].text.trim(); }
+        }
+        // Object values (ng-options) are matched by Angular itself
+        for (i = 0; i < el.options.length; i++) {
+            if (el.options[i].selected) { return el.options[i].text.trim(); }
+        }
+        return null;
+    }
+};
+
+// The scope to evaluate a binding on: its element's, or that of another element
+// bound to the same object when ng-if has removed the field itself
+function modelScope(el, binding, pool, index) {
+    if (!window.angular) { return null; }
+    if (el) { return angular.element(el).scope() || null; }
+    var object = binding.model.slice(0, binding.model.lastIndexOf('.') + 1);
+    if (index || !object) { return null; }
+    for (var key in pool) {
+        if (pool.hasOwnProperty(key) && key.slice(key.indexOf(' ') + 1).indexOf(object) === 0) {
+            return angular.element(pool[key][0]).scope() || null;
+        }
+    }
+    return null;
+}
+
+// ng-model elements under ctx by tag and expression, in document order
+function bindings(ctx) {
+    var bound = {};
+    if (!ctx) { return bound; }
+    var els = ctx.querySelectorAll('[ng-model]');
+    for (var i = 0; i < els.length; i++) {
+        var key = els[i].tagName + ' ' + els[i].getAttribute('ng-model');
+        (bound[key] = bound[key] || []).push(els[i]);
+    }
+    return bound;
+}
+
+var documentBindings = null;
+
+// Reads are made on first use and kept, so a shared read is made once
+function reader(block, ctx) {
+    var found = {}, values = {}, bound = null;
+    return function (slot) {
+        if (!values.hasOwnProperty(slot)) {
+            var kind = block.reads[slot][0], xpath = block.reads[slot][1], index = block.reads[slot][2];
+            var binding = block.reads[slot][3], el;
+            try {
+                if (binding) {
+                    var pool = binding.absolute
+                        ? (documentBindings = documentBindings || bindings(document))
+                        : (bound = bound || bindings(ctx));
+                    el = (pool[binding.tag + ' ' + binding.model] || [])[index] || null;
+                    var scope = modelScope(el, binding, pool, index);
+                    values[slot] = scope
+                        ? MODEL_READERS[kind](el, scope.$eval(binding.model))
+                        : (el ? READERS[kind](el) : null);
+                } else {
+                    if (!found.hasOwnProperty(xpath)) { found[xpath] = nodes(ctx, xpath); }
+                    el = found[xpath][index] || null;
+                    values[slot] = el ? READERS[kind](el) : null;
+                }
+            } catch (e) { values[slot] = null; }
+        }
+        return values[slot];
+    };
+}
+
+function run(block, ctx, rootValues) {
+    var values = reader(block, ctx);
+    return build(block.shape, ctx, values, rootValues || values);
+}
+
+function build(shape, ctx, values, rootValues) {
+    if (shape === null) { return null; }
+    if (shape.hasOwnProperty('$slot')) { return values(shape.$slot); }
+    if (shape.hasOwnProperty('$root')) { return rootValues(shape.$root); }
+    if (shape.$scope) {
+        var scoped = first(ctx, shape.$scope);
+        // With empty, a missing element still yields the fields, all null
+        return scoped || shape.empty ? run(shape.block, scoped, rootValues) : null;
+    }
+    if (shape.$each) {
+        var items = [];
+        nodes(ctx, shape.$each).forEach(function (el) {
+            var block = shape.block, key = null;
+            if (shape.cases) {
+                var label = first(el, shape.label);
+                key = label ? visibleText(label) : null;
+                if (!label || !shape.cases.hasOwnProperty(key)) { return; }
+                block = shape.cases[key];
+            }
+            var item = run(block, el, rootValues);
+            for (var i = 0; i < shape.required.length; i++) {
+                if (item[shape.required[i]] === null) { return; }
+            }
+            items.push(shape.cases ? {'case': key, 'item': item} : item);
+        });
+        return items;
+    }
+    var out = {};
+    for (var name in shape) {
+        if (shape.hasOwnProperty(name)) { out[name] = build(shape[name], ctx, values, rootValues); }
+    }
+    return out;
+}
+
+return run(program, root, null);
+"""
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+FACT_FIND_SCHEMA_PATH = os.getenv("FACT_FIND_SCHEMA_PATH", os.path.join(script_dir, "schemas", "fact_find.json"))
+FACT_FIND_SCHEMA_VERSION = 1
+# "dom" reads every field from the page; "model" reads ng-model bound fields from AngularJS
+FACT_FIND_MODE = os.getenv("FACT_FIND_MODE", "dom")
+
+FIELD_KINDS = ("value", "select", "text", "content", "inner", "radio")
+
+# A field selected by its ng-model alone, which model mode can read from AngularJS
+NG_MODEL_XPATH = re.compile(r"(\.)?//(input|select)\[@ng-model='([^']+)'\]")
+
+
+def clean_currency(value):
+    if not value:
+        return 0
+    # Remove $ and commas
+    cleaned = re.sub(r'[^\d.]', '', value)
+    try:
+        return float(cleaned)
+    except ValueError:
+        return 0
+
+
+# Applied in Python after the round trip so numbers keep their Python types
+TRANSFORMS = {
+    "currency": clean_currency,
+}
+
+
+def _field(kind, xpath, index=0, transform=None):
+    spec = {"$field": kind, "xpath": xpath, "index": index}
+    if transform:
+        spec["transform"] = transform
+    return spec
+
+
+def value(xpath, index=0):
+    return _field("value", xpath, index)
+
+
+def select(xpath, index=0):
+    return _field("select", xpath, index)
+
+
+def text(xpath, index=0, transform=None):
+    return _field("text", xpath, index, transform)
+
+
+def content(xpath):
+    return _field("content", xpath)
+
+
+def inner(xpath):
+    return _field("inner", xpath)
+
+
+def radio(xpath):
+    return _field("radio", xpath)
+
+
+def scope(xpath, fields, empty=False):
+    """fields resolved against the first element matching xpath.
+
+    When there is no such element the result is None, or with empty=True the
+    fields with every value None.
+    """
+    return {"$scope": xpath, "fields": fields, "empty": empty}
+
+
+def each(xpath, fields=None, required=(), label=None, cases=None):
+    """A list with fields resolved against every element matching xpath.
+
+    Items where a required field is None are dropped. With cases, the text of
+    the label element picks which fields apply to an element ({text: fields});
+    elements whose label matches no case are dropped.
+    """
+    spec = {"$each": xpath, "fields": fields, "required": list(required)}
+    if cases is not None:
+        spec.update(label=label, cases=cases)
+    return spec
+
+
+def _apply_transforms(spec, data):
+    if spec is None:
+        return data
+    if "$field" in spec:
+        return TRANSFORMS[spec["transform"]](data) if "transform" in spec else data
+    if data is None:
+        return data
+    if "$scope" in spec:
+        return _apply_transforms(spec["fields"], data)
+    if "$each" in spec:
+        if spec.get("cases") is not None:
+            return [_apply_transforms(spec["cases"][entry["case"]], entry["item"]) for entry in data]
+        return [_apply_transforms(spec["fields"], item) for item in data]
+    return {name: _apply_transforms(spec[name], data[name]) for name in spec}
+
+
+def _model_binding(spec):
+    match = NG_MODEL_XPATH.fullmatch(spec["xpath"])
+    if spec["$field"] not in ("value", "select") or not match:
+        return None
+    return {"tag": match.group(2).upper(), "model": match.group(3), "absolute": not match.group(1)}
+
+
+class _Reads:
+    """The distinct reads of one block, numbered in order of first use"""
+
+    def __init__(self, model=False):
+        self.model = model
+        self.table = []
+        self.slots = {}
+
+    def slot(self, spec):
+        read = (spec["$field"], spec["xpath"], spec["index"])
+        if read not in self.slots:
+            self.slots[read] = len(self.table)
+            binding = _model_binding(spec) if self.model else None
+            self.table.append(list(read) + [binding] if binding else list(read))
+        return self.slots[read]
+
+
+def _is_absolute(xpath):
+    return xpath.lstrip("(").startswith("/")
+
+
+def _compile(spec, reads, root_reads):
+    if spec is None:
+        return None
+    if "$field" in spec:
+        if reads is not root_reads and _is_absolute(spec["xpath"]):
+            return {"$root": root_reads.slot(spec)}
+        return {"$slot": reads.slot(spec)}
+    if "$scope" in spec:
+        return {"$scope": spec["$scope"], "empty": spec["empty"],
+                "block": _compile_block(spec["fields"], root_reads)}
+    if "$each" in spec:
+        shape = {"$each": spec["$each"], "required": spec["required"]}
+        if spec.get("cases") is not None:
+            shape["label"] = spec["label"]
+            shape["cases"] = {key: _compile_block(fields, root_reads) for key, fields in spec["cases"].items()}
+        else:
+            shape["block"] = _compile_block(spec["fields"], root_reads)
+        return shape
+    return {name: _compile(spec[name], reads, root_reads) for name in spec}
+
+
+def _compile_block(spec, root_reads):
+    reads = _Reads(root_reads.model)
+    shape = _compile(spec, reads, root_reads)
+    return {"reads": reads.table, "shape": shape}
+
+
+def _count_fields(spec):
+    if spec is None:
+        return 0
+    if "$field" in spec:
+        return 1
+    if "$scope" in spec:
+        return _count_fields(spec["fields"])
+    if "$each" in spec:
+        if spec.get("cases") is not None:
+            return sum(_count_fields(fields) for fields in spec["cases"].values())
+        return _count_fields(spec["fields"])
+    return sum(_count_fields(child) for child in spec.values())
+
+
+def _count_reads(block):
+    count = len(block["reads"])
+    stack = [block["shape"]]
+    while stack:
+        shape = stack.pop()
+        if not isinstance(shape, dict) or "$slot" in shape or "$root" in shape:
+            continue
+        if "$scope" in shape or ("$each" in shape and "block" in shape):
+            count += _count_reads(shape["block"])
+        elif "$each" in shape:
+            count += sum(_count_reads(case) for case in shape["cases"].values())
+        else:
+            stack.extend(shape.values())
+    return count
+
+
+class CompiledSection:
+    """A section spec compiled once into the program EXTRACT_SECTION_SCRIPT runs"""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.program = self._compile(spec, model=False)
+        self.model_program = self._compile(spec, model=True)
+        self.field_count = _count_fields(spec)
+        self.read_count = _count_reads(self.program)
+
+    @staticmethod
+    def _compile(spec, model):
+        root_reads = _Reads(model)
+        shape = _compile(spec, root_reads, root_reads)
+        return {"reads": root_reads.table, "shape": shape}
+
+
+def _substitute(node, args):
+    if isinstance(node, str):
+        # A whole-string placeholder keeps the argument's type (e.g. an index)
+        whole = re.fullmatch(r"\{(\w+)\}", node)
+        if whole and whole.group(1) in args:
+            return args[whole.group(1)]
+        return re.sub(r"\{(\w+)\}", lambda m: str(args[m.group(1)]) if m.group(1) in args else m.group(0), node)
+    if isinstance(node, dict):
+        return {key: _substitute(child, args) for key, child in node.items()}
+    if isinstance(node, list):
+        return [_substitute(child, args) for child in node]
+    return node
+
+
+def _use(node, fragments):
+    fragment = fragments[node["use"]]
+    args = dict(fragment.get("args", {}), **node.get("args", {}))
+    return _expand(_substitute(fragment["fields"], args), fragments)
+
+
+def _expand(node, fragments):
+    """Turn a schema node into the spec the helpers above would build"""
+    if node is None:
+        return None
+    if not isinstance(node, dict):
+        raise ValueError(f"Invalid fact find schema node: {node!r}")
+    if isinstance(node.get("use"), str):
+        return _use(node, fragments)
+    for kind in FIELD_KINDS:
+        if isinstance(node.get(kind), str):
+            return _field(kind, node[kind], node.get("index", 0), node.get("transform"))
+    if isinstance(node.get("scope"), str):
+        return scope(node["scope"], _expand(node["fields"], fragments), empty=node.get("empty", False))
+    if isinstance(node.get("each"), str):
+        if "cases" in node:
+            return each(node["each"], required=node.get("required", ()), label=node["label"],
+                        cases={key: _expand(fields, fragments) for key, fields in node["cases"].items()})
+        return each(node["each"], _expand(node["fields"], fragments), required=node.get("required", ()))
+
+    spec = {}
+    for name, child in node.items():
+        if name == "$use":
+            # Fragment fields are inlined here; later keys override them in place
+            spec.update(_use(child, fragments))
+        else:
+            spec[name] = _expand(child, fragments)
+    return spec
+
+
+def load_schema(path=FACT_FIND_SCHEMA_PATH):
+    """{section name: CompiledSection} for every section of the fact find schema"""
+    with open(path, "r", encoding="utf-8") as f:
+        schema = json.load(f)
+    if schema.get("version") != FACT_FIND_SCHEMA_VERSION:
+        raise ValueError(f"Unsupported fact find schema version {schema.get('version')!r} in {path}, "
+                         f"expected {FACT_FIND_SCHEMA_VERSION}")
+    fragments = schema.get("fragments", {})
+    return {name: CompiledSection(_expand(node, fragments)) for name, node in schema["sections"].items()}
+
+
+def extract_section(driver, section, root=None, mode=FACT_FIND_MODE):
+    """Resolve every field of section in one execute_script call; returns the same nesting.
+
+    section is a CompiledSection, or a spec that is compiled on the spot. mode is
+    "dom" or "model" (see EXTRACT_SECTION_SCRIPT).
+    """
+    if not isinstance(section, CompiledSection):
+        section = CompiledSection(section)
+    program = section.model_program if mode == "model" else section.program
+    return _apply_transforms(section.spec, driver.execute_script(EXTRACT_SECTION_SCRIPT, program, root))
@@ -0,0 +1,1025 @@
+import os
+import json
+import time
+import queue
+import threading
+import mimetypes
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from upload_ledger import UploadLedger
+from document_classifier import DocumentClassifier
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+# The file selector runs in its own process (see gui_launcher.py) and must open fast,
+# so this module only imports the standard library at load time; requests and
+# requests_toolbelt are imported when documents are actually submitted.
+
+DOWNLOAD_PATH = r"C:\Users\user\Desktop\Complete\SELENIUM\docs"
+
+# Textract middleware upload settings
+UPLOAD_URL = os.getenv("TEXTRACT_UPLOAD_URL", "https://textractor.korunaassist.com/upload")
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", "4"))
+UPLOAD_RETRIES = int(os.getenv("UPLOAD_RETRIES", "3"))
+# (connect, read) timeout; a large statement on a slow link needs far more than 30 s
+UPLOAD_TIMEOUT = (10, int(os.getenv("UPLOAD_READ_TIMEOUT", "300")))
+# Files at least this large go through the resumable chunked protocol (/uploads);
+# a dropped connection then costs one chunk instead of the whole file
+UPLOAD_SESSIONS_URL = os.getenv("TEXTRACT_UPLOAD_SESSIONS_URL", UPLOAD_URL.rstrip("/") + "s")
+CHUNKED_UPLOAD_THRESHOLD = int(os.getenv("CHUNKED_UPLOAD_THRESHOLD", str(8 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(4 * 1024 * 1024)))
+
+class UploadRejected(Exception):
+    """The middleware refused an upload with a client error; retrying will not help"""
+
+# Shared so content-based results are cached across deals
+document_classifier = DocumentClassifier()
+
+class Windows11Theme:
+    """Windows 11 styling for Tkinter"""
+    def __init__(self, root):
+        self.style = ttk.Style(root)
+        self.configure_styles()
+        
+    def configure_styles(self):
+        # Windows 11 colors
+        self.accent_color = "#0067C0"  # Windows 11 accent blue
+        self.bg_color = "#F3F3F3"      # Light background
+        self.text_color = "#202020"    # Dark text
+        self.border_color = "#E1DFDE"  # Light border
+        
+        # Configure the root style
+        self.style.configure('TFrame', background=self.bg_color)
+        self.style.configure('TLabel', background=self.bg_color, foreground=self.text_color)
+        self.style.configure('TLabelframe', background=self.bg_color, foreground=self.text_color)
+        self.style.configure('TLabelframe.Label', background=self.bg_color, foreground=self.text_color, font=('Segoe UI', 9, 'bold'))
+        
+        # Configure button styles (Windows 11 has rounded buttons with subtle shadows)
+        self.style.configure('TButton', 
+                             background='white',
+                             foreground=self.text_color,
+                             font=('Segoe UI', 9),
+                             relief=tk.FLAT,
+                             borderwidth=1)
+        
+        # Accent button style (with white text)
+        self.style.configure('Accent.TButton',
+                             background=self.accent_color,
+                             foreground='white',
+                             font=('Segoe UI', 9, 'bold'),
+                             relief=tk.FLAT,
+                             borderwidth=0)
+        
+        # Accent button style (with black text)
+        self.style.configure('AccentBlack.TButton',
+                             background=self.accent_color,
+                             foreground='black',
+                             font=('Segoe UI', 9, 'bold'),
+                             relief=tk.FLAT,
+                             borderwidth=0)
+        
+        # Hover styles
+        self.style.map('TButton',
+                      background=[('active', '#F5F5F5'), ('pressed', '#E1E1E1')],
+                      relief=[('pressed', 'flat')])
+        
+        self.style.map('Accent.TButton',
+                      background=[('active', '#005FB3'), ('pressed', '#004E99')],
+                      foreground=[('active', 'white'), ('pressed', 'white')])
+                      
+        self.style.map('AccentBlack.TButton',
+                      background=[('active', '#005FB3'), ('pressed', '#004E99')],
+                      foreground=[('active', 'black'), ('pressed', 'black')])
+        
+        # Configure combobox style
+        self.style.configure('TCombobox', 
+                            background='white',
+                            fieldbackground='white',
+                            foreground=self.text_color,
+                            arrowcolor=self.text_color)
+        
+        # Configure progressbar style
+        self.style.configure('TProgressbar', 
+                            background=self.accent_color,
+                            troughcolor='#E5E7EB',
+                            borderwidth=0,
+                            thickness=6)
+
+class FileSelectorApp:
+    def __init__(self, root, applicant_details, application_id, parent=None, deal_id=None):
+        # parent: frame to build the deal's widgets in (a tab of the persistent window);
+        # without one the app owns the whole root window
+        self.root = root
+        self.container = parent or root
+        if parent is None:
+            self.root.title("Document Assignment Tool")
+            self.root.geometry("1000x700")
+            self.root.configure(bg="#F3F3F3")  # Windows 11 background color
+            
+            # Apply Windows 11 theme
+            self.theme = Windows11Theme(root)
+            
+            # Add icon to the window and taskbar - with improved icon finding
+            self.find_and_set_icon()
+  
+        # Store applicant details and initialize assignments
+        self.applicant_details = applicant_details
+        self.application_id = application_id
+        self.deal_id = deal_id  # Stable across runs of the same deal, unlike the ids above
+        self.assignments = {}  # Dictionary to store file assignments
+        self.processed_files = {}  # Dictionary to track processed files per applicant
+        self.ledger = UploadLedger()  # Uploads from earlier sessions, by content hash
+        self._ledger_scan = 0  # Bumped on every load_files so a stale scan is ignored
+        
+        # Create main container with grid
+        self.container.grid_columnconfigure(0, weight=1)
+        self.container.grid_columnconfigure(1, weight=1)
+        self.container.grid_rowconfigure(0, weight=1)
+        
+        # Left Frame: Available Files
+        left_frame = ttk.LabelFrame(self.container, text=" Available Documents ", padding=(10, 5))
+        left_frame.grid(row=0, column=0, padx=16, pady=16, sticky="nsew")
+        left_frame.grid_rowconfigure(1, weight=1)  # Ensure the file container expands
+        left_frame.grid_columnconfigure(0, weight=1)
+        
+        # Add heading with icon (simulated with a label)
+        doc_heading = ttk.Frame(left_frame)
+        doc_heading.grid(row=0, column=0, sticky="ew", pady=(0, 8))
+        
+        doc_heading_icon = ttk.Label(doc_heading, text="📄", font=("Segoe UI", 11))
+        doc_heading_icon.pack(side=tk.LEFT, padx=(0, 5))
+        
+        doc_heading_text = ttk.Label(doc_heading, text="Select a document to assign", font=("Segoe UI", 10))
+        doc_heading_text.pack(side=tk.LEFT)
+        
+        # File listbox with custom styling
+        file_container = ttk.Frame(left_frame)
+        file_container.grid(row=1, column=0, sticky="nsew")
+        file_container.grid_rowconfigure(0, weight=1)
+        file_container.grid_columnconfigure(0, weight=1)
+        
+        # Create a frame for the listbox with a border
+        listbox_frame = tk.Frame(file_container, bg="white", highlightbackground="#E1DFDE", 
+                                highlightthickness=1, bd=0)
+        listbox_frame.grid(row=0, column=0, sticky="nsew")
+        listbox_frame.grid_rowconfigure(0, weight=1)
+        listbox_frame.grid_columnconfigure(0, weight=1)
+        
+        # File listbox with custom styling
+        self.file_listbox = tk.Listbox(listbox_frame, 
+                                     selectmode=tk.SINGLE,
+                                     bg="white",
+                                     fg="#202020",
+                                     font=("Segoe UI", 9),
+                                     bd=0,
+                                     highlightthickness=0,
+                                     activestyle="none",
+                                     selectbackground="#CCE4F7",
+                                     selectforeground="#202020")
+        
+        file_scrollbar = ttk.Scrollbar(listbox_frame, orient=tk.VERTICAL, command=self.file_listbox.yview)
+        self.file_listbox.configure(yscrollcommand=file_scrollbar.set)
+        
+        self.file_listbox.grid(row=0, column=0, sticky="nsew")
+        file_scrollbar.grid(row=0, column=1, sticky="ns")
+        
+        # Right Frame: Controls and Assigned Files
+        right_frame = ttk.Frame(self.container, padding=(0, 0))
+        right_frame.grid(row=0, column=1, padx=16, pady=16, sticky="nsew")
+        right_frame.grid_columnconfigure(0, weight=1)
+        
+        # Applicant selection panel
+        applicant_frame = ttk.LabelFrame(right_frame, text=" Applicant Selection ", padding=(10, 5))
+        applicant_frame.grid(row=0, column=0, sticky="ew", pady=(0, 16))
+        
+        # Add heading with icon
+        app_heading = ttk.Frame(applicant_frame)
+        app_heading.pack(fill=tk.X, pady=(0, 8))
+        
+        app_heading_icon = ttk.Label(app_heading, text="👤", font=("Segoe UI", 11))
+        app_heading_icon.pack(side=tk.LEFT, padx=(0, 5))
+        
+        app_heading_text = ttk.Label(app_heading, text="Select an applicant", font=("Segoe UI", 10))
+        app_heading_text.pack(side=tk.LEFT)
+        
+        # Applicant dropdown with Windows 11 styling
+        dropdown_frame = ttk.Frame(applicant_frame)
+        dropdown_frame.pack(fill=tk.X, pady=5)
+        
+        self.applicant_var = tk.StringVar()
+        self.applicant_dropdown = ttk.Combobox(dropdown_frame, 
+                                             textvariable=self.applicant_var,
+                                             font=("Segoe UI", 9),
+                                             state="readonly",
+                                             height=5)
+        self.applicant_dropdown.pack(fill=tk.X)
+        
+        # Assigned files frame
+        assigned_frame = ttk.LabelFrame(right_frame, text=" Assigned Documents ", padding=(10, 5))
+        assigned_frame.grid(row=1, column=0, sticky="nsew", pady=(0, 16))
+        assigned_frame.grid_rowconfigure(1, weight=1)  # Ensure the assigned container expands
+        assigned_frame.grid_columnconfigure(0, weight=1)
+        
+        # Add heading with icon
+        assigned_heading = ttk.Frame(assigned_frame)
+        assigned_heading.grid(row=0, column=0, sticky="ew", pady=(0, 8))
+        
+        assigned_heading_icon = ttk.Label(assigned_heading, text="📋", font=("Segoe UI", 11))
+        assigned_heading_icon.pack(side=tk.LEFT, padx=(0, 5))
+        
+        assigned_heading_text = ttk.Label(assigned_heading, text="Documents assigned to this applicant", font=("Segoe UI", 10))
+        assigned_heading_text.pack(side=tk.LEFT)
+        
+        # Assigned listbox with custom styling
+        assigned_container = ttk.Frame(assigned_frame)
+        assigned_container.grid(row=1, column=0, sticky="nsew")
+        assigned_container.grid_rowconfigure(0, weight=1)
+        assigned_container.grid_columnconfigure(0, weight=1)
+        
+        # Create a frame for the listbox with a border
+        assigned_listbox_frame = tk.Frame(assigned_container, bg="white", highlightbackground="#E1DFDE", 
+                                        highlightthickness=1, bd=0)
+        assigned_listbox_frame.grid(row=0, column=0, sticky="nsew")
+        assigned_listbox_frame.grid_rowconfigure(0, weight=1)
+        assigned_listbox_frame.grid_columnconfigure(0, weight=1)
+        
+        self.assigned_listbox = tk.Listbox(assigned_listbox_frame,
+                                         selectmode=tk.SINGLE,
+                                         bg="white",
+                                         fg="#202020",
+                                         font=("Segoe UI", 9),
+                                         bd=0,
+                                         highlightthickness=0,
+                                         activestyle="none",
+                                         selectbackground="#CCE4F7",
+                                         selectforeground="#202020")
+        
+        assigned_scrollbar = ttk.Scrollbar(assigned_listbox_frame, orient=tk.VERTICAL, command=self.assigned_listbox.yview)
+        self.assigned_listbox.configure(yscrollcommand=assigned_scrollbar.set)
+        
+        self.assigned_listbox.grid(row=0, column=0, sticky="nsew")
+        assigned_scrollbar.grid(row=0, column=1, sticky="ns")
+        
+        # Status frame
+        status_frame = ttk.LabelFrame(right_frame, text=" Processing Status ", padding=(10, 5))
+        status_frame.grid(row=2, column=0, sticky="ew")
+        
+        # Add heading with icon
+        status_heading = ttk.Frame(status_frame)
+        status_heading.pack(fill=tk.X, pady=(0, 8))
+        
+        status_heading_icon = ttk.Label(status_heading, text="🔄", font=("Segoe UI", 11))
+        status_heading_icon.pack(side=tk.LEFT, padx=(0, 5))
+        
+        status_heading_text = ttk.Label(status_heading, text="Document processing status", font=("Segoe UI", 10))
+        status_heading_text.pack(side=tk.LEFT)
+        
+        # Status text with Windows 11 styling
+        status_text_frame = tk.Frame(status_frame, bg="white", highlightbackground="#E1DFDE", 
+                                    highlightthickness=1, bd=0)
+        status_text_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        self.status_text = tk.Text(status_text_frame, 
+                                 height=4, 
+                                 wrap=tk.WORD,
+                                 bg="white",
+                                 fg="#202020",
+                                 font=("Segoe UI", 9),
+                                 bd=0,
+                                 highlightthickness=0,
+                                 padx=8,
+                                 pady=8)
+        self.status_text.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        status_text_scrollbar = ttk.Scrollbar(status_text_frame, orient=tk.VERTICAL, command=self.status_text.yview)
+        self.status_text.configure(yscrollcommand=status_text_scrollbar.set)
+        status_text_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        # Add progress bar to status frame
+        progress_frame = ttk.Frame(status_frame)
+        progress_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        progress_label = ttk.Label(progress_frame, text="Progress:")
+        progress_label.pack(side=tk.LEFT, padx=(0, 5))
+        
+        self.progress_var = tk.DoubleVar()
+        self.progress_bar = ttk.Progressbar(
+            progress_frame, 
+            variable=self.progress_var,
+            maximum=100,
+            mode='determinate',
+            length=100
+        )
+        self.progress_bar.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
+        
+        self.progress_label = ttk.Label(progress_frame, text="0%", width=5)
+        self.progress_label.pack(side=tk.RIGHT)
+        
+        # Action button frame (bottom of the window)
+        button_frame = ttk.Frame(right_frame, padding=(0, 10))
+        button_frame.grid(row=3, column=0, sticky="ew", pady=(10, 0))
+        
+        button_grid = ttk.Frame(button_frame)
+        button_grid.pack(fill=tk.X)
+        button_grid.grid_columnconfigure(0, weight=1)
+        button_grid.grid_columnconfigure(1, weight=1)
+        
+        # Create assign button with icon
+        assign_button_frame = ttk.Frame(button_grid)
+        assign_button_frame.grid(row=0, column=0, sticky="ew", padx=(0, 5), pady=5)
+        assign_button_frame.grid_columnconfigure(0, weight=1)
+        
+        self.assign_button = ttk.Button(
+            assign_button_frame, 
+            text="Assign Document",
+            command=self.assign_document,
+            style="TButton",
+            width=20
+        )
+        self.assign_button.grid(row=0, column=0, sticky="ew")
+        
+        # Create remove button with icon
+        remove_button_frame = ttk.Frame(button_grid)
+        remove_button_frame.grid(row=0, column=1, sticky="ew", padx=(5, 0), pady=5)
+        remove_button_frame.grid_columnconfigure(0, weight=1)
+        
+        self.remove_button = ttk.Button(
+            remove_button_frame, 
+            text="Remove Assignment",
+            command=self.remove_assignment,
+            style="TButton",
+            width=20
+        )
+        self.remove_button.grid(row=0, column=0, sticky="ew")
+        
+        # Create submit button with accent style and BLACK text
+        submit_button_frame = ttk.Frame(button_grid)
+        submit_button_frame.grid(row=1, column=0, columnspan=2, sticky="ew", pady=5)
+        submit_button_frame.grid_columnconfigure(0, weight=1)
+        
+        self.submit_button = ttk.Button(
+            submit_button_frame, 
+            text="Submit Documents",
+            command=self.submit_to_textract,
+            style="AccentBlack.TButton",  # Changed to AccentBlack.TButton for black text
+            width=20
+        )
+        self.submit_button.grid(row=0, column=0, sticky="ew")
+        
+        # Create clear button
+        clear_button_frame = ttk.Frame(button_grid)
+        clear_button_frame.grid(row=2, column=0, columnspan=2, sticky="ew", pady=5)
+        clear_button_frame.grid_columnconfigure(0, weight=1)
+        
+        self.clear_button = ttk.Button(
+            clear_button_frame, 
+            text="Clear Status",
+            command=self.clear_status,
+            style="TButton",
+            width=20
+        )
+        self.clear_button.grid(row=0, column=0, sticky="ew")
+        
+        # Initialize the interface
+        self.load_applicants()
+        self.load_files()
+        
+        # Bind events
+        self.applicant_dropdown.bind('<<ComboboxSelected>>', self.on_applicant_selected)
+        
+        # Update status
+        self.update_status("Ready to process documents.")
+    
+    def find_and_set_icon(self):
+        """Find and set the icon by checking multiple possible locations"""
+        # Look for icon in possible locations
+        icon_paths = [
+            "logo/ka.ico",  # Original path
+            "ka.ico",       # Root directory
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "ka.ico"),
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "logo", "ka.ico"),
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "ka.ico"),
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "icons", "ka.ico")
+        ]
+        
+        # Print the current directory and searched locations for debugging
+        print(f"Current working directory: {os.getcwd()}")
+        print("Searching for icon in the following locations:")
+        for path in icon_paths:
+            print(f"  - {path} (Exists: {os.path.exists(path)})")
+        
+        # Try each path
+        for icon_path in icon_paths:
+            if os.path.exists(icon_path):
+                try:
+                    self.set_taskbar_icon(self.root, icon_path)
+                    print(f"✅ Successfully loaded icon from: {icon_path}")
+                    return
+                except Exception as e:
+                    print(f"❌ Error setting icon from {icon_path}: {str(e)}")
+    
+    def set_taskbar_icon(self, root, icon_path):
+        """Set both window and taskbar icons for a Tkinter application."""
+        import os
+        import sys
+        import ctypes
+        
+        # Set window icon using normal Tkinter approach
+        root.iconbitmap(icon_path)
+        
+        # For Windows taskbar icon
+        if sys.platform.startswith('win'):
+            # Get absolute path to the icon
+            abs_icon_path = os.path.abspath(icon_path)
+            
+            # Windows-specific method to set the taskbar icon
+            myappid = f'mycompany.documentprocessor.{os.path.basename(icon_path)}'  # Arbitrary string
+            ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID(myappid)
+            
+            # Set the icon for the process
+            if hasattr(ctypes.windll, 'user32'):
+                # Apply icon for taskbar
+                hwnd = ctypes.windll.user32.GetActiveWindow()
+                if hwnd:
+                    icon_handle = ctypes.windll.user32.LoadImageW(
+                        None, 
+                        abs_icon_path, 
+                        1,  # IMAGE_ICON
+                        0, 
+                        0, 
+                        0x00000010 | 0x00000040  # LR_LOADFROMFILE | LR_DEFAULTSIZE
+                    )
+                    if icon_handle:
+                        ctypes.windll.user32.SendMessageW(hwnd, 0x0080, 0, icon_handle)  # WM_SETICON, ICON_SMALL
+                        ctypes.windll.user32.SendMessageW(hwnd, 0x0080, 1, icon_handle)  # WM_SETICON, ICON_BIG
+    
+    def get_folder_path(self):
+        """Get the folder path for the current applicant"""
+        # Find the first applicant in the same application
+        current_applicant = next(
+            (app for app in self.applicant_details 
+             if f"{app['first_name']} {app['last_name']}" == self.applicant_var.get()),
+            None
+        )
+        
+        if not current_applicant:
+            return None
+            
+        # Use the first applicant's name as the folder name
+        first_applicant = self.applicant_details[0]  # Always use the first applicant's name for the folder
+        folder_name = f"{first_applicant['first_name']} {first_applicant['last_name']}"
+        
+        # Debug information
+        print(f"First applicant: {first_applicant}")
+        print(f"Folder name: {folder_name}")
+
+        return os.path.join(DOWNLOAD_PATH, folder_name)
+    
+    def get_applicant(self, applicant_name):
+        """Applicant details for a "First Last" name from the dropdown"""
+        return next(
+            (app for app in self.applicant_details 
+             if f"{app['first_name']} {app['last_name']}" == applicant_name),
+            None
+        )
+
+    def load_applicants(self):
+        """Load applicants into the dropdown"""
+        applicant_names = [
+            f"{app['first_name']} {app['last_name']}"
+            for app in self.applicant_details
+        ]
+        self.applicant_dropdown['values'] = applicant_names
+        if applicant_names:
+            self.applicant_dropdown.set(applicant_names[0])
+            print(f"Loaded applicants: {applicant_names}")
+    
+    def load_files(self):
+        """Load available files for the selected applicant"""
+        self.file_listbox.delete(0, tk.END)
+        folder_path = self.get_folder_path()
+        
+        if not folder_path:
+            print("No folder path found")
+            return
+            
+        if os.path.exists(folder_path):
+            print(f"Loading files from: {folder_path}")
+            current_applicant = self.applicant_var.get()
+            applicant = self.get_applicant(current_applicant)
+            listed = []
+            for file_name in os.listdir(folder_path):
+                file_path = os.path.join(folder_path, file_name)
+                # Skip bookkeeping files such as the timeline checkpoint
+                if os.path.isfile(file_path) and not file_name.startswith("."):
+                    # Check if the file is not processed and not assigned
+                    if (file_name not in self.processed_files.get(current_applicant, set()) and 
+                        file_name not in self.assignments.get(current_applicant, [])):
+                        self.file_listbox.insert(tk.END, file_name)
+                        listed.append(file_name)
+                        print(f"Added file to listbox: {file_name}")
+            # Hashing can take a while for large documents, so the ledger is checked off the Tk thread
+            if applicant and listed:
+                self._ledger_scan += 1
+                threading.Thread(
+                    target=self._scan_ledger,
+                    args=(self._ledger_scan, folder_path, listed, self.ledger_key(applicant)),
+                    daemon=True
+                ).start()
+        else:
+            print(f"Folder does not exist: {folder_path}")
+
+    def _scan_ledger(self, scan, folder_path, file_names, applicant_key):
+        """Worker: find the listed documents this applicant already sent in an earlier session"""
+        uploaded = {
+            file_name for file_name in file_names
+            if self.ledger.is_uploaded(os.path.join(folder_path, file_name), applicant_key)
+        }
+        if uploaded:
+            self.root.after(0, self._grey_out, scan, uploaded)
+
+    def _grey_out(self, scan, file_names):
+        if scan != self._ledger_scan:
+            return  # The list was reloaded meanwhile
+        for index, file_name in enumerate(self.file_listbox.get(0, tk.END)):
+            if file_name in file_names:
+                self.file_listbox.itemconfig(index, fg="#8A8A8A")
+
+    def ledger_key(self, applicant):
+        """Who a document was sent for in the upload ledger.
+
+        Applicant ids are created fresh every time a deal is scraped, so within a
+        known deal the applicant is identified by email or name instead.
+        """
+        if not self.deal_id:
+            return str(applicant["id"])
+        person = applicant.get("email") or " ".join(
+            part for part in (applicant.get("first_name"), applicant.get("last_name")) if part
+        )
+        return f"{self.deal_id}:{' '.join(person.lower().split())}"
+    
+    def update_status(self, message):
+        """Update the status text with timestamp"""
+        timestamp = time.strftime("%H:%M:%S")
+        self.status_text.insert(tk.END, f"[{timestamp}] {message}\n")
+        self.status_text.see(tk.END)
+    
+    def update_progress(self, percentage):
+        """Update progress bar and percentage display"""
+        self.progress_var.set(percentage)
+        self.progress_label.config(text=f"{int(percentage)}%")
+        self.root.update_idletasks()  # Force update of the UI
+    
+    def clear_status(self):
+        """Clear the status text"""
+        self.status_text.delete(1.0, tk.END)
+        self.update_status("Status cleared.")
+        # Reset progress bar
+        self.update_progress(0)
+    
+    def on_applicant_selected(self, event):
+        """Handle applicant selection change"""
+        self.load_files()
+        self.update_assigned_files()
+        self.update_status(f"Selected applicant: {self.applicant_var.get()}")
+    
+    def assign_document(self):
+        """Assign selected document to current applicant"""
+        selected_indices = self.file_listbox.curselection()
+        if not selected_indices:
+            messagebox.showwarning("Warning", "Please select a document to assign")
+            return
+        
+        selected_file = self.file_listbox.get(selected_indices[0])
+        selected_applicant = self.applicant_var.get()
+        
+        if selected_applicant not in self.assignments:
+            self.assignments[selected_applicant] = []
+        
+        self.assignments[selected_applicant].append(selected_file)
+        self.file_listbox.delete(selected_indices[0])
+        self.update_assigned_files()
+        self.update_status(f"Assigned '{selected_file}' to {selected_applicant}")
+    
+    def remove_assignment(self):
+        """Remove document assignment"""
+        selected_indices = self.assigned_listbox.curselection()
+        if not selected_indices:
+            messagebox.showwarning("Warning", "Please select a document to remove")
+            return
+        
+        selected_file = self.assigned_listbox.get(selected_indices[0])
+        selected_applicant = self.applicant_var.get()
+        
+        self.assignments[selected_applicant].remove(selected_file)
+        self.assigned_listbox.delete(selected_indices[0])
+        self.file_listbox.insert(tk.END, selected_file)
+        self.update_status(f"Removed '{selected_file}' from {selected_applicant}")
+    
+    def update_assigned_files(self):
+        """Update the assigned files listbox"""
+        self.assigned_listbox.delete(0, tk.END)
+        selected_applicant = self.applicant_var.get()
+        if selected_applicant in self.assignments:
+            for file_name in self.assignments[selected_applicant]:
+                self.assigned_listbox.insert(tk.END, file_name)
+    
+    def submit_to_textract(self):
+        """Submit assigned documents to Textract"""
+        if not any(self.assignments.values()):
+            messagebox.showwarning("Warning", "No documents have been assigned")
+            return
+        
+        # Start processing in a separate thread
+        processing_thread = threading.Thread(target=self._process_documents)
+        processing_thread.start()
+    
+    def _process_documents(self):
+        """Process documents in background thread; the UI is always released afterwards"""
+        error = None
+        try:
+            self._send_documents()
+        except Exception as e:
+            error = e
+            self.root.after(0, self.update_status, f"❌ Processing failed: {str(e)}")
+        finally:
+            self.root.after(0, self._after_processing, error)
+
+    def _send_documents(self):
+        """Hash, classify, optimize and upload the assigned documents: one upload per file, several at a time"""
+        import requests
+        from requests.adapters import HTTPAdapter
+        from document_optimizer import optimize_files
+
+        folder_path = self.get_folder_path()
+        if not folder_path:
+            raise IOError("Could not determine folder path")
+
+        # One upload per (applicant, file content); exact duplicates are not sent again
+        uploads = []
+        skipped = []
+        for applicant_name, files in self.assignments.items():
+            # Find applicant details
+            applicant = self.get_applicant(applicant_name)
+            if not applicant:
+                continue
+            batch_hashes = set()
+            for file_name in files:
+                file_path = os.path.join(folder_path, file_name)
+                if not os.path.isfile(file_path):
+                    continue
+                try:
+                    sha256 = self.ledger.hash_of(file_path)
+                except OSError as e:
+                    self.root.after(0, self.update_status, f"❌ Could not read {file_name}: {str(e)}")
+                    continue
+                previous = self.ledger.find(sha256, self.ledger_key(applicant))
+                if previous or sha256 in batch_hashes:
+                    skipped.append((applicant_name, file_name))
+                    original = f" as '{previous['file_name']}'" if previous and previous["file_name"] != file_name else ""
+                    self.root.after(0, self.update_status,
+                        f"⏭ {file_name} was already sent for {applicant_name}{original}, skipping")
+                    continue
+                batch_hashes.add(sha256)
+                uploads.append((applicant_name, applicant, file_name, file_path, sha256))
+
+        # Classify every document in one batch before the uploads start
+        doc_types = document_classifier.classify_files(
+            [path for _, _, _, path, _ in uploads],
+            hashes={path: sha256 for _, _, _, path, sha256 in uploads},
+        )
+
+        # Shrink oversized images and PDFs first; what is sent is the optimized copy
+        if uploads:
+            self.root.after(0, self.update_status, f"Optimizing {len(uploads)} documents...")
+        optimized = optimize_files((path, sha256) for _, _, _, path, sha256 in uploads)
+        saved_bytes = sum(before - after for _, _, before, after in optimized.values())
+        if saved_bytes > 0:
+            self.root.after(0, self.update_status,
+                f"Optimized documents: {saved_bytes / (1024 * 1024):.1f} MB less to upload")
+
+        # Progress is driven by bytes sent across all uploads
+        total_bytes = sum(optimized[path][3] for _, _, _, path, _ in uploads) or 1
+        self._sent_bytes = {}
+        self._progress_lock = threading.Lock()
+        self._last_percentage = -1
+        self.root.after(0, self.update_progress, 0)
+        self.root.after(0, self.update_status, f"Uploading {len(uploads)} documents...")
+
+        # One session so every upload reuses the same pooled connections
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=UPLOAD_WORKERS, pool_maxsize=UPLOAD_WORKERS)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        uploaded = []
+        with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+            futures = {}
+            for upload in uploads:
+                _, applicant, file_name, file_path, _ = upload
+                upload_path, upload_sha256, _, _ = optimized[file_path]
+                futures[executor.submit(
+                    self._upload_file, session, applicant, file_name, upload_path, doc_types[file_path], total_bytes,
+                    upload_sha256
+                )] = upload
+            for future in as_completed(futures):
+                applicant_name, applicant, file_name, file_path, sha256 = futures[future]
+                try:
+                    queue_info = future.result()
+                    uploaded.append((applicant_name, file_name))
+                    self.ledger.record(sha256, self.ledger_key(applicant), file_name, os.path.getsize(file_path), self.application_id)
+                    self.root.after(0, self.update_status,
+                        f"✅ {file_name} for {applicant_name} successfully queued and being processed{queue_info}")
+                except Exception as e:
+                    self.root.after(0, self.update_status,
+                        f"❌ Failed to process {file_name} for {applicant_name}: {str(e)}")
+
+        session.close()
+
+        # Set progress to 100% when complete
+        self.root.after(0, self.update_progress, 100)
+
+        # Mark uploaded and skipped files as processed; failed ones stay assigned so they can be retried
+        for applicant_name, file_name in uploaded + skipped:
+            self.processed_files.setdefault(applicant_name, set()).add(file_name)
+            self.assignments[applicant_name].remove(file_name)
+
+
+    def _report_bytes(self, file_path, bytes_read, total_bytes):
+        """MultipartEncoderMonitor callback: move the progress bar by bytes sent"""
+        with self._progress_lock:
+            self._sent_bytes[file_path] = bytes_read
+            percentage = min(int(sum(self._sent_bytes.values()) * 100 / total_bytes), 99)
+            if percentage == self._last_percentage:
+                return
+            self._last_percentage = percentage
+        self.root.after(0, self.update_progress, percentage)
+
+    def _upload_file(self, session, applicant, file_name, file_path, doc_type, total_bytes, sha256=None):
+        """Upload one file to the Textract middleware, retrying with backoff; returns the queue info"""
+        from requests_toolbelt.multipart.encoder import MultipartEncoderMonitor
+
+        metadata = get_file_metadata(file_path)
+        size = os.path.getsize(file_path)
+        if sha256 and size >= CHUNKED_UPLOAD_THRESHOLD:
+            return self._upload_file_chunked(session, applicant, file_name, file_path, doc_type, total_bytes, sha256)
+
+        for attempt in range(1, UPLOAD_RETRIES + 1):
+            try:
+                with open(file_path, "rb") as file_obj:
+                    # Create multipart form-data for this file
+                    # Use self.application_id here instead of application_id
+                    multipart_data = self._create_multipart_data(
+                        [(file_name, file_obj, metadata["mime_type"], doc_type)], applicant, self.application_id
+                    )
+                    monitor = MultipartEncoderMonitor(
+                        multipart_data,
+                        lambda m: self._report_bytes(file_path, min(m.bytes_read, size), total_bytes)
+                    )
+
+                    # Send to Textract middleware
+                    response = session.post(
+                        UPLOAD_URL,
+                        data=monitor,
+                        headers={"Content-Type": monitor.content_type},
+                        timeout=UPLOAD_TIMEOUT
+                    )
+
+                if response.status_code in (200, 201):
+                    self._report_bytes(file_path, size, total_bytes)
+                    return self._queue_info(response)
+
+                # Client errors will not go away by retrying
+                if 400 <= response.status_code < 500 and response.status_code != 429:
+                    raise UploadRejected(response.text)
+                error = f"HTTP {response.status_code}: {response.text}"
+            except UploadRejected:
+                raise
+            except Exception as e:
+                error = str(e)
+
+            # Start this file's bytes over for the next attempt
+            self._report_bytes(file_path, 0, total_bytes)
+            if attempt < UPLOAD_RETRIES:
+                backoff = 2 ** attempt
+                self.root.after(0, self.update_status,
+                    f"Retrying {file_name} in {backoff}s (attempt {attempt} failed: {error})")
+                time.sleep(backoff)
+
+        raise Exception(error)
+
+    def _upload_file_chunked(self, session, applicant, file_name, file_path, doc_type, total_bytes, sha256):
+        """Resumable upload: open (or reopen) an upload, send the missing chunks, then commit.
+
+        The middleware derives the upload id from the content hash and applicant,
+        so after a failure, or a restart of the window, sending starts again at
+        the offset the server already has rather than at zero.
+        """
+        size = os.path.getsize(file_path)
+        applicant_data = {
+            "applicant_id": applicant["id"],
+            "first_name": applicant["first_name"],
+            "last_name": applicant["last_name"],
+            "application_id": self.application_id
+        }
+        failures = 0
+        while True:
+            try:
+                response = session.post(UPLOAD_SESSIONS_URL, json={
+                    "file_name": file_name,
+                    "size": size,
+                    "sha256": sha256,
+                    "mime_type": get_file_metadata(file_path)["mime_type"],
+                    "document_type": doc_type,
+                    "applicant": applicant_data
+                }, timeout=UPLOAD_TIMEOUT)
+                if 400 <= response.status_code < 500 and response.status_code != 429:
+                    raise UploadRejected(response.text)
+                response.raise_for_status()
+                upload_id = response.json()["upload_id"]
+                offset = response.json()["offset"]
+                if offset:
+                    self.root.after(0, self.update_status, f"Resuming {file_name} at {offset} of {size} bytes")
+
+                with open(file_path, "rb") as file_obj:
+                    while offset < size:
+                        self._report_bytes(file_path, offset, total_bytes)
+                        file_obj.seek(offset)
+                        chunk = file_obj.read(UPLOAD_CHUNK_SIZE)
+                        response = session.put(
+                            f"{UPLOAD_SESSIONS_URL}/{upload_id}",
+                            data=chunk,
+                            headers={"Content-Type": "application/octet-stream", "Upload-Offset": str(offset)},
+                            timeout=UPLOAD_TIMEOUT
+                        )
+                        # 409: the server has a different offset (e.g. our last response was lost)
+                        if response.status_code not in (200, 409):
+                            # Client errors will not go away by retrying
+                            if 400 <= response.status_code < 500 and response.status_code not in (422, 429):
+                                raise UploadRejected(response.text)
+                            response.raise_for_status()
+                        offset = response.json()["offset"]
+                        failures = 0
+
+                response = session.post(f"{UPLOAD_SESSIONS_URL}/{upload_id}/commit", timeout=UPLOAD_TIMEOUT)
+                if response.status_code in (200, 201):
+                    self._report_bytes(file_path, size, total_bytes)
+                    return self._queue_info(response)
+                # 409 (incomplete) or 422 (checksum mismatch): reopen and send what is missing
+                if response.status_code not in (409, 422):
+                    if 400 <= response.status_code < 500 and response.status_code != 429:
+                        raise UploadRejected(response.text)
+                    response.raise_for_status()
+                error = f"HTTP {response.status_code}: {response.text}"
+            except UploadRejected:
+                raise
+            except Exception as e:
+                error = str(e)
+
+            failures += 1
+            if failures >= UPLOAD_RETRIES:
+                raise Exception(error)
+            backoff = 2 ** failures
+            self.root.after(0, self.update_status,
+                f"Resuming {file_name} in {backoff}s (attempt {failures} failed: {error})")
+            time.sleep(backoff)
+
+    def _queue_info(self, response):
+        """Parse the queue status from the middleware response"""
+        queue_info = ""
+        try:
+            resp_data = response.json()
+            if "queueStatus" in resp_data:
+                status = resp_data["queueStatus"]
+                queue_info = f" (Files in queue: {status.get('remainingInQueue', 0)})"
+        except Exception as e:
+            print(f"Error parsing queue status: {str(e)}")
+        return queue_info
+
+    def _create_multipart_data(self, files_to_upload, applicant, application_id):
+        from requests_toolbelt.multipart.encoder import MultipartEncoder
+        fields = []
+        
+        # Add each file with the same field name 'files'
+        for i, (file_name, file_obj, mime_type, doc_type) in enumerate(files_to_upload):
+            # Keep the field name 'files' the same for all files
+            fields.append(
+                ('files', (file_name, file_obj, mime_type))
+            )
+            # Add document type for each file
+            fields.append(
+                (f'document_type_{file_name}', doc_type)
+            )
+        
+        # Add applicant data
+        fields.append(('applicant', json.dumps({
+            "applicant_id": applicant["id"],
+            "first_name": applicant["first_name"],
+            "last_name": applicant["last_name"],
+            "application_id": application_id
+        })))
+        
+        # Print debug info
+        print(f"Creating request with {len(files_to_upload)} files")
+        for i, (file_name, _, _, doc_type) in enumerate(files_to_upload):
+            print(f"  File {i+1}: {file_name} (Type: {doc_type})")
+        
+        # Return the MultipartEncoder with all fields
+        return MultipartEncoder(fields=fields)
+    
+    def _after_processing(self, error=None):
+        """Update UI after processing completes (or stops on error)"""
+        self.update_assigned_files()
+        self.load_files()
+        if error is not None:
+            self.update_progress(0)
+            self.update_status("Processing stopped. Unsent documents are still assigned.")
+            messagebox.showerror("Error", f"Documents could not be submitted: {str(error)}")
+            return
+        self.update_status("Processing complete. Ready for more documents.")
+        messagebox.showinfo("Success", "Documents have been submitted for processing")
+
+def get_file_metadata(file_path):
+    """Get file metadata including MIME type"""
+    file_name = os.path.basename(file_path)
+    file_extension = os.path.splitext(file_name)[1]  # Get file extension
+    mime_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"  # Guess MIME type
+    return {"file_name": file_name, "file_extension": file_extension, "mime_type": mime_type}
+
+def get_document_type(file_name, file_path=None):
+    """Get document type based on file name, or on the file itself when its path is known"""
+    if file_path:
+        return document_classifier.classify(file_path)
+    return document_classifier.classify_name(file_name)
+
+class DealNotebook:
+    """Long-lived file selector window: every deal sent by rpa.py opens as its own tab"""
+    POLL_MS = 250
+
+    # Same window/taskbar icon handling as a standalone FileSelectorApp
+    find_and_set_icon = FileSelectorApp.find_and_set_icon
+    set_taskbar_icon = FileSelectorApp.set_taskbar_icon
+
+    def __init__(self, root, inbox):
+        self.root = root
+        self.inbox = inbox
+        self.root.title("Document Assignment Tool")
+        self.root.geometry("1000x760")
+        self.root.configure(bg="#F3F3F3")  # Windows 11 background color
+        self.theme = Windows11Theme(root)
+        self.find_and_set_icon()
+
+        toolbar = ttk.Frame(self.root, padding=(16, 8, 16, 0))
+        toolbar.pack(fill=tk.X)
+        self.summary_label = ttk.Label(toolbar, text="Waiting for deals...", font=("Segoe UI", 10))
+        self.summary_label.pack(side=tk.LEFT)
+        ttk.Button(toolbar, text="Close Deal", command=self.close_current, style="TButton").pack(side=tk.RIGHT)
+
+        self.notebook = ttk.Notebook(self.root)
+        self.notebook.pack(fill=tk.BOTH, expand=True)
+        self.apps = {}  # tab frame -> FileSelectorApp
+
+        self.root.after(self.POLL_MS, self.poll_inbox)
+
+    def poll_inbox(self):
+        """Open queued deals on the Tk thread (the inbox is filled from a socket thread)"""
+        while True:
+            try:
+                deal = self.inbox.deals.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                self.open_deal(deal["applicant_details"], deal["application_id"], deal.get("deal_id"))
+            except Exception as e:
+                print(f"Error opening deal: {str(e)}")
+        self.root.after(self.POLL_MS, self.poll_inbox)
+
+    def open_deal(self, applicant_details, application_id, deal_id=None):
+        frame = ttk.Frame(self.notebook)
+        self.apps[frame] = FileSelectorApp(self.root, applicant_details, application_id, parent=frame, deal_id=deal_id)
+
+        first = applicant_details[0] if applicant_details else {}
+        title = f"{first.get('first_name', '')} {first.get('last_name', '')}".strip() or "Deal"
+        if application_id:
+            title = f"{title} (#{application_id})"
+        self.notebook.add(frame, text=title)
+        self.notebook.select(frame)
+        self.update_summary()
+
+        # Bring the window to the front for the broker
+        self.root.deiconify()
+        self.root.lift()
+        self.root.focus_force()
+
+    def close_current(self):
+        current = self.notebook.select()
+        if not current:
+            return
+        frame = self.root.nametowidget(current)
+        self.notebook.forget(frame)
+        self.apps.pop(frame, None)
+        frame.destroy()
+        self.update_summary()
+
+    def update_summary(self):
+        count = len(self.apps)
+        self.summary_label.config(text=f"{count} deal(s) open" if count else "Waiting for deals...")
@@ -0,0 +1,111 @@
+import os
+import sys
+import time
+import queue
+import logging
+import secrets
+import threading
+import subprocess
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener, Client
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Local endpoint of the long-lived file selector (see gui_launcher.py --serve)
+FILE_SELECTOR_HOST = os.getenv("FILE_SELECTOR_HOST", "localhost")
+FILE_SELECTOR_PORT = int(os.getenv("FILE_SELECTOR_PORT", "2501"))
+FILE_SELECTOR_ADDRESS = (FILE_SELECTOR_HOST, FILE_SELECTOR_PORT)
+FILE_SELECTOR_KEY_PATH = os.getenv("FILE_SELECTOR_KEY_PATH", os.path.join(script_dir, ".file_selector.key"))
+FILE_SELECTOR_START_TIMEOUT = int(os.getenv("FILE_SELECTOR_START_TIMEOUT", "15"))
+
+
+def load_authkey(path=FILE_SELECTOR_KEY_PATH):
+    """Shared secret for the connection; created on first use and reused by both sides"""
+    if not os.path.exists(path):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(secrets.token_hex(32).encode())
+        try:
+            # Two processes racing here both end up with the file written first
+            os.link(tmp_path, path)
+        except (OSError, AttributeError):
+            pass
+        finally:
+            os.remove(tmp_path)
+    with open(path, "rb") as f:
+        return f.read().strip()
+
+
+class DealInbox:
+    """Server side: accepts deals from rpa.py and queues them for the Tk main loop"""
+    def __init__(self, address=FILE_SELECTOR_ADDRESS):
+        self.listener = Listener(address, authkey=load_authkey())
+        self.deals = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._accept_loop, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn = self.listener.accept()
+            except (AuthenticationError, EOFError, ConnectionError) as e:
+                # Wrong authkey or a client that went away mid-handshake
+                logging.warning(f"File selector: rejected connection: {e}")
+                continue
+            except OSError as e:
+                # The listener was closed, or its socket failed: accept() would fail forever
+                if not self._closed:
+                    logging.error(f"File selector: stopped accepting deals: {e}")
+                return
+            with conn:
+                try:
+                    self.deals.put(conn.recv())
+                    conn.send({"status": "queued"})
+                except (EOFError, OSError) as e:
+                    logging.warning(f"File selector: dropped message: {e}")
+
+    def close(self):
+        self._closed = True
+        self.listener.close()
+
+
+def _send(message, address=FILE_SELECTOR_ADDRESS):
+    with Client(address, authkey=load_authkey()) as conn:
+        conn.send(message)
+        return conn.recv()
+
+
+def launch_file_selector():
+    """Start the file selector window process; returns the Popen handle"""
+    gui_launcher = os.path.join(script_dir, "gui_launcher.py")
+    creation_flags = subprocess.CREATE_NEW_PROCESS_GROUP if sys.platform == 'win32' else 0
+    return subprocess.Popen([sys.executable, gui_launcher, "--serve"], creationflags=creation_flags)
+
+
+def send_deal(applicant_details, application_id, on_launch=None, deal_id=None):
+    """Open a deal in the running file selector, starting it first if needed.
+
+    on_launch(process) is called with the Popen handle when a new window process
+    had to be started. Raises ConnectionError if the window cannot be reached.
+    """
+    message = {"type": "deal", "applicant_details": applicant_details, "application_id": application_id, "deal_id": deal_id}
+    try:
+        return _send(message)
+    except ConnectionRefusedError:
+        pass
+
+    process = launch_file_selector()
+    if on_launch:
+        on_launch(process)
+    deadline = time.time() + FILE_SELECTOR_START_TIMEOUT
+    # Keep trying even if our process exits: another deal may have started the window first
+    while time.time() < deadline:
+        try:
+            return _send(message)
+        except ConnectionRefusedError:
+            time.sleep(0.2)
+    raise ConnectionError("File selector did not start")
@@ -2,22 +2,75 @@ import tkinter as tk
 import sys
 import json
 import os
+import time
+
+def benchmark():
+    """Time how long the file selector takes to import, build and draw its window"""
+    started = time.perf_counter()
+    from file_selector import FileSelectorApp
+    imported = time.perf_counter()
+
+    root = tk.Tk()
+    applicants = [{"id": 0, "first_name": "Benchmark", "last_name": "Applicant"}]
+    FileSelectorApp(root, applicants, None)
+    built = time.perf_counter()
+
+    root.update()
+    drawn = time.perf_counter()
+    root.destroy()
+
+    print(f"import file_selector: {(imported - started) * 1000:7.1f} ms")
+    print(f"build window:         {(built - imported) * 1000:7.1f} ms")
+    print(f"first draw:           {(drawn - built) * 1000:7.1f} ms")
+    print(f"total:                {(drawn - started) * 1000:7.1f} ms")
+
+def serve():
+    """Run the persistent file selector that rpa.py sends deals to"""
+    from gui_ipc import DealInbox
+    from file_selector import DealNotebook
+
+    try:
+        inbox = DealInbox().start()
+    except OSError as e:
+        # Another file selector already owns the address
+        print(f"File selector is already running: {e}")
+        sys.exit(0)
+
+    root = tk.Tk()
+    DealNotebook(root, inbox)
+    root.mainloop()
+    inbox.close()
 
 def main():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.append(script_dir)
+
+    if sys.argv[1:] == ["--benchmark"]:
+        benchmark()
+        return
+
+    if sys.argv[1:] == ["--serve"]:
+        serve()
+        return
+
     if len(sys.argv) != 2:
-        print("Usage: temp_gui_launcher.py <data_file>")
+        print("Usage: gui_launcher.py <data_file> | --serve | --benchmark")
         sys.exit(1)
     
-    with open(sys.argv[1], 'r') as f:
-        data = json.load(f)
+    try:
+        with open(sys.argv[1], 'r') as f:
+            data = json.load(f)
+    finally:
+        # The data file is a one-off written by rpa.py for this window only
+        os.remove(sys.argv[1])
     
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    sys.path.append(script_dir)
-    from rpa import FileSelectorApp
+    # file_selector only needs the standard library, so the window opens without
+    # loading selenium, supabase or flask
+    from file_selector import FileSelectorApp
     
     root = tk.Tk()
-    app = FileSelectorApp(root, data['applicant_details'], data['application_id'])
+    app = FileSelectorApp(root, data['applicant_details'], data['application_id'], deal_id=data.get('deal_id'))
     root.mainloop()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
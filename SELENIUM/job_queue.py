@@ -0,0 +1,258 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Queue configuration (override through environment variables)
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", os.path.join(script_dir, "jobs.db"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))
+JOB_QUEUE_LIMIT = int(os.getenv("JOB_QUEUE_LIMIT", "100"))
+# Seconds during which a finished job is handed back for a repeat submission with the same key
+JOB_DEDUPE_WINDOW = int(os.getenv("JOB_DEDUPE_WINDOW", "600"))
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_SUCCEEDED = "succeeded"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+# Was running when the service stopped; it may have done part of its work, so it is not rerun
+STATUS_INTERRUPTED = "interrupted"
+FINISHED_STATUSES = (STATUS_SUCCEEDED, STATUS_FAILED, STATUS_CANCELLED, STATUS_INTERRUPTED)
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once cancellation has been requested"""
+
+
+class QueueFull(Exception):
+    """Raised by submit() when the queue already holds JOB_QUEUE_LIMIT pending jobs"""
+
+
+class JobHandle:
+    """Handed to the job function so it can check for cancellation between steps"""
+    def __init__(self, queue, job_id):
+        self.queue = queue
+        self.id = job_id
+
+    def is_cancelled(self):
+        return self.queue._cancel_requested(self.id)
+
+    def check_cancelled(self):
+        if self.is_cancelled():
+            raise JobCancelled(f"Job {self.id} was cancelled")
+
+
+class JobQueue:
+    """Bounded worker pool over a SQLite-backed job queue.
+
+    Jobs survive a restart of the service: anything still queued is picked up
+    again when start() is called. A job that was running is marked interrupted
+    rather than rerun, since it may already have written its results; it runs
+    again only when it is submitted again.
+    """
+    def __init__(self, handler, db_path=JOB_DB_PATH, workers=JOB_WORKERS, max_queued=JOB_QUEUE_LIMIT,
+                 dedupe_window=JOB_DEDUPE_WINDOW):
+        # handler(payload, job_handle) -> JSON serialisable result
+        self.handler = handler
+        self.db_path = db_path
+        self.workers = max(1, workers)
+        self.max_queued = max_queued
+        self.dedupe_window = dedupe_window
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._threads = []
+        self._stopping = False
+
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._lock:
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    dedupe_key TEXT
+                )
+            """)
+            # Databases created before dedupe_key existed
+            columns = [row["name"] for row in self._db.execute("PRAGMA table_info(jobs)")]
+            if "dedupe_key" not in columns:
+                self._db.execute("ALTER TABLE jobs ADD COLUMN dedupe_key TEXT")
+            self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS jobs_dedupe ON jobs (dedupe_key, created_at)")
+            self._db.commit()
+
+    def start(self):
+        """Mark jobs cut off by a restart as interrupted and start the worker threads"""
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE status = ?",
+                (STATUS_INTERRUPTED, "Interrupted by a restart of the service; submit it again to rerun",
+                 time.time(), STATUS_RUNNING)
+            )
+            self._db.commit()
+            if cursor.rowcount:
+                logging.warning(f"Job queue: {cursor.rowcount} job(s) were interrupted by a restart and need resubmitting")
+
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"job-worker-{i + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logging.info(f"Job queue: started {self.workers} worker(s)")
+
+    def stop(self):
+        with self._lock:
+            self._stopping = True
+            self._wakeup.notify_all()
+
+    def submit(self, payload, dedupe_key=None, force=False):
+        """Persist a new job and wake a worker; returns the job record.
+
+        When dedupe_key is given and a job with the same key is still queued or
+        running, or succeeded less than dedupe_window seconds ago, that job is
+        returned instead (flagged "deduplicated") unless force is set.
+        """
+        with self._lock:
+            existing = self._find_duplicate(dedupe_key) if dedupe_key and not force else None
+            if existing is None:
+                pending = self._db.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = ?", (STATUS_QUEUED,)
+                ).fetchone()[0]
+                if pending >= self.max_queued:
+                    raise QueueFull(f"{pending} jobs are already waiting")
+
+                job_id = uuid.uuid4().hex
+                self._db.execute(
+                    "INSERT INTO jobs (id, status, payload, created_at, dedupe_key) VALUES (?, ?, ?, ?, ?)",
+                    (job_id, STATUS_QUEUED, json.dumps(payload), time.time(), dedupe_key)
+                )
+                self._db.commit()
+                self._wakeup.notify()
+
+        if existing:
+            logging.info(f"Job queue: {dedupe_key} is already handled by job {existing}")
+            return dict(self.get(existing), deduplicated=True)
+        logging.info(f"Job queue: queued job {job_id}")
+        return self.get(job_id)
+
+    def _find_duplicate(self, dedupe_key):
+        """Id of an in-flight or recently succeeded job with this key (caller holds the lock)"""
+        row = self._db.execute(
+            """
+            SELECT id FROM jobs
+            WHERE dedupe_key = ?
+              AND (status IN (?, ?) OR (status = ? AND finished_at >= ?))
+            ORDER BY created_at DESC LIMIT 1
+            """,
+            (dedupe_key, STATUS_QUEUED, STATUS_RUNNING, STATUS_SUCCEEDED, time.time() - self.dedupe_window)
+        ).fetchone()
+        return row["id"] if row else None
+
+    def get(self, job_id):
+        """Return the job record as a dict, or None if the id is unknown"""
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            position = None
+            if row and row["status"] == STATUS_QUEUED:
+                position = self._db.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = ? AND created_at < ?",
+                    (STATUS_QUEUED, row["created_at"])
+                ).fetchone()[0] + 1
+        if not row:
+            return None
+
+        job = {
+            "id": row["id"],
+            "status": row["status"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+            "cancel_requested": bool(row["cancel_requested"]),
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+        }
+        if position is not None:
+            job["queue_position"] = position
+        return job
+
+    def cancel(self, job_id):
+        """Cancel a queued job immediately, or ask a running job to stop"""
+        with self._lock:
+            row = self._db.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if not row:
+                return None
+            if row["status"] == STATUS_QUEUED:
+                self._db.execute(
+                    "UPDATE jobs SET status = ?, cancel_requested = 1, finished_at = ? WHERE id = ?",
+                    (STATUS_CANCELLED, time.time(), job_id)
+                )
+            elif row["status"] == STATUS_RUNNING:
+                self._db.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+            self._db.commit()
+        logging.info(f"Job queue: cancellation requested for job {job_id}")
+        return self.get(job_id)
+
+    def _cancel_requested(self, job_id):
+        with self._lock:
+            row = self._db.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def _claim_next(self):
+        """Atomically move the oldest queued job to running (caller holds the lock)"""
+        row = self._db.execute(
+            "SELECT id, payload FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+            (STATUS_QUEUED,)
+        ).fetchone()
+        if not row:
+            return None
+        self._db.execute(
+            "UPDATE jobs SET status = ?, started_at = ? WHERE id = ?",
+            (STATUS_RUNNING, time.time(), row["id"])
+        )
+        self._db.commit()
+        return row["id"], json.loads(row["payload"])
+
+    def _finish(self, job_id, status, result=None, error=None):
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error, time.time(), job_id)
+            )
+            self._db.commit()
+
+    def _worker_loop(self):
+        while True:
+            with self._lock:
+                claimed = None
+                while not self._stopping:
+                    claimed = self._claim_next()
+                    if claimed:
+                        break
+                    self._wakeup.wait()
+                if self._stopping:
+                    return
+
+            job_id, payload = claimed
+            logging.info(f"Job queue: running job {job_id}")
+            try:
+                result = self.handler(payload, JobHandle(self, job_id))
+                self._finish(job_id, STATUS_SUCCEEDED, result=result)
+                logging.info(f"Job queue: job {job_id} succeeded")
+            except JobCancelled:
+                self._finish(job_id, STATUS_CANCELLED)
+                logging.info(f"Job queue: job {job_id} cancelled")
+            except Exception as e:
+                self._finish(job_id, STATUS_FAILED, error=str(e))
+                logging.error(f"Job queue: job {job_id} failed: {e}")
@@ -0,0 +1,154 @@
+import os
+import re
+import time
+import logging
+import threading
+import requests
+
+LENDER_CACHE_TTL = int(os.getenv("LENDER_CACHE_TTL", "3600"))
+# After a failed load, wait this long before trying again (doubling per failure, up to the TTL)
+LENDER_RETRY_BACKOFF = int(os.getenv("LENDER_RETRY_BACKOFF", "30"))
+SUPABASE_PAGE_SIZE = 1000
+APITABLE_PAGE_SIZE = 1000
+
+# Words that do not tell two lenders apart ("Bank of Melbourne Pty Ltd" == "bank of melbourne")
+LENDER_NAME_NOISE = {"the", "pty", "ltd", "limited", "co", "inc"}
+
+
+def normalize_lender_name(name):
+    words = re.sub(r"[^a-z0-9]+", " ", (name or "").lower()).split()
+    return " ".join(w for w in words if w not in LENDER_NAME_NOISE)
+
+
+def load_supabase_lenders(supabase):
+    """Every (name, row) in Lenders_Hub, fetched a page at a time"""
+    lenders, start = [], 0
+    while True:
+        response = (
+            supabase.table("Lenders_Hub").select("id, company_name")
+            .range(start, start + SUPABASE_PAGE_SIZE - 1).execute()
+        )
+        rows = response.data or []
+        lenders.extend((row["company_name"], row) for row in rows if row.get("company_name"))
+        if len(rows) < SUPABASE_PAGE_SIZE:
+            return lenders
+        start += SUPABASE_PAGE_SIZE
+
+
+def apitable_lender_loader(lender_api_url, headers):
+    """Loader returning every (name, record) of the APITable Lender Hub"""
+    def load():
+        lenders, page = [], 1
+        while True:
+            response = requests.get(
+                lender_api_url, headers=headers,
+                params={"pageSize": APITABLE_PAGE_SIZE, "pageNum": page}, timeout=30
+            )
+            response.raise_for_status()
+            data = response.json().get("data", {})
+            records = data.get("records", [])
+            lenders.extend(
+                (r["fields"]["Company Name"], r) for r in records if r.get("fields", {}).get("Company Name")
+            )
+            if not records or page * APITABLE_PAGE_SIZE >= data.get("total", 0):
+                return lenders
+            page += 1
+    return load
+
+
+class LenderDirectory:
+    """In-process copy of a lender table with exact and normalized name lookups.
+
+    The whole table is loaded at once and reloaded when it is older than ttl
+    seconds (on the next lookup) or when refresh() is called. While the lender
+    source is failing, lookups keep using the previous copy and only retry after
+    a backoff, instead of every lookup waiting on another failed load.
+    """
+    def __init__(self, loader, ttl=LENDER_CACHE_TTL, name="lenders", retry_backoff=LENDER_RETRY_BACKOFF):
+        # loader() returns an iterable of (company_name, record)
+        self.loader = loader
+        self.ttl = ttl
+        self.name = name
+        self.retry_backoff = retry_backoff
+        self._lock = threading.Lock()
+        self._exact = {}
+        self._normalized = {}
+        self._loaded_at = None
+        self._failed_at = None
+        self._failures = 0  # Consecutive failed loads
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def start(self):
+        """Load the directory in the background so the first deal does not wait for it"""
+        threading.Thread(target=self.refresh, daemon=True).start()
+
+    def refresh(self):
+        """Reload every lender; keeps the previous copy if the load fails"""
+        started = time.time()
+        try:
+            lenders = list(self.loader())
+        except Exception as e:
+            with self._lock:
+                self._failed_at = time.time()
+                self._failures += 1
+                retry_in = self._retry_delay()
+            logging.error(f"Lender directory ({self.name}): refresh failed, retrying in {retry_in:.0f}s: {e}")
+            return False
+
+        exact, normalized = {}, {}
+        for company_name, record in lenders:
+            exact.setdefault(company_name, record)
+            normalized.setdefault(normalize_lender_name(company_name), record)
+        with self._lock:
+            self._exact, self._normalized = exact, normalized
+            self._loaded_at = time.time()
+            self._failed_at = None
+            self._failures = 0
+            self.refreshes += 1
+        logging.info(f"Lender directory ({self.name}): loaded {len(exact)} lenders in {time.time() - started:.2f}s")
+        return True
+
+    def _retry_delay(self):
+        return min(self.retry_backoff * 2 ** (self._failures - 1), self.ttl)
+
+    def _ensure_fresh(self):
+        with self._lock:
+            now = time.time()
+            stale = self._loaded_at is None or now - self._loaded_at > self.ttl
+            backing_off = self._failed_at is not None and now - self._failed_at < self._retry_delay()
+        if stale and not backing_off:
+            self.refresh()
+
+    def get(self, company_name):
+        """Return the lender record for company_name, or None"""
+        if not company_name:
+            return None
+        self._ensure_fresh()
+        with self._lock:
+            record = self._exact.get(company_name) or self._normalized.get(normalize_lender_name(company_name))
+            if record is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return record
+
+    def search(self, text):
+        """Every lender whose name contains text (what APITable's FIND() matched)"""
+        self._ensure_fresh()
+        with self._lock:
+            return [record for company_name, record in self._exact.items() if text in company_name]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "lenders": len(self._exact),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "refreshes": self.refreshes,
+                "failures": self._failures,
+                "age_seconds": round(time.time() - self._loaded_at, 1) if self._loaded_at else None,
+            }
@@ -2,33 +2,43 @@ import os
 import time
 import json
 import requests
-import mimetypes
 import re
-import tkinter as tk
 import sys
 import threading
 import pythoncom
 import ctypes
 import logging
 import subprocess
-from tkinter import ttk, messagebox
+import tempfile
+import atexit
+from urllib.parse import urljoin, urlsplit
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.support.ui import Select
-from webdriver_manager.chrome import ChromeDriverManager
-from requests_toolbelt.multipart.encoder import MultipartEncoder
-from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+from selenium.common.exceptions import TimeoutException
 from supabase import create_client, Client
+from postgrest.exceptions import APIError
 from dotenv import load_dotenv
 from fact_find import extract_fact_find
+from gui_ipc import send_deal
+from file_selector import DOWNLOAD_PATH
+from driver_pool import DriverPool, clone_profile, DRIVER_POOL_SIZE
+from angular_wait import wait_until
+from download_watcher import DownloadWatcher
+from document_downloader import DocumentDownloader, session_from_driver
+# TimelineCheckpoint, checkpoint_path, WebDriverWait and TimeoutException are used by the
+# document and broker tools steps of run_deal, which are currently switched off
+from timeline_index import TimelineCheckpoint, build_timeline_index, checkpoint_path
+from session_vault import SessionVault, ensure_logged_in
+from lender_directory import LenderDirectory, load_supabase_lenders, apitable_lender_loader
+from job_queue import JobQueue, QueueFull, STATUS_RUNNING, FINISHED_STATUSES
 
 load_dotenv()
 
@@ -46,29 +56,17 @@ logging.basicConfig(
 app = Flask(__name__)
 CORS(app)
 
-# Global variables for process management
-active_gui_process = None
-active_driver = None
+# File selector GUI processes launched for finished deals
+gui_processes = []
+gui_processes_lock = threading.Lock()
 script_dir = os.path.dirname(os.path.abspath(__file__))
 
-DOWNLOAD_PATH = r"C:\Users\user\Desktop\Complete\SELENIUM\docs"
-
-classified_documents = {
-    "bank_statement": [
-        "bank", "statement", "transaction", "account", "banking",
-        "deposit", "withdrawal", "balance", "credit", "debit",
-        "interest", "overdraft", "transfer", "statement period",
-        "monthly statement", "checking", "savings", "financial summary",
-        "ledger", "IBAN", "SWIFT", "sort code"
-    ],
-    "drivers_license": ["license", "driver", "driving", "licence", "id"],
-    "passport_id": ["passport"],
-    "national_id": ["national", "id", "identification", "citizen", "citizenship", "residency"],
-    "utility_bill": ["bill", "utility", "electric", "water", "gas", "electricity", "utilities"],
-    "application_form": ["application", "form", "forms"],
-    "payslip": ["payslip", "salary", "wage", "payment", "payroll", "pay"],
-    "insurance": ["insurance", "policy", "coverage", "premium"]
-}
+# Number of deals processed in parallel; each one gets its own browser
+DEAL_CONCURRENCY = int(os.getenv("DEAL_CONCURRENCY", "1"))
+# Every deal worker needs a browser; DRIVER_POOL_SIZE can add spares on top
+DRIVER_SLOTS = max(DRIVER_POOL_SIZE, DEAL_CONCURRENCY)
+CHROME_PROFILE_TEMPLATE = os.getenv("CHROME_PROFILE_TEMPLATE", r"C:\Automation\RPA")
+CHROME_PROFILE_CLONES = os.getenv("CHROME_PROFILE_CLONES", r"C:\Automation\RPA-clones")
 
 # Ensure the download directory exists
 if not os.path.exists(DOWNLOAD_PATH):
@@ -82,695 +80,15 @@ if not SUPABASE_URL or not SUPABASE_KEY:
 
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-class Windows11Theme:
-    """Windows 11 styling for Tkinter"""
-    def __init__(self, root):
-        self.style = ttk.Style(root)
-        self.configure_styles()
-        
-    def configure_styles(self):
-        # Windows 11 colors
-        self.accent_color = "#0067C0"  # Windows 11 accent blue
-        self.bg_color = "#F3F3F3"      # Light background
-        self.text_color = "#202020"    # Dark text
-        self.border_color = "#E1DFDE"  # Light border
-        
-        # Configure the root style
-        self.style.configure('TFrame', background=self.bg_color)
-        self.style.configure('TLabel', background=self.bg_color, foreground=self.text_color)
-        self.style.configure('TLabelframe', background=self.bg_color, foreground=self.text_color)
-        self.style.configure('TLabelframe.Label', background=self.bg_color, foreground=self.text_color, font=('Segoe UI', 9, 'bold'))
-        
-        # Configure button styles (Windows 11 has rounded buttons with subtle shadows)
-        self.style.configure('TButton', 
-                             background='white',
-                             foreground=self.text_color,
-                             font=('Segoe UI', 9),
-                             relief=tk.FLAT,
-                             borderwidth=1)
-        
-        # Accent button style (with white text)
-        self.style.configure('Accent.TButton',
-                             background=self.accent_color,
-                             foreground='white',
-                             font=('Segoe UI', 9, 'bold'),
-                             relief=tk.FLAT,
-                             borderwidth=0)
-        
-        # Accent button style (with black text)
-        self.style.configure('AccentBlack.TButton',
-                             background=self.accent_color,
-                             foreground='black',
-                             font=('Segoe UI', 9, 'bold'),
-                             relief=tk.FLAT,
-                             borderwidth=0)
-        
-        # Hover styles
-        self.style.map('TButton',
-                      background=[('active', '#F5F5F5'), ('pressed', '#E1E1E1')],
-                      relief=[('pressed', 'flat')])
-        
-        self.style.map('Accent.TButton',
-                      background=[('active', '#005FB3'), ('pressed', '#004E99')],
-                      foreground=[('active', 'white'), ('pressed', 'white')])
-                      
-        self.style.map('AccentBlack.TButton',
-                      background=[('active', '#005FB3'), ('pressed', '#004E99')],
-                      foreground=[('active', 'black'), ('pressed', 'black')])
-        
-        # Configure combobox style
-        self.style.configure('TCombobox', 
-                            background='white',
-                            fieldbackground='white',
-                            foreground=self.text_color,
-                            arrowcolor=self.text_color)
-        
-        # Configure progressbar style
-        self.style.configure('TProgressbar', 
-                            background=self.accent_color,
-                            troughcolor='#E5E7EB',
-                            borderwidth=0,
-                            thickness=6)
-
-class FileSelectorApp:
-    def __init__(self, root, applicant_details, application_id):
-        self.root = root
-        self.root.title("Document Assignment Tool")
-        self.root.geometry("1000x700")
-        self.root.configure(bg="#F3F3F3")  # Windows 11 background color
-        
-        # Apply Windows 11 theme
-        self.theme = Windows11Theme(root)
-        
-        # Add icon to the window and taskbar - with improved icon finding
-        self.find_and_set_icon()
-  
-        # Store applicant details and initialize assignments
-        self.applicant_details = applicant_details
-        self.application_id = application_id
-        self.assignments = {}  # Dictionary to store file assignments
-        self.processed_files = {}  # Dictionary to track processed files per applicant
-        
-        # Create main container with grid
-        self.root.grid_columnconfigure(0, weight=1)
-        self.root.grid_columnconfigure(1, weight=1)
-        self.root.grid_rowconfigure(0, weight=1)
-        
-        # Left Frame: Available Files
-        left_frame = ttk.LabelFrame(self.root, text=" Available Documents ", padding=(10, 5))
-        left_frame.grid(row=0, column=0, padx=16, pady=16, sticky="nsew")
-        left_frame.grid_rowconfigure(1, weight=1)  # Ensure the file container expands
-        left_frame.grid_columnconfigure(0, weight=1)
-        
-        # Add heading with icon (simulated with a label)
-        doc_heading = ttk.Frame(left_frame)
-        doc_heading.grid(row=0, column=0, sticky="ew", pady=(0, 8))
-        
-        doc_heading_icon = ttk.Label(doc_heading, text="📄", font=("Segoe UI", 11))
-        doc_heading_icon.pack(side=tk.LEFT, padx=(0, 5))
-        
-        doc_heading_text = ttk.Label(doc_heading, text="Select a document to assign", font=("Segoe UI", 10))
-        doc_heading_text.pack(side=tk.LEFT)
-        
-        # File listbox with custom styling
-        file_container = ttk.Frame(left_frame)
-        file_container.grid(row=1, column=0, sticky="nsew")
-        file_container.grid_rowconfigure(0, weight=1)
-        file_container.grid_columnconfigure(0, weight=1)
-        
-        # Create a frame for the listbox with a border
-        listbox_frame = tk.Frame(file_container, bg="white", highlightbackground="#E1DFDE", 
-                                highlightthickness=1, bd=0)
-        listbox_frame.grid(row=0, column=0, sticky="nsew")
-        listbox_frame.grid_rowconfigure(0, weight=1)
-        listbox_frame.grid_columnconfigure(0, weight=1)
-        
-        # File listbox with custom styling
-        self.file_listbox = tk.Listbox(listbox_frame, 
-                                     selectmode=tk.SINGLE,
-                                     bg="white",
-                                     fg="#202020",
-                                     font=("Segoe UI", 9),
-                                     bd=0,
-                                     highlightthickness=0,
-                                     activestyle="none",
-                                     selectbackground="#CCE4F7",
-                                     selectforeground="#202020")
-        
-        file_scrollbar = ttk.Scrollbar(listbox_frame, orient=tk.VERTICAL, command=self.file_listbox.yview)
-        self.file_listbox.configure(yscrollcommand=file_scrollbar.set)
-        
-        self.file_listbox.grid(row=0, column=0, sticky="nsew")
-        file_scrollbar.grid(row=0, column=1, sticky="ns")
-        
-        # Right Frame: Controls and Assigned Files
-        right_frame = ttk.Frame(self.root, padding=(0, 0))
-        right_frame.grid(row=0, column=1, padx=16, pady=16, sticky="nsew")
-        right_frame.grid_columnconfigure(0, weight=1)
-        
-        # Applicant selection panel
-        applicant_frame = ttk.LabelFrame(right_frame, text=" Applicant Selection ", padding=(10, 5))
-        applicant_frame.grid(row=0, column=0, sticky="ew", pady=(0, 16))
-        
-        # Add heading with icon
-        app_heading = ttk.Frame(applicant_frame)
-        app_heading.pack(fill=tk.X, pady=(0, 8))
-        
-        app_heading_icon = ttk.Label(app_heading, text="👤", font=("Segoe UI", 11))
-        app_heading_icon.pack(side=tk.LEFT, padx=(0, 5))
-        
-        app_heading_text = ttk.Label(app_heading, text="Select an applicant", font=("Segoe UI", 10))
-        app_heading_text.pack(side=tk.LEFT)
-        
-        # Applicant dropdown with Windows 11 styling
-        dropdown_frame = ttk.Frame(applicant_frame)
-        dropdown_frame.pack(fill=tk.X, pady=5)
-        
-        self.applicant_var = tk.StringVar()
-        self.applicant_dropdown = ttk.Combobox(dropdown_frame, 
-                                             textvariable=self.applicant_var,
-                                             font=("Segoe UI", 9),
-                                             state="readonly",
-                                             height=5)
-        self.applicant_dropdown.pack(fill=tk.X)
-        
-        # Assigned files frame
-        assigned_frame = ttk.LabelFrame(right_frame, text=" Assigned Documents ", padding=(10, 5))
-        assigned_frame.grid(row=1, column=0, sticky="nsew", pady=(0, 16))
-        assigned_frame.grid_rowconfigure(1, weight=1)  # Ensure the assigned container expands
-        assigned_frame.grid_columnconfigure(0, weight=1)
-        
-        # Add heading with icon
-        assigned_heading = ttk.Frame(assigned_frame)
-        assigned_heading.grid(row=0, column=0, sticky="ew", pady=(0, 8))
-        
-        assigned_heading_icon = ttk.Label(assigned_heading, text="📋", font=("Segoe UI", 11))
-        assigned_heading_icon.pack(side=tk.LEFT, padx=(0, 5))
-        
-        assigned_heading_text = ttk.Label(assigned_heading, text="Documents assigned to this applicant", font=("Segoe UI", 10))
-        assigned_heading_text.pack(side=tk.LEFT)
-        
-        # Assigned listbox with custom styling
-        assigned_container = ttk.Frame(assigned_frame)
-        assigned_container.grid(row=1, column=0, sticky="nsew")
-        assigned_container.grid_rowconfigure(0, weight=1)
-        assigned_container.grid_columnconfigure(0, weight=1)
-        
-        # Create a frame for the listbox with a border
-        assigned_listbox_frame = tk.Frame(assigned_container, bg="white", highlightbackground="#E1DFDE", 
-                                        highlightthickness=1, bd=0)
-        assigned_listbox_frame.grid(row=0, column=0, sticky="nsew")
-        assigned_listbox_frame.grid_rowconfigure(0, weight=1)
-        assigned_listbox_frame.grid_columnconfigure(0, weight=1)
-        
-        self.assigned_listbox = tk.Listbox(assigned_listbox_frame,
-                                         selectmode=tk.SINGLE,
-                                         bg="white",
-                                         fg="#202020",
-                                         font=("Segoe UI", 9),
-                                         bd=0,
-                                         highlightthickness=0,
-                                         activestyle="none",
-                                         selectbackground="#CCE4F7",
-                                         selectforeground="#202020")
-        
-        assigned_scrollbar = ttk.Scrollbar(assigned_listbox_frame, orient=tk.VERTICAL, command=self.assigned_listbox.yview)
-        self.assigned_listbox.configure(yscrollcommand=assigned_scrollbar.set)
-        
-        self.assigned_listbox.grid(row=0, column=0, sticky="nsew")
-        assigned_scrollbar.grid(row=0, column=1, sticky="ns")
-        
-        # Status frame
-        status_frame = ttk.LabelFrame(right_frame, text=" Processing Status ", padding=(10, 5))
-        status_frame.grid(row=2, column=0, sticky="ew")
-        
-        # Add heading with icon
-        status_heading = ttk.Frame(status_frame)
-        status_heading.pack(fill=tk.X, pady=(0, 8))
-        
-        status_heading_icon = ttk.Label(status_heading, text="🔄", font=("Segoe UI", 11))
-        status_heading_icon.pack(side=tk.LEFT, padx=(0, 5))
-        
-        status_heading_text = ttk.Label(status_heading, text="Document processing status", font=("Segoe UI", 10))
-        status_heading_text.pack(side=tk.LEFT)
-        
-        # Status text with Windows 11 styling
-        status_text_frame = tk.Frame(status_frame, bg="white", highlightbackground="#E1DFDE", 
-                                    highlightthickness=1, bd=0)
-        status_text_frame.pack(fill=tk.X, pady=(0, 10))
-        
-        self.status_text = tk.Text(status_text_frame, 
-                                 height=4, 
-                                 wrap=tk.WORD,
-                                 bg="white",
-                                 fg="#202020",
-                                 font=("Segoe UI", 9),
-                                 bd=0,
-                                 highlightthickness=0,
-                                 padx=8,
-                                 pady=8)
-        self.status_text.pack(side=tk.LEFT, fill=tk.X, expand=True)
-        
-        status_text_scrollbar = ttk.Scrollbar(status_text_frame, orient=tk.VERTICAL, command=self.status_text.yview)
-        self.status_text.configure(yscrollcommand=status_text_scrollbar.set)
-        status_text_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        # Add progress bar to status frame
-        progress_frame = ttk.Frame(status_frame)
-        progress_frame.pack(fill=tk.X, pady=(0, 5))
-        
-        progress_label = ttk.Label(progress_frame, text="Progress:")
-        progress_label.pack(side=tk.LEFT, padx=(0, 5))
-        
-        self.progress_var = tk.DoubleVar()
-        self.progress_bar = ttk.Progressbar(
-            progress_frame, 
-            variable=self.progress_var,
-            maximum=100,
-            mode='determinate',
-            length=100
-        )
-        self.progress_bar.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
-        
-        self.progress_label = ttk.Label(progress_frame, text="0%", width=5)
-        self.progress_label.pack(side=tk.RIGHT)
-        
-        # Action button frame (bottom of the window)
-        button_frame = ttk.Frame(right_frame, padding=(0, 10))
-        button_frame.grid(row=3, column=0, sticky="ew", pady=(10, 0))
-        
-        button_grid = ttk.Frame(button_frame)
-        button_grid.pack(fill=tk.X)
-        button_grid.grid_columnconfigure(0, weight=1)
-        button_grid.grid_columnconfigure(1, weight=1)
-        
-        # Create assign button with icon
-        assign_button_frame = ttk.Frame(button_grid)
-        assign_button_frame.grid(row=0, column=0, sticky="ew", padx=(0, 5), pady=5)
-        assign_button_frame.grid_columnconfigure(0, weight=1)
-        
-        self.assign_button = ttk.Button(
-            assign_button_frame, 
-            text="Assign Document",
-            command=self.assign_document,
-            style="TButton",
-            width=20
-        )
-        self.assign_button.grid(row=0, column=0, sticky="ew")
-        
-        # Create remove button with icon
-        remove_button_frame = ttk.Frame(button_grid)
-        remove_button_frame.grid(row=0, column=1, sticky="ew", padx=(5, 0), pady=5)
-        remove_button_frame.grid_columnconfigure(0, weight=1)
-        
-        self.remove_button = ttk.Button(
-            remove_button_frame, 
-            text="Remove Assignment",
-            command=self.remove_assignment,
-            style="TButton",
-            width=20
-        )
-        self.remove_button.grid(row=0, column=0, sticky="ew")
-        
-        # Create submit button with accent style and BLACK text
-        submit_button_frame = ttk.Frame(button_grid)
-        submit_button_frame.grid(row=1, column=0, columnspan=2, sticky="ew", pady=5)
-        submit_button_frame.grid_columnconfigure(0, weight=1)
-        
-        self.submit_button = ttk.Button(
-            submit_button_frame, 
-            text="Submit Documents",
-            command=self.submit_to_textract,
-            style="AccentBlack.TButton",  # Changed to AccentBlack.TButton for black text
-            width=20
-        )
-        self.submit_button.grid(row=0, column=0, sticky="ew")
-        
-        # Create clear button
-        clear_button_frame = ttk.Frame(button_grid)
-        clear_button_frame.grid(row=2, column=0, columnspan=2, sticky="ew", pady=5)
-        clear_button_frame.grid_columnconfigure(0, weight=1)
-        
-        self.clear_button = ttk.Button(
-            clear_button_frame, 
-            text="Clear Status",
-            command=self.clear_status,
-            style="TButton",
-            width=20
-        )
-        self.clear_button.grid(row=0, column=0, sticky="ew")
-        
-        # Initialize the interface
-        self.load_applicants()
-        self.load_files()
-        
-        # Bind events
-        self.applicant_dropdown.bind('<<ComboboxSelected>>', self.on_applicant_selected)
-        
-        # Update status
-        self.update_status("Ready to process documents.")
-    
-    def find_and_set_icon(self):
-        """Find and set the icon by checking multiple possible locations"""
-        # Look for icon in possible locations
-        icon_paths = [
-            "logo/ka.ico",  # Original path
-            "ka.ico",       # Root directory
-            os.path.join(os.path.dirname(os.path.abspath(__file__)), "ka.ico"),
-            os.path.join(os.path.dirname(os.path.abspath(__file__)), "logo", "ka.ico"),
-            os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "ka.ico"),
-            os.path.join(os.path.dirname(os.path.abspath(__file__)), "icons", "ka.ico")
-        ]
-        
-        # Print the current directory and searched locations for debugging
-        print(f"Current working directory: {os.getcwd()}")
-        print("Searching for icon in the following locations:")
-        for path in icon_paths:
-            print(f"  - {path} (Exists: {os.path.exists(path)})")
-        
-        # Try each path
-        for icon_path in icon_paths:
-            if os.path.exists(icon_path):
-                try:
-                    self.set_taskbar_icon(self.root, icon_path)
-                    print(f"✅ Successfully loaded icon from: {icon_path}")
-                    return
-                except Exception as e:
-                    print(f"❌ Error setting icon from {icon_path}: {str(e)}")
-    
-    def set_taskbar_icon(self, root, icon_path):
-        """Set both window and taskbar icons for a Tkinter application."""
-        import os
-        import sys
-        import ctypes
-        
-        # Set window icon using normal Tkinter approach
-        root.iconbitmap(icon_path)
-        
-        # For Windows taskbar icon
-        if sys.platform.startswith('win'):
-            # Get absolute path to the icon
-            abs_icon_path = os.path.abspath(icon_path)
-            
-            # Windows-specific method to set the taskbar icon
-            myappid = f'mycompany.documentprocessor.{os.path.basename(icon_path)}'  # Arbitrary string
-            ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID(myappid)
-            
-            # Set the icon for the process
-            if hasattr(ctypes.windll, 'user32'):
-                # Apply icon for taskbar
-                hwnd = ctypes.windll.user32.GetActiveWindow()
-                if hwnd:
-                    icon_handle = ctypes.windll.user32.LoadImageW(
-                        None, 
-                        abs_icon_path, 
-                        1,  # IMAGE_ICON
-                        0, 
-                        0, 
-                        0x00000010 | 0x00000040  # LR_LOADFROMFILE | LR_DEFAULTSIZE
-                    )
-                    if icon_handle:
-                        ctypes.windll.user32.SendMessageW(hwnd, 0x0080, 0, icon_handle)  # WM_SETICON, ICON_SMALL
-                        ctypes.windll.user32.SendMessageW(hwnd, 0x0080, 1, icon_handle)  # WM_SETICON, ICON_BIG
-    
-    def get_folder_path(self):
-        """Get the folder path for the current applicant"""
-        # Find the first applicant in the same application
-        current_applicant = next(
-            (app for app in self.applicant_details 
-             if f"{app['first_name']} {app['last_name']}" == self.applicant_var.get()),
-            None
-        )
-        
-        if not current_applicant:
-            return None
-            
-        # Use the first applicant's name as the folder name
-        first_applicant = self.applicant_details[0]  # Always use the first applicant's name for the folder
-        folder_name = f"{first_applicant['first_name']} {first_applicant['last_name']}"
-        
-        # Debug information
-        print(f"First applicant: {first_applicant}")
-        print(f"Folder name: {folder_name}")
+# Lenders_Hub held in memory; deals look their lender up here instead of querying Supabase
+lender_directory = LenderDirectory(lambda: load_supabase_lenders(supabase), name="Lenders_Hub")
+# APITable Lender Hub directories, one per API url
+apitable_lender_directories = {}
 
-        return os.path.join(DOWNLOAD_PATH, folder_name)
-    
-    def load_applicants(self):
-        """Load applicants into the dropdown"""
-        applicant_names = [
-            f"{app['first_name']} {app['last_name']}"
-            for app in self.applicant_details
-        ]
-        self.applicant_dropdown['values'] = applicant_names
-        if applicant_names:
-            self.applicant_dropdown.set(applicant_names[0])
-            print(f"Loaded applicants: {applicant_names}")
-    
-    def load_files(self):
-        """Load available files for the selected applicant"""
-        self.file_listbox.delete(0, tk.END)
-        folder_path = self.get_folder_path()
-        
-        if not folder_path:
-            print("No folder path found")
-            return
-            
-        if os.path.exists(folder_path):
-            print(f"Loading files from: {folder_path}")
-            for file_name in os.listdir(folder_path):
-                file_path = os.path.join(folder_path, file_name)
-                if os.path.isfile(file_path):
-                    # Check if the file is not processed and not assigned
-                    current_applicant = self.applicant_var.get()
-                    if (file_name not in self.processed_files.get(current_applicant, set()) and 
-                        file_name not in self.assignments.get(current_applicant, [])):
-                        self.file_listbox.insert(tk.END, file_name)
-                        print(f"Added file to listbox: {file_name}")
-        else:
-            print(f"Folder does not exist: {folder_path}")
-    
-    def update_status(self, message):
-        """Update the status text with timestamp"""
-        timestamp = time.strftime("%H:%M:%S")
-        self.status_text.insert(tk.END, f"[{timestamp}] {message}\n")
-        self.status_text.see(tk.END)
-    
-    def update_progress(self, percentage):
-        """Update progress bar and percentage display"""
-        self.progress_var.set(percentage)
-        self.progress_label.config(text=f"{int(percentage)}%")
-        self.root.update_idletasks()  # Force update of the UI
-    
-    def clear_status(self):
-        """Clear the status text"""
-        self.status_text.delete(1.0, tk.END)
-        self.update_status("Status cleared.")
-        # Reset progress bar
-        self.update_progress(0)
-    
-    def on_applicant_selected(self, event):
-        """Handle applicant selection change"""
-        self.load_files()
-        self.update_assigned_files()
-        self.update_status(f"Selected applicant: {self.applicant_var.get()}")
-    
-    def assign_document(self):
-        """Assign selected document to current applicant"""
-        selected_indices = self.file_listbox.curselection()
-        if not selected_indices:
-            messagebox.showwarning("Warning", "Please select a document to assign")
-            return
-        
-        selected_file = self.file_listbox.get(selected_indices[0])
-        selected_applicant = self.applicant_var.get()
-        
-        if selected_applicant not in self.assignments:
-            self.assignments[selected_applicant] = []
-        
-        self.assignments[selected_applicant].append(selected_file)
-        self.file_listbox.delete(selected_indices[0])
-        self.update_assigned_files()
-        self.update_status(f"Assigned '{selected_file}' to {selected_applicant}")
-    
-    def remove_assignment(self):
-        """Remove document assignment"""
-        selected_indices = self.assigned_listbox.curselection()
-        if not selected_indices:
-            messagebox.showwarning("Warning", "Please select a document to remove")
-            return
-        
-        selected_file = self.assigned_listbox.get(selected_indices[0])
-        selected_applicant = self.applicant_var.get()
-        
-        self.assignments[selected_applicant].remove(selected_file)
-        self.assigned_listbox.delete(selected_indices[0])
-        self.file_listbox.insert(tk.END, selected_file)
-        self.update_status(f"Removed '{selected_file}' from {selected_applicant}")
-    
-    def update_assigned_files(self):
-        """Update the assigned files listbox"""
-        self.assigned_listbox.delete(0, tk.END)
-        selected_applicant = self.applicant_var.get()
-        if selected_applicant in self.assignments:
-            for file_name in self.assignments[selected_applicant]:
-                self.assigned_listbox.insert(tk.END, file_name)
-    
-    def submit_to_textract(self):
-        """Submit assigned documents to Textract"""
-        if not any(self.assignments.values()):
-            messagebox.showwarning("Warning", "No documents have been assigned")
-            return
-        
-        # Start processing in a separate thread
-        processing_thread = threading.Thread(target=self._process_documents)
-        processing_thread.start()
-    
-    def _process_documents(self):
-        """Process documents in background thread"""
-        folder_path = self.get_folder_path()
-        if not folder_path:
-            self.root.after(0, self.update_status, "Error: Could not determine folder path")
-            return
-        
-        # Calculate total files for progress tracking
-        total_files = sum(len(files) for files in self.assignments.values())
-        processed_count = 0
-            
-        for applicant_name, files in self.assignments.items():
-            if not files:
-                continue
-            
-            # Find applicant details
-            applicant = next(
-                (app for app in self.applicant_details 
-                if f"{app['first_name']} {app['last_name']}" == applicant_name),
-                None
-            )
-            
-            if applicant and files:
-                files_to_upload = []
-                
-                for file_name in files:
-                    file_path = os.path.join(folder_path, file_name)
-                    if os.path.isfile(file_path):
-                        metadata = get_file_metadata(file_path)
-                        doc_type = get_document_type(file_name)  # Get document type
-                        files_to_upload.append((file_name, open(file_path, "rb"), metadata["mime_type"], doc_type))
-                
-                if files_to_upload:
-                    try:
-                        self.root.after(0, self.update_status, f"Processing files for {applicant_name}...")
-                        
-                        # Update progress at the start of processing for this applicant
-                        progress_percentage = (processed_count / total_files) * 100
-                        self.root.after(0, self.update_progress, progress_percentage)
-                        
-                        # Create multipart form-data that properly handles multiple files
-                        # Use self.application_id here instead of application_id
-                        multipart_data = self._create_multipart_data(files_to_upload, applicant, self.application_id)
-                        
-                        # Send to Textract middleware
-                        response = requests.post(
-                            "https://textractor.korunaassist.com/upload",
-                            data=multipart_data,
-                            headers={"Content-Type": multipart_data.content_type},
-                            timeout=30  # Increased timeout for multiple files
-                        )
-                        
-                        if response.status_code in (200, 201):
-                            # Parse the queue status from response
-                            queue_info = ""
-                            try:
-                                resp_data = response.json()
-                                if "queueStatus" in resp_data:
-                                    status = resp_data["queueStatus"]
-                                    queue_info = f" (Files in queue: {status.get('remainingInQueue', 0)})"
-                                    
-                                    # If we have files in queue, show a more detailed message
-                                    if status.get('remainingInQueue', 0) > 0:
-                                        queue_info = f" (Processing {status.get('totalFiles', 0)} files sequentially.)"
-                            except Exception as e:
-                                print(f"Error parsing queue status: {str(e)}")
-                            
-                            # Increment count for processed files
-                            processed_count += len(files_to_upload)
-                            
-                            # Update progress after processing this applicant's files
-                            progress_percentage = (processed_count / total_files) * 100
-                            self.root.after(0, self.update_progress, progress_percentage)
-                                    
-                            # Mark files as processed for this applicant
-                            if applicant_name not in self.processed_files:
-                                self.processed_files[applicant_name] = set()
-                                
-                            for file_name, _, _, _ in files_to_upload:
-                                self.processed_files[applicant_name].add(file_name)
-                            
-                            self.root.after(0, self.update_status,
-                                f"✅ Files for {applicant_name} successfully queued and being processed{queue_info}")
-                                
-                        else:
-                            self.root.after(0, self.update_status,
-                                f"❌ Failed to process files for {applicant_name}: {response.text}")
-                    
-                    except Exception as e:
-                        self.root.after(0, self.update_status,
-                            f"Error processing files for {applicant_name}: {str(e)}")
-                    
-                    finally:
-                        for _, file_obj, _, _ in files_to_upload:
-                            file_obj.close()
-        
-        # Set progress to 100% when complete
-        self.root.after(0, self.update_progress, 100)
-        
-        # Clear assignments after processing
-        self.assignments = {}
-        
-        # Update UI in main thread
-        self.root.after(0, self._after_processing)
-    
-    def _create_multipart_data(self, files_to_upload, applicant, application_id):
-        fields = []
-        
-        # Add each file with the same field name 'files'
-        for i, (file_name, file_obj, mime_type, doc_type) in enumerate(files_to_upload):
-            # Keep the field name 'files' the same for all files
-            fields.append(
-                ('files', (file_name, file_obj, mime_type))
-            )
-            # Add document type for each file
-            fields.append(
-                (f'document_type_{file_name}', doc_type)
-            )
-        
-        # Add applicant data
-        fields.append(('applicant', json.dumps({
-            "applicant_id": applicant["id"],
-            "first_name": applicant["first_name"],
-            "last_name": applicant["last_name"],
-            "application_id": application_id
-        })))
-        
-        # Print debug info
-        print(f"Creating request with {len(files_to_upload)} files")
-        for i, (file_name, _, _, doc_type) in enumerate(files_to_upload):
-            print(f"  File {i+1}: {file_name} (Type: {doc_type})")
-        
-        # Return the MultipartEncoder with all fields
-        return MultipartEncoder(fields=fields)
-    
-    def _after_processing(self):
-        """Update UI after processing completes"""
-        self.update_assigned_files()
-        self.load_files()
-        self.update_status("Processing complete. Ready for more documents.")
-        messagebox.showinfo("Success", "Documents have been submitted for processing")
-
-def setup_chrome_options():
+def setup_chrome_options(profile_dir=CHROME_PROFILE_TEMPLATE):
     """Set up Chrome options with enhanced stability and performance"""
     chrome_options = webdriver.ChromeOptions()    
-    chrome_options.add_argument("user-data-dir=C:\\Automation\\RPA")
+    chrome_options.add_argument(f"user-data-dir={profile_dir}")
     chrome_options.add_argument("--start-maximized")
     chrome_options.add_argument("--disable-blink-features=AutomationControlled")
     chrome_options.add_argument("--disable-dev-shm-usage")
@@ -796,50 +114,159 @@ def setup_chrome_options():
     
     return chrome_options
 
-def cleanup_previous_process():
-    """Clean up any existing GUI process and Selenium driver"""
-    global active_gui_process, active_driver
-    
-    # Clean up GUI process
-    if active_gui_process:
-        try:
-            active_gui_process.terminate()
-            active_gui_process.wait(timeout=5)
-        except Exception as e:
-            logging.error(f"Error terminating GUI process: {e}")
-        finally:
-            active_gui_process = None
-    
-    # Clean up Selenium driver
-    if active_driver:
+def profile_for_slot(slot):
+    """Chrome options for a pool slot; parallel slots run on their own copy of the template profile"""
+    if DRIVER_SLOTS <= 1:
+        return setup_chrome_options()
+
+    # Chrome refuses to open one user-data-dir twice, so every slot gets a fresh clone
+    profile_dir = clone_profile(CHROME_PROFILE_TEMPLATE, os.path.join(CHROME_PROFILE_CLONES, f"slot-{slot}"))
+    return setup_chrome_options(profile_dir)
+
+# Salestrekker cookies/localStorage captured after the first interactive login
+session_vault = SessionVault()
+
+# Pre-warmed drivers shared by every /process-url request
+driver_pool = DriverPool(profile_for_slot, size=DRIVER_SLOTS, download_path=DOWNLOAD_PATH)
+atexit.register(driver_pool.shutdown)
+
+class DealContext:
+    """Per-job state: the driver checked out for the deal and its download folder"""
+    def __init__(self, job):
+        self.job = job
+        self.driver = None
+        self.download_dir = None
+
+    def open(self):
+        self.driver = driver_pool.acquire()
+        return self.driver
+
+    def set_download_dir(self, folder):
+        """Send this deal's downloads to its own folder under DOWNLOAD_PATH"""
+        os.makedirs(folder, exist_ok=True)
+        self.driver.execute_cdp_cmd(
+            "Page.setDownloadBehavior",
+            {
+                "behavior": "allow",
+                "downloadPath": folder,
+            },
+        )
+        self.download_dir = folder
+
+    def close(self):
+        """Hand the driver back to the pool"""
+        if self.driver:
+            try:
+                driver_pool.release(self.driver)
+            except Exception as e:
+                logging.error(f"Error releasing Selenium driver: {e}")
+            finally:
+                self.driver = None
+
+def prune_gui_processes():
+    """Forget file selector windows that have been closed"""
+    with gui_processes_lock:
+        gui_processes[:] = [p for p in gui_processes if p.poll() is None]
+
+# Set to False once Supabase reports that the RPC is not installed
+application_rpc_available = True
+
+def create_application(supabase: Client, applicant_rows, application_data):
+    """Insert the applicants, the application and the join rows; returns (applicants, application_id).
+
+    Uses the create_application_with_applicants function (sql/) so the whole deal is
+    written atomically in one round trip, and falls back to three bulk inserts when
+    the function has not been installed.
+    """
+    global application_rpc_available
+    if application_rpc_available:
         try:
-            active_driver.quit()
-        except Exception as e:
-            logging.error(f"Error closing Selenium driver: {e}")
-        finally:
-            active_driver = None
+            response = supabase.rpc(
+                "create_application_with_applicants",
+                {"applicants": applicant_rows, "application": application_data}
+            ).execute()
+            logging.info(
+                f"Application created successfully with ID {response.data['application_id']} "
+                f"and {len(response.data['applicants'])} applicants"
+            )
+            return response.data["applicants"], response.data["application_id"]
+        except APIError as e:
+            # PGRST202: function not found in the schema cache
+            if e.code != "PGRST202":
+                raise
+            application_rpc_available = False
+            logging.warning("create_application_with_applicants is not installed, using bulk inserts")
+
+    insert_response = supabase.table("Applicant_Hub").insert(applicant_rows).execute()
+    if not insert_response.data or not isinstance(insert_response.data, list):
+        logging.error(f"Failed to insert applicants. Response: {insert_response}")
+        return [], None
+    applicants = insert_response.data
+
+    application_insert = supabase.table("Application_Hub").insert(application_data).execute()
+    if not application_insert.data:
+        logging.warning("Failed to create application")
+        return applicants, None
+
+    # Get the auto-generated application ID
+    application_id = application_insert.data[0]["id"]
+    logging.info(f"Application created successfully with ID {application_id}")
+
+    # Link every applicant to the application via the Application_Applicants join table
+    link_response = supabase.table("Application_Applicants").insert([
+        {"application_id": application_id, "applicant_id": applicant["id"]}
+        for applicant in applicants
+    ]).execute()
+    if not link_response.data:
+        logging.warning(f"Failed to link applicants to application {application_id}")
+    else:
+        logging.info(f"Linked {len(link_response.data)} applicants to application {application_id}")
+
+    return applicants, application_id
+
+def track_gui_process(gui_process):
+    with gui_processes_lock:
+        gui_processes.append(gui_process)
+
+def launch_standalone_gui(applicant_details, application_id, deal_id=None):
+    """One-off file selector process for a single deal, fed through a temp file.
+
+    Every call gets its own file (application_id may be None, and deals run
+    concurrently). The launcher deletes it once read; it is removed here if the
+    process never started.
+    """
+    launched = False
+    with tempfile.NamedTemporaryFile('w', prefix="applicant_data_", suffix=".json", delete=False) as f:
+        temp_data_file = f.name
+        json.dump({
+            'applicant_details': applicant_details,
+            'application_id': application_id,
+            'deal_id': deal_id
+        }, f, indent=2)
 
-def process_applicants(applicant_details, lender_details, supabase: Client):
-    global active_gui_process
     try:
-        cleanup_previous_process()
-
-        all_applicant_details = []
-        new_applicant_ids = []
-
-        # 1. Insert applicants into Supabase
-        for applicant_data in applicant_details:
-            for record in applicant_data.get("records", []):
-                fields = record.get("fields", {})
-                insert_response = supabase.table("Applicant_Hub").insert(fields).execute()
-
-                if not insert_response.data or not isinstance(insert_response.data, list):
-                    logging.error(f"Failed to insert applicant. Response: {insert_response}")
-                    continue
+        gui_launcher = os.path.join(script_dir, "gui_launcher.py")
+        creation_flags = subprocess.CREATE_NEW_PROCESS_GROUP if sys.platform == 'win32' else 0
+        track_gui_process(subprocess.Popen(
+            [sys.executable, gui_launcher, temp_data_file],
+            creationflags=creation_flags
+        ))
+        launched = True
+        logging.info("File selector GUI launched")
+    finally:
+        if not launched and os.path.exists(temp_data_file):
+            os.remove(temp_data_file)
+
+def process_applicants(applicant_details, lender_details, supabase: Client, deal_id=None):
+    try:
+        prune_gui_processes()
 
-                inserted = insert_response.data[0]
-                all_applicant_details.append(inserted)
-                new_applicant_ids.append(inserted["id"])
+        # 1. Collect the applicant rows
+        applicant_rows = [
+            record.get("fields", {})
+            for applicant_data in applicant_details
+            for record in applicant_data.get("records", [])
+        ]
 
         # 2. Lookup lender data
         new_lender_id = None
@@ -854,65 +281,39 @@ def process_applicants(applicant_details, lender_details, supabase: Client):
                     logging.warning("Lender company_name missing in fields. Skipping lookup.")
                     continue
 
-                select_response = supabase.table("Lenders_Hub").select("id").eq("company_name", lender).execute()
-                logging.info(select_response)
+                existing_lender = lender_directory.get(lender)
 
-                if select_response.data:
-                    new_lender_id = select_response.data[0]["id"]
+                if existing_lender:
+                    new_lender_id = existing_lender["id"]
                     logging.info(f"Found existing lender: {lender} with ID {new_lender_id}")
                 else:
                     logging.info(f"Lender '{lender}' not found in Lenders_Hub. Skipping insert.")
 
-        # 3. Create Application record
-        if new_applicant_ids:
+        # 3. Create the applicants, the Application record and the links in one go
+        all_applicant_details = []
+        new_application_id = None
+        if applicant_rows:
             application_data = {
                 "status": "New"
                 # Optionally include lender_id if needed:
                 # "lender_id": new_lender_id
             }
+            all_applicant_details, new_application_id = create_application(supabase, applicant_rows, application_data)
 
-            application_insert = supabase.table("Application_Hub").insert(application_data).execute()
-
-            if not application_insert.data:
-                logging.warning(f"Failed to create application: {application_insert.error}")
-            else:
-                # Get the auto-generated application ID
-                new_application_id = application_insert.data[0]["id"]
-                logging.info(f"Application created successfully with ID {new_application_id}")
-
-                # ✅ Link each applicant to the application via Application_Applicant join table
-                for applicant_id in new_applicant_ids:
-                    link_response = supabase.table("Application_Applicants").insert({
-                        "application_id": new_application_id,
-                        "applicant_id": applicant_id
-                    }).execute()
-
-                    if not link_response.data:
-                        logging.warning(f"Failed to link applicant {applicant_id} to application {new_application_id}: {link_response.error}")
-                    else:
-                        logging.info(f"Linked applicant {applicant_id} to application {new_application_id} in Application_Applicant")
-
-        # 4. Save to temp file for GUI (optional)
+        # 4. Open the deal in the file selector window (started on first use)
         if all_applicant_details:
-            temp_data_file = os.path.join(script_dir, "temp_applicant_data.json")
-            with open(temp_data_file, 'w') as f:
-                json.dump({
-                    'applicant_details': all_applicant_details,
-                    'application_id': new_application_id
-                }, f, indent=2)
-
-            gui_launcher = os.path.join(script_dir, "gui_launcher.py")
-            creation_flags = subprocess.CREATE_NEW_PROCESS_GROUP if sys.platform == 'win32' else 0
-            active_gui_process = subprocess.Popen(
-                [sys.executable, gui_launcher, temp_data_file],
-                creationflags=creation_flags
-            )
-            logging.info("File selector GUI launched")
+            try:
+                send_deal(all_applicant_details, new_application_id, on_launch=track_gui_process, deal_id=deal_id)
+                logging.info("Deal sent to the file selector")
+            except Exception as e:
+                logging.error(f"File selector unreachable, opening a standalone window: {e}")
+                launch_standalone_gui(all_applicant_details, new_application_id, deal_id)
 
         return {
             "status": "success",
             "message": "Processing started",
             "applicant_count": len(all_applicant_details),
+            "application_id": new_application_id,
         }
 
     except Exception as e:
@@ -924,27 +325,6 @@ def process_applicants(applicant_details, lender_details, supabase: Client):
         }
 
 # ... [Rest of the code remains unchanged] ...
-def get_file_metadata(file_path):
-    """Get file metadata including MIME type"""
-    file_name = os.path.basename(file_path)
-    file_extension = os.path.splitext(file_name)[1]  # Get file extension
-    mime_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"  # Guess MIME type
-    return {"file_name": file_name, "file_extension": file_extension, "mime_type": mime_type}
-
-def get_document_type(file_name):
-    """Get document type based on file name"""
-    normalized_file_name = re.sub(r'[^a-z0-9]', ' ', file_name.lower())
-    
-    # Check each document type's keywords
-    for doc_type, keywords in classified_documents.items():
-        for keyword in keywords:
-            if keyword in normalized_file_name:
-                print(f"Classified {file_name} as {doc_type}")
-                return doc_type
-    
-    print(f"Could not classify {file_name}, marking as unknown_document")
-    return "unknown_document"
-
 def is_applicant_existing(applicant_data, existing_applicants):
     try:
         # Extract fields from applicant_data
@@ -985,25 +365,19 @@ def is_applicant_existing(applicant_data, existing_applicants):
 def get_existing_lender(lender_name, lender_api_url, headers):
     """Look up existing lender in Lender Hub"""
     try:
-        # Create filter formula to search by Company Name
-        filter_formula = f"FIND('{lender_name}', {{Company Name}})"
-        search_url = f"{lender_api_url}?filterByFormula={filter_formula}"
-        
-        # Send GET request to search for lender
-        response = requests.get(search_url, headers=headers)
-        
-        if response.status_code == 200:
-            data = response.json()
-            records = data.get("data", {}).get("records", [])
-            if records:
-                logging.info(f"Found existing lender: {lender_name}")
-                return records
-            else:
-                logging.info(f"No existing lender found for: {lender_name}")
-                return []
+        directory = apitable_lender_directories.get(lender_api_url)
+        if directory is None:
+            directory = LenderDirectory(apitable_lender_loader(lender_api_url, headers), name="Lender Hub")
+            apitable_lender_directories[lender_api_url] = directory
+
+        # Exact or normalized name first, then the substring match FIND() used to do
+        record = directory.get(lender_name)
+        records = [record] if record else directory.search(lender_name)
+        if records:
+            logging.info(f"Found existing lender: {lender_name}")
         else:
-            logging.error(f"Failed to search for lender. Status Code: {response.status_code}")
-            return []
+            logging.info(f"No existing lender found for: {lender_name}")
+        return records
     except Exception as e:
         logging.error(f"Error searching for lender: {str(e)}")
         return []
@@ -1066,370 +440,309 @@ def get_existing_applicants(applicant_api_url, headers):
         print(f"Error fetching existing applicants: {str(e)}")
         return []
 
-def scroll_down_until_bottom(driver, scroll_element):
-    """Enhanced scrolling with better stability and error handling"""
-    logging.info("Starting enhanced scroll operation...")
-    
+# Jump-scrolls the timeline container whenever its last event comes into view and
+# resolves once no new timeline-event nodes have arrived (and no $http request is
+# pending) for quietMs, with the total number of events
+TIMELINE_LOADER_SCRIPT = """
+var container = arguments[0], quietMs = arguments[1], timeoutMs = arguments[2];
+var done = arguments[arguments.length - 1];
+var start = Date.now(), lastGrowth = Date.now(), scrolls = 0;
+var count = container.querySelectorAll('timeline-event').length;
+
+function jump() {
+    container.scrollTop = container.scrollHeight;
+    scrolls++;
+}
+
+function httpPending() {
+    try {
+        var injector = window.angular && angular.element(document.body).injector();
+        return injector ? injector.get('$http').pendingRequests.length > 0 : false;
+    } catch (e) { return false; }
+}
+
+var tail = null;
+var intersection = new IntersectionObserver(function (entries) {
+    if (entries.some(function (e) { return e.isIntersecting; })) { jump(); }
+}, {root: container});
+
+function watchTail() {
+    var events = container.querySelectorAll('timeline-event');
+    var last = events[events.length - 1] || null;
+    if (last !== tail) {
+        if (tail) { intersection.unobserve(tail); }
+        if (last) { intersection.observe(last); }
+        tail = last;
+    }
+}
+
+var mutations = new MutationObserver(function () {
+    var current = container.querySelectorAll('timeline-event').length;
+    if (current !== count) {
+        count = current;
+        lastGrowth = Date.now();
+        watchTail();
+        jump();
+    }
+});
+mutations.observe(container, {childList: true, subtree: true});
+watchTail();
+jump();
+
+(function poll() {
+    var now = Date.now();
+    if (httpPending()) { lastGrowth = Math.max(lastGrowth, now - quietMs / 2); }
+    var settled = now - lastGrowth >= quietMs;
+    if (settled || now - start >= timeoutMs) {
+        mutations.disconnect();
+        intersection.disconnect();
+        done({count: count, scrolls: scrolls, waitedMs: now - start, complete: settled});
+        return;
+    }
+    setTimeout(poll, 100);
+})();
+"""
+TIMELINE_QUIET_MS = int(os.getenv("TIMELINE_QUIET_MS", "1500"))
+TIMELINE_LOAD_TIMEOUT = int(os.getenv("TIMELINE_LOAD_TIMEOUT", "120"))
+
+def scroll_down_until_bottom(driver, scroll_element, quiet_ms=TIMELINE_QUIET_MS, timeout=TIMELINE_LOAD_TIMEOUT):
+    """Load the whole timeline in one call; returns the number of timeline events, or None on failure"""
+    logging.info("Loading timeline...")
     try:
-        # Initial setup
-        last_height = 0
-        max_attempts = 30
-        scroll_pause_time = 2
-        no_change_count = 0
-        max_no_change = 3
-        
-        # Ensure we're in the correct frame/window context
         driver.switch_to.default_content()
-        
-        # Multiple scroll attempts
-        for attempt in range(max_attempts):
-            try:
-                # Try different scroll approaches
-                current_height = None
-                
-                # Approach 1: Smooth scroll with JavaScript
-                try:
-                    current_height = driver.execute_script("""
-                        arguments[0].scrollTo({
-                            top: arguments[0].scrollHeight,
-                            behavior: 'smooth'
-                        });
-                        return arguments[0].scrollHeight;
-                    """, scroll_element)
-                except Exception as e1:
-                    logging.warning(f"Primary scroll method failed: {e1}")
-                    
-                    # Approach 2: Direct scrollHeight manipulation
-                    try:
-                        current_height = driver.execute_script("""
-                            arguments[0].scrollTop = arguments[0].scrollHeight;
-                            return arguments[0].scrollHeight;
-                        """, scroll_element)
-                    except Exception as e2:
-                        logging.warning(f"Secondary scroll method failed: {e2}")
-                        
-                        # Approach 3: Fallback to window scrolling
-                        try:
-                            current_height = driver.execute_script("""
-                                window.scrollTo(0, document.body.scrollHeight);
-                                return document.body.scrollHeight;
-                            """)
-                        except Exception as e3:
-                            logging.error(f"All scroll methods failed: {e3}")
-                            continue
-                
-                # Wait for content to load
-                time.sleep(scroll_pause_time)
-                
-                # Check if we've reached the bottom
-                if current_height == last_height:
-                    no_change_count += 1
-                    if no_change_count >= max_no_change:
-                        logging.info(f"Reached bottom after {attempt + 1} attempts")
-                        break
-                else:
-                    no_change_count = 0
-                
-                last_height = current_height
-                logging.info(f"Scroll attempt {attempt + 1}: Height = {current_height}")
-                
-            except Exception as e:
-                logging.error(f"Scroll attempt {attempt + 1} failed: {str(e)}")
-                time.sleep(1)  # Brief pause before retry
-        
-        # Final wait to ensure everything is loaded
-        time.sleep(3)
-        return True
-        
+        driver.set_script_timeout(timeout + 5)
+        result = driver.execute_async_script(TIMELINE_LOADER_SCRIPT, scroll_element, quiet_ms, timeout * 1000)
     except Exception as e:
         logging.error(f"Scrolling operation failed: {str(e)}")
-        return False
-
-def process_timeline_events(driver):
-    """Enhanced timeline event processing with batching and memory management"""
-    logging.info("Starting optimized timeline processing...")
-    
-    try:
-        # Configuration for performance optimization
-        BATCH_SIZE = 100  # Process 25 documents at a time
-        SCROLL_PAUSE = 1  # Seconds between scrolls
-        DOWNLOAD_PAUSE = 2  # Seconds between downloads
-        MAX_RETRIES = 5  # Maximum retry attempts
-        
-        wait = WebDriverWait(driver, 20)
-        download_count = 0
-        processed_events = set()
-        
-        def get_fresh_elements():
-            """Helper function to get fresh elements from the page"""
-            try:
-                return wait.until(
-                    EC.presence_of_all_elements_located((By.TAG_NAME, "timeline-event"))
-                )
-            except TimeoutException:
-                logging.error("Timeout waiting for timeline events")
-                return []
-
-        def is_element_stale(element):
-            """Check if an element is stale"""
-            try:
-                element.is_enabled()
-                return False
-            except StaleElementReferenceException:
-                return True
-            except Exception:
-                return True
-
-        def refresh_events_with_labels():
-            """Refresh and return all events with labels"""
-            fresh_events = get_fresh_elements()
-            labeled_events = []
-            for fresh_event in fresh_events:
-                try:
-                    if not is_element_stale(fresh_event):
-                        labels = fresh_event.find_elements(By.XPATH, ".//span[contains(text(), 'Labels')]")
-                        if labels:
-                            labeled_events.append(fresh_event)
-                except Exception:
-                    continue
-            return labeled_events
-
-        # First phase: Document discovery
-        timeline_events = get_fresh_elements()
-        if not timeline_events:
-            logging.error("No timeline events found")
-            return False
-        
-        logging.info(f"Found {len(timeline_events)} total timeline events")
-        
-        # Get initial events with labels
-        events_with_labels = refresh_events_with_labels()
-        logging.info(f"Found {len(events_with_labels)} events with labels")
-        
-        # Process events in batches
-        batch_start = 0
-        while batch_start < len(events_with_labels):
-            batch = events_with_labels[batch_start:batch_start + BATCH_SIZE]
-            current_batch = (batch_start // BATCH_SIZE) + 1
-            total_batches = (len(events_with_labels) + BATCH_SIZE - 1) // BATCH_SIZE
-            logging.info(f"Processing batch {current_batch} of {total_batches}")
-            
-            batch_processed = 0
-            retry_count = 0
-            
-            while batch_processed < len(batch) and retry_count < MAX_RETRIES:
-                event = batch[batch_processed]
-                try:
-                    # Check if element is stale
-                    if is_element_stale(event):
-                        if retry_count < MAX_RETRIES - 1:
-                            # Refresh events and update batch
-                            events_with_labels = refresh_events_with_labels()
-                            if batch_start < len(events_with_labels):
-                                batch = events_with_labels[batch_start:batch_start + BATCH_SIZE]
-                                retry_count += 1
-                                time.sleep(1)
-                                continue
-                            else:
-                                break
-                        else:
-                            batch_processed += 1
-                            continue
-
-                    # Generate unique identifier for event
-                    event_id = driver.execute_script("""
-                        try {
-                            return arguments[0].getAttribute('data-id') || arguments[0].innerHTML;
-                        } catch(e) {
-                            return null;
-                        }
-                    """, event)
-                    
-                    if not event_id or event_id in processed_events:
-                        batch_processed += 1
-                        continue
-                    
-                    # Scroll event into view
-                    driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", event)
-                    time.sleep(SCROLL_PAUSE)
-                    
-                    # Find and process download buttons
-                    if not is_element_stale(event):
-                        download_buttons = event.find_elements(
-                            By.XPATH,
-                            ".//md-icon[contains(text(), 'cloud_download')]"
-                        )
-                        
-                        if download_buttons:
-                            for button in download_buttons:
-                                try:
-                                    if is_element_stale(button):
-                                        continue
-                                    
-                                    # Ensure button is visible and clickable
-                                    if not button.is_displayed() or not button.is_enabled():
-                                        continue
-                                    
-                                    # Click with JavaScript for better reliability
-                                    driver.execute_script("arguments[0].click();", button)
-                                    download_count += 1
-                                    logging.info(f"Successfully initiated download {download_count}")
-                                    time.sleep(DOWNLOAD_PAUSE)
-                                    
-                                except Exception as button_error:
-                                    logging.error(f"Error clicking download button: {button_error}")
-                                    continue
-                    
-                    processed_events.add(event_id)
-                    batch_processed += 1
-                    
-                except Exception as event_error:
-                    logging.error(f"Error processing event: {event_error}")
-                    batch_processed += 1
-                    continue
-            
-            # Update progress
-            if events_with_labels:
-                progress = (len(processed_events) / len(events_with_labels)) * 100
-                logging.info(f"Processing progress: {progress:.1f}% ({download_count} downloads)")
-            
-            # Move to next batch
-            batch_start += BATCH_SIZE
-            
-            # Memory optimization between batches
-            driver.execute_script("window.gc && window.gc();")
+        return None
+
+    if not result["complete"]:
+        logging.warning(f"Timeline still growing after {timeout}s, continuing with what is loaded")
+    logging.info(
+        f"Timeline loaded: {result['count']} events after {result['scrolls']} scrolls "
+        f"in {result['waitedMs'] / 1000:.1f}s"
+    )
+    return result["count"]
+
+def process_timeline_events(driver, attachments):
+    """Click the download icon of every indexed attachment that has no direct link.
+
+    Icons are looked up by the data-rpa-key the index tagged them with, so a
+    re-rendered event is simply found again. Returns the attachments whose
+    download was started, in click order.
+    """
+    logging.info(f"Starting timeline processing for {len(attachments)} attachments...")
+    DOWNLOAD_PAUSE = 2  # Seconds between downloads
+    clicked = []
+
+    for attachment in attachments:
+        try:
+            icon = driver.find_element(By.CSS_SELECTOR, f'md-icon[data-rpa-key="{attachment["key"]}"]')
+            driver.execute_script("arguments[0].scrollIntoView({block: 'center'}); arguments[0].click();", icon)
+            clicked.append(attachment)
+            logging.info(f"Successfully initiated download {len(clicked)}")
             time.sleep(DOWNLOAD_PAUSE)
-        
-        # Final wait to ensure downloads are initiated
-        time.sleep(DOWNLOAD_PAUSE * 2)
-        
-        logging.info(f"Timeline processing complete: {download_count} downloads initiated")
-        return download_count > 0
-        
-    except Exception as e:
-        logging.error(f"Timeline processing failed: {str(e)}")
-        return False
-
-def wait_for_downloads(download_path, timeout=900):
-    """Enhanced download monitoring with better stability"""
+        except Exception as e:
+            logging.error(f"Error clicking download button {attachment['key']}: {e}")
+
+    logging.info(f"Timeline processing complete: {len(clicked)} downloads initiated")
+    return clicked
+
+def checkpoint_clicked_downloads(checkpoint, clicked, watcher, download_dir):
+    """Record each clicked attachment whose file the watcher saw finish.
+
+    A file is matched by its name first; the rest are paired in click order, but
+    only when every click produced exactly one file, so a failed download is
+    never recorded as done.
+    """
+    finished = watcher.finished()
+    unmatched = []
+    for attachment in clicked:
+        download = next((d for d in finished if attachment["name"] and d.name == attachment["name"]), None)
+        if download:
+            finished.remove(download)
+            checkpoint.record(attachment, name=download.name, path=os.path.join(download_dir, download.name))
+        else:
+            unmatched.append(attachment)
+
+    if len(unmatched) != len(finished):
+        if unmatched:
+            logging.warning(f"Could not match {len(unmatched)} clicked downloads to files, they will be retried next run")
+        return
+    for attachment, download in zip(unmatched, finished):
+        checkpoint.record(attachment, name=download.name, path=os.path.join(download_dir, download.name))
+
+def wait_for_downloads(download_path, timeout=900, expected=None, watcher=None):
+    """Wait for the downloads going into download_path to finish.
+
+    Pass a watcher that was started before the downloads were triggered to
+    follow every file from the start; otherwise one is started now and picks
+    up whatever is still in progress.
+    """
     logging.info(f"Monitoring downloads in {download_path}")
-    
     try:
-        start_time = time.time()
-        check_interval = 1.0  # Initial check interval
-        max_interval = 5.0    # Maximum check interval
-        stable_count = 0      # Counter for stable state
-        last_count = 0        # Last known file count
-        required_stable_checks = 3  # Number of stable checks required
-        
-        while (time.time() - start_time) < timeout:
-            try:
-                # Get current download status
-                current_files = os.listdir(download_path)
-                downloading = [f for f in current_files if f.endswith(('.crdownload', '.tmp', '.partial'))]
-                completed = [f for f in current_files if not f.endswith(('.crdownload', '.tmp', '.partial'))]
-                
-                # Log current status
-                if downloading:
-                    logging.info(f"Still downloading: {len(downloading)} files, Completed: {len(completed)} files")
-                
-                # Check for stability
-                if len(completed) == last_count and not downloading:
-                    stable_count += 1
-                    # Increase check interval as stability increases
-                    check_interval = min(check_interval * 1.5, max_interval)
-                else:
-                    stable_count = 0
-                    check_interval = 1.0  # Reset interval
-                    last_count = len(completed)
-                
-                # Check if we've reached a stable state
-                if stable_count >= required_stable_checks:
-                    logging.info(f"Downloads complete. Total files: {len(completed)}")
-                    return True
-                
-                time.sleep(check_interval)
-                
-            except Exception as e:
-                logging.error(f"Error checking downloads: {e}")
-                time.sleep(1)
-        
-        logging.warning(f"Download timeout reached after {timeout} seconds")
-        return False
-        
+        watcher = watcher or DownloadWatcher(download_path, expected=expected).start()
+        try:
+            return watcher.wait(timeout)
+        finally:
+            watcher.stop()
     except Exception as e:
         logging.error(f"Download monitoring failed: {e}")
         return False
 
+def download_timeline_documents(driver, download_dir, checkpoint=None, login_url=None):
+    """Fetch the timeline attachments over HTTP, falling back to clicking the ones without a link.
+
+    Links the server answers with a login page or the wrong kind of content are
+    clicked as well, since the browser's own session can still fetch them.
+    """
+    attachments = build_timeline_index(driver)
+    if checkpoint:
+        attachments = checkpoint.pending(attachments)
+        if not attachments:
+            logging.info("All timeline documents were downloaded by a previous run")
+            return True
+
+    base = driver.current_url
+    linked = [dict(a, url=urljoin(base, a["url"])) for a in attachments if a["url"]]
+    unlinked = [a for a in attachments if not a["url"]]
+    success = True
+
+    if linked:
+        downloader = DocumentDownloader(session_from_driver(driver), download_dir, login_url=login_url)
+        results = downloader.download_all(linked, checkpoint)
+        rejected = {r["url"] for r in results if r.get("rejected")}
+        unlinked += [a for a in linked if a["url"] in rejected]
+        failed = [r for r in results if "error" in r and not r.get("rejected")]
+        if failed:
+            logging.warning(f"{len(failed)} document(s) could not be downloaded")
+            success = False
+
+    if unlinked:
+        logging.info(f"{len(unlinked)} attachments have no usable direct link, falling back to clicking downloads")
+        watcher = DownloadWatcher(download_dir).start()
+        clicked = process_timeline_events(driver, unlinked)
+        if not clicked:
+            watcher.stop()
+            return False
+        watcher.expected = len(clicked)
+        success = wait_for_downloads(download_dir, watcher=watcher) and success
+        if checkpoint:
+            checkpoint_clicked_downloads(checkpoint, clicked, watcher, download_dir)
+
+    return success
+
+# Every field uses the same ng-bind selector the per-element lookups used; a field whose
+# element is missing (or throws) comes back as null instead of failing the whole call
+DEAL_HEADER_SCRIPT = """
+function first(xpath, root) {
+    return document.evaluate(xpath, root || document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+function all(xpath, root) {
+    var result = document.evaluate(xpath, root || document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    var nodes = [];
+    for (var i = 0; i < result.snapshotLength; i++) { nodes.push(result.snapshotItem(i)); }
+    return nodes;
+}
+function text(xpath, root) {
+    try {
+        var el = first(xpath, root);
+        return el ? el.innerText.trim() : null;
+    } catch (e) { return null; }
+}
+
+var contacts = [];
+document.querySelectorAll('ticket-contacts').forEach(function (contact) {
+    contacts.push({
+        name: text(".//strong[@ng-bind='::client.getName()']", contact),
+        phone: text(".//span[@ng-bind='::client.getPhone()']", contact),
+        email: text(".//span[@ng-bind='::client.getEmail()']", contact)
+    });
+});
+
+var addresses = [];
+try {
+    all("//ticket-basic-info-value//span[@ng-repeat='security in Model.currentHomeLoan.securityDetails.securitySplits']").forEach(function (el) {
+        var value = el.innerText.trim();
+        if (value) { addresses.push(value); }
+    });
+} catch (e) {}
+
+return {
+    contacts: contacts,
+    lender: text("//span[@ng-bind=\\"::Model.currentLender.getName()\\"]"),
+    security_addresses: addresses,
+    deal_value: text("//ticket-basic-info-value[@ng-bind='Model.currentTicket.values.onceOff.formatWithCurrency(CurrentCurrency(), 0)']"),
+    total_loan_amount: text("//ticket-basic-info-value[@ng-bind='Model.preferredProductTotalLoanAmount.formatWithCurrency(CurrentCurrency())']"),
+    estimated_settlement_date: text("//span[@ng-bind='Model.currentTicket.getDueDate(CurrentTimeZone(), CurrentOrganizationDateTimeLocale())']"),
+    deal_owner: text("//span[@ng-bind=\\"getAccount(Model.currentTicket.idOwner).getName()\\"]")
+};
+"""
+
+def extract_deal_header(driver):
+    """Read the ticket contacts and deal header fields in one WebDriver round trip"""
+    header = driver.execute_script(DEAL_HEADER_SCRIPT)
+    logging.info(f"Extracted deal header: {len(header['contacts'])} contacts, lender={header['lender']}")
+    return header
+
 @app.route('/', methods=['GET'])
 def home():
     print('service is running')
     return "Service is running"
 
-@app.route('/process-url', methods=['POST'])
-def process_url():
-    global active_driver
-    data = request.json
-    login_url = data.get('loginUrl')
-    target_url = data.get('targetUrl')
-
-    if not login_url or not target_url:
-        return jsonify({"error": "Missing required parameters"}), 400
-
-    # Clean up any existing processes
-    cleanup_previous_process()
+def run_deal(payload, job):
+    """Job handler: log in, scrape the deal and hand the applicants to Supabase and the GUI"""
+    login_url = payload["loginUrl"]
+    target_url = payload["targetUrl"]
 
-    # Set up Chrome WebDriver
-    chrome_options = setup_chrome_options()
-    active_driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()),options=chrome_options)
-    wait = WebDriverWait(active_driver, 10000)
+    # Check a pre-launched Chrome WebDriver out of the pool for this deal only
+    deal = DealContext(job)
+    active_driver = deal.open()
     try:
-        # Step 1: Log in
-        active_driver.get(login_url)
-
-        # Wait for specific elements to load (example: <a> tag)
-        logging.info("Navigating to login page...")
-        WebDriverWait(active_driver, 10000).until(
-            EC.presence_of_element_located((By.TAG_NAME, "a"))
-        )
-
-        # Pause and allow the user to input credentials
-        logging.info("Login page loaded. Waiting for user authentication...")
-        time.sleep(30)
-
-        WebDriverWait(active_driver, 20).until(
-            EC.presence_of_element_located((By.TAG_NAME, "img"))
-        )
-        logging.info("Login successful")
-
-        # Step 2: Navigate to provided URL
-        active_driver.get(target_url)
+        # Step 1 + 2: Log in (reusing the stored session when possible) and open the deal
         logging.info("Navigating to target page...")
+        ensure_logged_in(active_driver, login_url, target_url, session_vault)
+        job.check_cancelled()
 
         # Wait for content to load
-        documents_button = wait.until(
-            EC.element_to_be_clickable((By.XPATH, "//button[span[text()='Documents']]"))
+        documents_button = wait_until(
+            active_driver,
+            EC.element_to_be_clickable((By.XPATH, "//button[span[text()='Documents']]")),
+            label="deal page"
         )
         documents_button.click()
         logging.info("Clicked Documents button")
 
-        # Wait for content to load
-        WebDriverWait(active_driver, 10).until(
-            EC.presence_of_element_located((By.TAG_NAME, "ticket-contacts"))
+        # Wait for the contacts to render and the Documents view to settle
+        wait_until(
+            active_driver,
+            EC.presence_of_element_located((By.TAG_NAME, "ticket-contacts")),
+            timeout=10,
+            label="Documents view"
         )
 
-        time.sleep(10)
+        job.check_cancelled()
+
+        # Wait for the deal header to load
+        wait_until(
+            active_driver,
+            EC.presence_of_element_located((By.TAG_NAME, "ticket-basic-info-value")),
+            timeout=20,
+            label="deal header"
+        )
+
+        # Contacts and header fields come back from the page in a single call
+        header = extract_deal_header(active_driver)
 
         applicants = []
         seen_names = set()
-        ticket_contacts = active_driver.find_elements(By.TAG_NAME, "ticket-contacts")
         folder_created = False
         applicant_folder = ""
 
-        for contact in ticket_contacts:
+        for contact in header["contacts"]:
             try:
                 # Extract name
-                name = contact.find_element(By.XPATH, ".//strong[@ng-bind='::client.getName()']").text
+                name = contact["name"]
                 name_parts = name.strip().split()
                 first_name = name_parts[0]  # First word
                 last_name = name_parts[-1]  # Last word
@@ -1445,40 +758,21 @@ def process_url():
 
                         # Check if the folder exists
                         if not os.path.exists(applicant_folder):
-                            os.makedirs(applicant_folder)
                             print(f"Folder created for the first applicant: {folder_name}")
                             logging.info(f"Folder created for the first applicant: {folder_name}")
                         else:
                             print(f"Using existing folder: {applicant_folder}")
                             logging.info(f"Using existing folder: {applicant_folder}")
                         # Update download directory dynamically for the first applicant
-                        active_driver.execute_cdp_cmd(
-                            "Page.setDownloadBehavior",
-                            {
-                                "behavior": "allow",
-                                "downloadPath": applicant_folder,
-                            },
-                        )
+                        deal.set_download_dir(applicant_folder)
 
                         folder_created = True
 
-                    # Attempt to extract phone number, fallback to None if not found
-                    try:
-                        phone = contact.find_element(By.XPATH, ".//span[@ng-bind='::client.getPhone()']").text
-                    except Exception:
-                        phone = None
-
-                    # Attempt to extract email, fallback to None if not found
-                    try:
-                        email = contact.find_element(By.XPATH, ".//span[@ng-bind='::client.getEmail()']").text
-                    except Exception:
-                        email = None
-
                     # Append extracted data to the applicants list
                     applicants.append({
                         "applicant_name": name,
-                        "contact_number": phone,
-                        "email": email
+                        "contact_number": contact["phone"],
+                        "email": contact["email"]
                     })
 
                     # Break the loop if required number of names are extracted
@@ -1489,106 +783,42 @@ def process_url():
                 print(f"Error processing contact: {str(e)}")
                 continue
 
-        # Wait for content to load
-        WebDriverWait(active_driver, 20).until(
-            EC.presence_of_element_located((By.TAG_NAME, "ticket-basic-info-value"))
-        )
+        lender = header["lender"]
 
-        time.sleep(5)
+        # Join addresses into a single string separated by commas (or any other delimiter)
+        loan_security_addresses = ", ".join(header["security_addresses"]) or None
 
-        lender = None
+        deal_value = header["deal_value"]
         try:
-            lender_element = active_driver.find_element(By.XPATH, "//span[@ng-bind=\"::Model.currentLender.getName()\"]")
-            lender = lender_element.get_attribute("innerText").strip()
-        except Exception as e:
-            lender = None
-
-        # Get loan security addresses
-        loan_security_addresses = None  # Initialize as None
-        try:
-            address_elements = active_driver.find_elements(By.XPATH, 
-                "//ticket-basic-info-value//span[@ng-repeat='security in Model.currentHomeLoan.securityDetails.securitySplits']")
-            addresses = []  # Temporary list to hold the addresses
-            for address_elem in address_elements:
-                address_text = address_elem.get_attribute("innerText").strip()
-                if address_text:
-                    addresses.append(address_text)
-            
-            # Join addresses into a single string separated by commas (or any other delimiter)
-            if addresses:
-                loan_security_addresses = ", ".join(addresses)
-        except Exception as e:
-            loan_security_addresses = None
-   
-        deal_value = None
-        try:
-            deal_value_element = active_driver.find_element(By.XPATH, 
-                "//ticket-basic-info-value[@ng-bind='Model.currentTicket.values.onceOff.formatWithCurrency(CurrentCurrency(), 0)']")
-            deal_value = deal_value_element.get_attribute("innerText").strip()
-
-            # Clean and convert the deal value to a float
+            # Remove the dollar sign and commas, then convert to float
             if deal_value:
-                # Remove the dollar sign and commas, then convert to float
                 deal_value = float(deal_value.replace("$", "").replace(",", ""))
         except Exception as e:
             deal_value = None
 
-        total_loan_amount = None
-        try:
-            total_loan_amount_element = active_driver.find_element(By.XPATH, 
-                "//ticket-basic-info-value[@ng-bind='Model.preferredProductTotalLoanAmount.formatWithCurrency(CurrentCurrency())']")
-            total_loan_amount = total_loan_amount_element.get_attribute("innerText").strip()
-        except Exception as e:
-            total_loan_amount = None
-
-        estimated_settlement_date = None
-        try:
-            settlement_element = active_driver.find_element(By.XPATH, 
-                "//span[@ng-bind='Model.currentTicket.getDueDate(CurrentTimeZone(), CurrentOrganizationDateTimeLocale())']")
-            estimated_settlement_date = settlement_element.get_attribute("innerText").strip()
-        except Exception as e:
-            estimated_settlement_date = None
+        total_loan_amount = header["total_loan_amount"]
+        estimated_settlement_date = header["estimated_settlement_date"]
+        deal_owner = header["deal_owner"]
 
-        deal_owner = None
-        try:
-            deal_owner_element = active_driver.find_element(By.XPATH, 
-                "//span[@ng-bind=\"getAccount(Model.currentTicket.idOwner).getName()\"]")
-            deal_owner = deal_owner_element.get_attribute("innerText").strip()
-        except Exception as e:
-            deal_owner = None
-        
         # try:
         #     logging.info("Starting document processing...")
             
-        #     # Find the scrollable container with retry mechanism
-        #     max_attempts = 3
-        #     scroll_container = None
-            
-        #     for attempt in range(max_attempts):
-        #         try:
-        #             scroll_container = wait.until(
-        #                 EC.presence_of_element_located((By.CSS_SELECTOR, "md-content[md-scroll-y]"))
-        #             )
-        #             break
-        #         except Exception as e:
-        #             if attempt == max_attempts - 1:
-        #                 raise Exception("Failed to find scrollable container")
-        #             time.sleep(2)
+        #     # Find the scrollable container
+        #     scroll_container = wait_until(
+        #         active_driver,
+        #         EC.presence_of_element_located((By.CSS_SELECTOR, "md-content[md-scroll-y]")),
+        #         timeout=20,
+        #         label="timeline"
+        #     )
             
-        #     # Perform scrolling with enhanced stability
-        #     if scroll_container:
-        #         if scroll_down_until_bottom(active_driver, scroll_container):
-        #             # Process timeline events if scrolling was successful
-        #             if not process_timeline_events(active_driver):
-        #                 raise Exception("Failed to process timeline events")
-                    
-        #             # Wait for downloads to complete
-        #             if not wait_for_downloads(DOWNLOAD_PATH):
-        #                 logging.warning("Some downloads may not have completed")
-        #         else:
-        #             raise Exception("Failed to scroll the page")
-        #     else:
-        #         raise Exception("Could not locate scrollable container")
+        #     # Load the whole timeline, then download its attachments into the applicant folder
+        #     if scroll_down_until_bottom(active_driver, scroll_container) is None:
+        #         raise Exception("Failed to scroll the page")
+        #     # Attachments fetched by an earlier run of this deal are skipped
+        #     download_dir = deal.download_dir or DOWNLOAD_PATH
+        #     checkpoint = TimelineCheckpoint(checkpoint_path(download_dir, target_url))
+        #     if not download_timeline_documents(active_driver, download_dir, checkpoint, login_url):
+        #         logging.warning("Some downloads may not have completed")
             
         # except Exception as e:
         #     logging.error(f"Document processing failed: {str(e)}")
@@ -1605,7 +835,7 @@ def process_url():
         #         EC.presence_of_element_located((By.CLASS_NAME, "group-items"))
         #     )
 
-        #     extract_fact_find(active_driver)
+        #     extract_fact_find(active_driver, driver_pool.service_path())
               
         # except TimeoutException as e:
         #     logging.error("Broker tools not found or failed to load. Proceeding to post data.")
@@ -1657,15 +887,180 @@ def process_url():
             
             lender_details.append(lender_data)
 
-        process_applicants(applicant_details, lender_details, supabase)
+        job.check_cancelled()
+
+        # The browser is no longer needed once the page has been scraped
+        deal.close()
+        result = process_applicants(applicant_details, lender_details, supabase, deal_key(target_url))
         # process_applicants(applicant_details, lender_details, applicant_api_url, lender_api_url, headers)
 
-        return jsonify({"message": "URL processed successfully!"}), 200
+        if result["status"] == "error":
+            raise Exception(result["message"])
+        return result
 
     except Exception as e:
-        print(f"Error occurred: {str(e)}")
-        cleanup_previous_process()
-        return jsonify({"message": "URL processed unsuccessfully!"}), 500
+        logging.error(f"Error occurred: {str(e)}")
+        raise
+
+    finally:
+        deal.close()
+
+# Deals are processed by background workers, one browser per worker
+job_queue = JobQueue(run_deal, workers=DEAL_CONCURRENCY)
+workers_started = False
+workers_lock = threading.Lock()
+
+def start_workers():
+    """Warm the driver pool and lender directory and start the job workers, once per process"""
+    global workers_started
+    with workers_lock:
+        if workers_started:
+            return
+        workers_started = True
+    driver_pool.start()
+    lender_directory.start()
+    job_queue.start()
+
+@app.before_request
+def ensure_workers():
+    # Covers servers that import the app (WSGI) instead of running __main__
+    start_workers()
+
+# Salestrekker ticket ids are UUIDs (older links use long numeric ids)
+TICKET_ID_PATTERN = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|\d{6,}", re.IGNORECASE)
+
+def deal_key(target_url):
+    """Identify a deal by its ticket id, or by the normalized URL when there is none"""
+    parts = urlsplit(target_url.strip())
+    # Hash-routed links keep the route in the fragment
+    route = f"{parts.path.rstrip('/')}#{parts.fragment.rstrip('/')}" if parts.fragment else parts.path.rstrip('/')
+    ids = TICKET_ID_PATTERN.findall(route)
+    if ids:
+        return f"ticket:{ids[-1].lower()}"
+    return f"url:{parts.netloc.lower()}{route}"
+
+@app.route('/process-url', methods=['POST'])
+def process_url():
+    data = request.json
+    login_url = data.get('loginUrl')
+    target_url = data.get('targetUrl')
+
+    if not login_url or not target_url:
+        return jsonify({"error": "Missing required parameters"}), 400
+
+    # Only the URLs are persisted; credentials never go into the queue database.
+    # A repeat click on the same deal returns the job that is already handling it.
+    try:
+        job = job_queue.submit(
+            {"loginUrl": login_url, "targetUrl": target_url},
+            dedupe_key=deal_key(target_url),
+            force=bool(data.get('force'))
+        )
+    except QueueFull as e:
+        logging.warning(f"Rejected deal, queue is full: {e}")
+        return jsonify({"message": "Too many deals waiting, please try again later"}), 503
+
+    status_url = f"/jobs/{job['id']}"
+    if job.get("deduplicated"):
+        body = {
+            "message": "Deal is already being processed" if job["status"] not in FINISHED_STATUSES
+                       else "Deal was processed recently",
+            "job_id": job["id"],
+            "status": job["status"],
+            "status_url": status_url,
+            "deduplicated": True
+        }
+        if job["status"] in FINISHED_STATUSES:
+            body["result"] = job["result"]
+            return jsonify(body), 200, {"Location": status_url}
+        return jsonify(body), 202, {"Location": status_url}
+
+    return jsonify({
+        "message": "Deal queued for processing",
+        "job_id": job["id"],
+        "status": job["status"],
+        "status_url": status_url
+    }), 202, {"Location": status_url}
+
+@app.route('/process-urls', methods=['POST'])
+def process_urls():
+    """Queue a batch of deals; up to DEAL_CONCURRENCY of them run at the same time"""
+    data = request.json
+    login_url = data.get('loginUrl')
+    target_urls = data.get('targetUrls') or []
+
+    if not login_url or not target_urls:
+        return jsonify({"error": "Missing required parameters"}), 400
+
+    jobs = []
+    for target_url in target_urls:
+        try:
+            job = job_queue.submit(
+                {"loginUrl": login_url, "targetUrl": target_url},
+                dedupe_key=deal_key(target_url),
+                force=bool(data.get('force'))
+            )
+        except QueueFull as e:
+            logging.warning(f"Rejected deal, queue is full: {e}")
+            jobs.append({"targetUrl": target_url, "error": "Queue is full"})
+            continue
+        jobs.append({
+            "targetUrl": target_url,
+            "job_id": job["id"],
+            "status": job["status"],
+            "status_url": f"/jobs/{job['id']}",
+            "deduplicated": bool(job.get("deduplicated"))
+        })
+
+    return jsonify({
+        "message": f"{sum(1 for j in jobs if 'job_id' in j and not j['deduplicated'])} deal(s) queued for processing",
+        "jobs": jobs
+    }), 202
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    job.pop("result", None)
+    return jsonify(job), 200
+
+@app.route('/jobs/<job_id>/cancel', methods=['POST'])
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    job = job_queue.cancel(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    job.pop("result", None)
+    return jsonify(job), 202 if job["status"] == STATUS_RUNNING else 200
+
+@app.route('/lenders/stats', methods=['GET'])
+def lender_stats():
+    return jsonify(lender_directory.stats()), 200
+
+@app.route('/lenders/refresh', methods=['POST'])
+def refresh_lenders():
+    if not lender_directory.refresh():
+        return jsonify({"error": "Failed to reload lenders"}), 502
+    return jsonify(lender_directory.stats()), 200
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    if job["status"] not in FINISHED_STATUSES:
+        return jsonify({"id": job["id"], "status": job["status"]}), 202
+    return jsonify({
+        "id": job["id"],
+        "status": job["status"],
+        "result": job["result"],
+        "error": job["error"]
+    }), 200
             
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=2500, debug=True)
\ No newline at end of file
+    debug = os.getenv("FLASK_DEBUG", "1") == "1"
+    # The debug reloader's parent process never serves requests, so only its child starts workers
+    if not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_workers()
+    app.run(host="0.0.0.0", port=2500, debug=debug)
\ No newline at end of file
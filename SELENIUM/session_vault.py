@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import logging
+import threading
+from urllib.parse import urlparse
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:  # Vault is disabled without cryptography; login stays interactive
+    Fernet = None
+    InvalidToken = Exception
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+SESSION_VAULT_PATH = os.getenv("SESSION_VAULT_PATH", os.path.join(script_dir, "session.vault"))
+# Generate once with: python -c "from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())"
+SESSION_VAULT_KEY = os.getenv("SESSION_VAULT_KEY")
+SESSION_PROBE_TIMEOUT = int(os.getenv("SESSION_PROBE_TIMEOUT", "15"))
+INTERACTIVE_LOGIN_TIMEOUT = int(os.getenv("INTERACTIVE_LOGIN_TIMEOUT", "300"))
+
+# CDP cookie fields accepted by Network.setCookies
+COOKIE_FIELDS = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires")
+
+
+def origin_of(url):
+    parts = urlparse(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def is_logged_in(driver):
+    """Salestrekker shows the app shell (with images) once authenticated, and /authenticate otherwise"""
+    return "/authenticate" not in driver.current_url and bool(driver.find_elements(By.TAG_NAME, "img"))
+
+
+class SessionVault:
+    """Encrypted on-disk store for the Salestrekker cookies and localStorage"""
+    def __init__(self, path=SESSION_VAULT_PATH, key=SESSION_VAULT_KEY):
+        self.path = path
+        self._fernet = Fernet(key.encode()) if (Fernet and key) else None
+        self._lock = threading.Lock()
+        self._cached = None
+        if not self._fernet:
+            logging.warning("Session vault disabled (set SESSION_VAULT_KEY and install cryptography to enable it)")
+
+    @property
+    def enabled(self):
+        return self._fernet is not None
+
+    def load(self):
+        """Return the stored session dict, or None if there is none or it cannot be decrypted"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            if self._cached:
+                return self._cached
+            if not os.path.exists(self.path):
+                return None
+            try:
+                with open(self.path, "rb") as f:
+                    self._cached = json.loads(self._fernet.decrypt(f.read()))
+            except (InvalidToken, ValueError) as e:
+                logging.warning(f"Ignoring unreadable session vault: {e}")
+                return None
+            return self._cached
+
+    def capture(self, driver):
+        """Store the cookies and localStorage of the driver's current (logged in) origin"""
+        if not self.enabled:
+            return
+        origin = origin_of(driver.current_url)
+        cookies = driver.execute_cdp_cmd("Network.getCookies", {"urls": [origin]}).get("cookies", [])
+        local_storage = driver.execute_script(
+            "var d = {}; for (var i = 0; i < localStorage.length; i++) {"
+            " var k = localStorage.key(i); d[k] = localStorage.getItem(k); } return d;"
+        )
+        session = {
+            "origin": origin,
+            "captured_at": time.time(),
+            "cookies": [{k: c[k] for k in COOKIE_FIELDS if k in c} for c in cookies],
+            "local_storage": local_storage or {},
+        }
+
+        with self._lock:
+            # Write to a temp file first so a crash never leaves a half-written vault
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(self._fernet.encrypt(json.dumps(session).encode()))
+            os.replace(tmp_path, self.path)
+            self._cached = session
+        logging.info(f"Session vault: saved {len(session['cookies'])} cookies for {origin}")
+
+    def inject(self, driver, session):
+        """Seed a driver with a stored session before its first navigation to the origin"""
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": session["cookies"]})
+
+        # localStorage can only be written from the origin itself, so install a one-shot
+        # script that runs before the app's own scripts on the next page load
+        script = (
+            "if (location.origin === %s) { var d = %s; for (var k in d) { localStorage.setItem(k, d[k]); } }"
+            % (json.dumps(session["origin"]), json.dumps(session["local_storage"]))
+        )
+        return driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": script})["identifier"]
+
+    def invalidate(self):
+        with self._lock:
+            self._cached = None
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+def wait_for_login_state(driver, timeout):
+    """Wait until the page is either clearly logged in or clearly on the login screen"""
+    try:
+        WebDriverWait(driver, timeout).until(
+            lambda d: is_logged_in(d) or "/authenticate" in d.current_url
+        )
+    except TimeoutException:
+        return False
+    return is_logged_in(driver)
+
+
+def ensure_logged_in(driver, login_url, probe_url, vault):
+    """Reuse the stored session if it is still valid, otherwise wait for a human to log in.
+
+    The probe is simply the first page the job needs (probe_url), so a valid
+    session costs no extra navigation. Returns True when the driver ends up on
+    probe_url and logged in.
+    """
+    session = vault.load()
+    if session and origin_of(probe_url) == session["origin"]:
+        script_id = vault.inject(driver, session)
+        driver.get(probe_url)
+        driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": script_id})
+        if wait_for_login_state(driver, SESSION_PROBE_TIMEOUT):
+            logging.info("Reused stored session, skipping interactive login")
+            return True
+        logging.info("Stored session has expired, falling back to interactive login")
+        vault.invalidate()
+
+    # Interactive login: carry on as soon as the user has signed in
+    driver.get(login_url)
+    WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.TAG_NAME, "a")))
+    logging.info("Login page loaded. Waiting for user authentication...")
+    WebDriverWait(driver, INTERACTIVE_LOGIN_TIMEOUT, poll_frequency=1).until(is_logged_in)
+    logging.info("Login successful")
+    vault.capture(driver)
+
+    driver.get(probe_url)
+    return True
@@ -0,0 +1,40 @@
+-- Creates the applicants, the application and the Application_Applicants links of one
+-- deal in a single transaction. Called from process_applicants in rpa.py through
+-- supabase.rpc(); run this once in the Supabase SQL editor to install it.
+--
+--   applicants:  [{"title": ..., "first_name": ..., "middle_name": ..., "last_name": ...}, ...]
+--   application: {"status": "New"}
+--
+-- Returns {"application_id": ..., "applicants": [<inserted Applicant_Hub rows>]}
+
+create or replace function public.create_application_with_applicants(
+    applicants jsonb,
+    application jsonb default '{}'::jsonb
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    new_application_id "Application_Hub".id%type;
+    inserted jsonb;
+begin
+    insert into "Application_Hub" (status)
+    values (coalesce(application->>'status', 'New'))
+    returning id into new_application_id;
+
+    with new_applicants as (
+        insert into "Applicant_Hub" (title, first_name, middle_name, last_name)
+        select title, first_name, middle_name, last_name
+        from jsonb_populate_recordset(null::"Applicant_Hub", applicants)
+        returning *
+    ), links as (
+        insert into "Application_Applicants" (application_id, applicant_id)
+        select new_application_id, id from new_applicants
+    )
+    select coalesce(jsonb_agg(to_jsonb(new_applicants)), '[]'::jsonb)
+    into inserted
+    from new_applicants;
+
+    return jsonb_build_object('application_id', new_application_id, 'applicants', inserted);
+end;
+$$;
@@ -0,0 +1,193 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+
+# Walks the loaded timeline once and returns every attachment behind a cloud_download
+# icon on a labelled event. Each event and icon is tagged with a compact stable id
+# (data-rpa-event / data-rpa-key) so Python can find it again with a CSS selector
+# instead of holding on to WebElements that go stale.
+TIMELINE_INDEX_SCRIPT = """
+var URL_KEYS = ['downloadUrl', 'url', 'link', 'href', 'signedUrl', 'fileUrl'];
+var NAME_KEYS = ['fileName', 'filename', 'originalName', 'name', 'title'];
+
+function pick(obj, keys) {
+    for (var i = 0; i < keys.length; i++) {
+        var v = obj[keys[i]];
+        if (typeof v === 'string' && v) { return v; }
+    }
+    return null;
+}
+
+// FNV-1a, so events without an id still get a short key that survives a reload
+function hash(str) {
+    var h = 0x811c9dc5;
+    for (var i = 0; i < str.length; i++) {
+        h ^= str.charCodeAt(i);
+        h = (h + ((h << 1) + (h << 4) + (h << 7) + (h << 8) + (h << 24))) >>> 0;
+    }
+    return ('0000000' + h.toString(16)).slice(-8);
+}
+
+function scopeObjects(el) {
+    if (!window.angular) { return []; }
+    var objects = [], scope = angular.element(el).scope();
+    while (scope) {
+        for (var key in scope) {
+            if (key.charAt(0) === '$' || key === 'this') { continue; }
+            var value = scope[key];
+            if (value && typeof value === 'object' && objects.indexOf(value) === -1) { objects.push(value); }
+        }
+        scope = scope.$parent;
+    }
+    return objects;
+}
+
+function fromScope(el) {
+    var objects = scopeObjects(el);
+    for (var i = 0; i < objects.length; i++) {
+        var url = pick(objects[i], URL_KEYS);
+        if (url) { return {url: url, name: pick(objects[i], NAME_KEYS)}; }
+    }
+    return null;
+}
+
+// The item of the innermost ng-repeat around el, but only when that repeat sits
+// inside container: an id taken from a parent scope would belong to the deal
+var REPEAT = /^\\s*(?:\\(\\s*[\\w$]+\\s*,\\s*([\\w$]+)\\s*\\)|([\\w$]+))\\s+in\\s/;
+function repeatId(el, container) {
+    if (!window.angular) { return null; }
+    var node = el.closest('[ng-repeat]');
+    if (!node || (container && (node === container || !container.contains(node)))) { return null; }
+    var m = REPEAT.exec(node.getAttribute('ng-repeat'));
+    var scope = m && angular.element(node).scope();
+    var item = scope && scope[m[1] || m[2]];
+    return item && item.id ? String(item.id) : null;
+}
+
+// Attributes that do not change between renders (no classes, styles or our own tags)
+function stableAttributes(el) {
+    var parts = [];
+    Array.prototype.forEach.call(el.attributes, function (a) {
+        if (a.name === 'class' || a.name === 'style' || a.name.indexOf('data-rpa-') === 0) { return; }
+        parts.push(a.name + '=' + a.value);
+    });
+    return parts.sort().join('|');
+}
+
+// seen counts every use of a key, so after the walk a count above 1 marks a key
+// that only the -N suffix (the order on the page) tells apart
+function unique(key) {
+    if (seen[key]) { return key + '-' + (++seen[key]); }
+    seen[key] = 1;
+    return key;
+}
+
+var seen = {}, attachments = [];
+document.querySelectorAll('timeline-event').forEach(function (event) {
+    var hasLabels = Array.prototype.some.call(event.querySelectorAll('span'), function (s) {
+        return s.textContent.indexOf('Labels') !== -1;
+    });
+    if (!hasLabels) { return; }
+
+    var icons = [];
+    event.querySelectorAll('md-icon').forEach(function (icon) {
+        if (icon.textContent.indexOf('cloud_download') === -1) { return; }
+        var found = null, link = icon.closest('a[href]');
+        if (link) {
+            found = {url: link.href, name: link.getAttribute('download') || link.textContent.trim() || null};
+        } else {
+            try { found = fromScope(icon); } catch (e) { found = null; }
+        }
+        found = found || {url: null, name: null};
+        try { found.id = repeatId(icon, event); } catch (e) { found.id = null; }
+        icons.push({icon: icon, found: found});
+    });
+
+    // The event text holds relative timestamps ("2 hours ago"), so the fallback
+    // hashes the attributes and attachment names instead
+    var eventId = event.getAttribute('data-id');
+    if (!eventId) { try { eventId = repeatId(event); } catch (e) { eventId = null; } }
+    var eventBase = eventId || hash(stableAttributes(event) + '#' + icons.map(function (i) {
+        return i.found.url || i.found.name || '';
+    }).join('#'));
+    eventId = unique(eventBase);
+    event.setAttribute('data-rpa-event', eventId);
+
+    icons.forEach(function (entry, n) {
+        var base = entry.found.id || eventId + ':' + n;
+        var key = unique(base);
+        entry.icon.setAttribute('data-rpa-key', key);
+        attachments.push({key: key, event: eventId, url: entry.found.url, name: entry.found.name,
+                          base: base, eventBase: entry.found.id ? null : eventBase});
+    });
+});
+
+// A key that depends on page order can point at another document after new events
+// are added, so it is never used to skip a download
+attachments.forEach(function (a) {
+    a.stable = seen[a.base] === 1 && (!a.eventBase || seen[a.eventBase] === 1);
+    delete a.base;
+    delete a.eventBase;
+});
+return attachments;
+"""
+
+
+def build_timeline_index(driver):
+    """Return [{key, event, url, name, stable}] for every attachment on the loaded timeline"""
+    attachments = driver.execute_script(TIMELINE_INDEX_SCRIPT) or []
+    logging.info(
+        f"Indexed {len(attachments)} attachments "
+        f"({sum(1 for a in attachments if a['url'])} with direct links)"
+    )
+    return attachments
+
+
+def checkpoint_path(download_dir, target_url):
+    """One checkpoint file per deal, next to the deal's documents"""
+    deal_key = hashlib.sha1(target_url.encode()).hexdigest()[:12]
+    return os.path.join(download_dir, f".timeline-{deal_key}.json")
+
+
+class TimelineCheckpoint:
+    """Remembers which attachments of a deal have already been downloaded"""
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._done = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._done = json.load(f).get("done", {})
+                logging.info(f"Resuming timeline: {len(self._done)} attachments already downloaded")
+            except (OSError, ValueError) as e:
+                logging.warning(f"Ignoring unreadable timeline checkpoint {path}: {e}")
+
+    def is_done(self, key):
+        with self._lock:
+            entry = self._done.get(key)
+        # Only a file that is still on disk counts; anything else is downloaded again
+        return bool(entry) and bool(entry.get("path")) and os.path.exists(entry["path"])
+
+    def pending(self, attachments):
+        return [a for a in attachments if not a.get("stable", True) or not self.is_done(a["key"])]
+
+    def record(self, attachment, **info):
+        """mark_done for an indexed attachment, skipping keys that are not stable across runs"""
+        if attachment.get("stable", True):
+            self.mark_done(attachment["key"], **info)
+
+    def mark_done(self, key, **info):
+        with self._lock:
+            self._done[key] = dict(info, at=time.time())
+            self._save()
+
+    def _save(self):
+        # Write to a temp file first so a crash never leaves a half-written checkpoint
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"done": self._done}, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,111 @@
+import os
+import mmap
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+UPLOAD_LEDGER_PATH = os.getenv("UPLOAD_LEDGER_PATH", os.path.join(script_dir, "uploads.db"))
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def sha256_file(path):
+    """SHA-256 of a file without reading it into memory (memory-mapped when possible)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for offset in range(0, len(mapped), HASH_CHUNK_SIZE):
+                    digest.update(mapped[offset:offset + HASH_CHUNK_SIZE])
+        except ValueError:
+            # Empty files cannot be mapped
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+class UploadLedger:
+    """SQLite record of which document contents were already sent for which applicant.
+
+    Keyed by content hash, so a renamed copy of an uploaded file is still
+    recognised, and by a caller-chosen applicant key that must stay the same
+    across runs. File hashes are cached by path, size and mtime so unchanged
+    files are only hashed once.
+    """
+    def __init__(self, db_path=UPLOAD_LEDGER_PATH):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._lock:
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS uploads (
+                    sha256 TEXT NOT NULL,
+                    applicant_id TEXT NOT NULL,
+                    file_name TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    application_id TEXT,
+                    uploaded_at REAL NOT NULL,
+                    PRIMARY KEY (sha256, applicant_id)
+                )
+            """)
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS file_hashes (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    sha256 TEXT NOT NULL
+                )
+            """)
+            self._db.commit()
+
+    def hash_of(self, path):
+        """Content hash of path, reusing the cached value while the file is unchanged"""
+        stat = os.stat(path)
+        path = os.path.abspath(path)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT sha256 FROM file_hashes WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (path, stat.st_size, stat.st_mtime_ns)
+            ).fetchone()
+        if row:
+            return row["sha256"]
+
+        sha256 = sha256_file(path)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO file_hashes (path, size, mtime_ns, sha256) VALUES (?, ?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime_ns, sha256)
+            )
+            self._db.commit()
+        return sha256
+
+    def find(self, sha256, applicant_id):
+        """The earlier upload of this content for this applicant, or None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT * FROM uploads WHERE sha256 = ? AND applicant_id = ?",
+                (sha256, str(applicant_id))
+            ).fetchone()
+        return dict(row) if row else None
+
+    def is_uploaded(self, path, applicant_id):
+        try:
+            return self.find(self.hash_of(path), applicant_id) is not None
+        except OSError as e:
+            logging.warning(f"Upload ledger: cannot hash {path}: {e}")
+            return False
+
+    def record(self, sha256, applicant_id, file_name, size, application_id=None):
+        with self._lock:
+            self._db.execute(
+                """
+                INSERT OR REPLACE INTO uploads (sha256, applicant_id, file_name, size, application_id, uploaded_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (sha256, str(applicant_id), file_name, size,
+                 str(application_id) if application_id is not None else None, time.time())
+            )
+            self._db.commit()
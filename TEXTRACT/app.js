@@ -4,6 +4,7 @@ const AWS = require("aws-sdk");
 const axios = require("axios");
 const fs = require("fs");
 const path = require("path");
+const crypto = require("crypto");
 const puppeteer = require("puppeteer");
 const mammoth = require("mammoth");
 const xlsx = require("xlsx");
@@ -913,6 +914,39 @@ const processNextDocument = async () => {
   }
 };
 
+// Add uploaded files to the processing queue and start processing if idle
+const queueFiles = (files, applicants) => {
+  for (const file of files) {
+    processingQueue.push({
+      file,
+      applicants,
+    });
+    console.log(`Added ${file.originalname} to processing queue`);
+  }
+
+  // Print queue status after adding files
+  printQueueStatus();
+
+  // Start processing the first document immediately if not already processing
+  if (!isProcessing && !n8nProcessing) {
+    processNextDocument();
+  } else {
+    console.log(
+      "A document is already processing. New files have been queued."
+    );
+  }
+
+  // Respond immediately that files have been queued
+  return {
+    message: "All files have been queued for processing.",
+    queueStatus: {
+      totalFiles: files.length,
+      processing: isProcessing,
+      remainingInQueue: processingQueue.length,
+    },
+  };
+};
+
 // Upload endpoint - modified to handle sequential processing
 app.post("/upload", upload.array("files", 10), async (req, res) => {
   if (!req.files || req.files.length === 0) {
@@ -936,36 +970,158 @@ app.post("/upload", upload.array("files", 10), async (req, res) => {
   }
 
   try {
-    // Add files to the processing queue
-    for (const file of req.files) {
-      processingQueue.push({
-        file,
-        applicants,
-      });
-      console.log(`Added ${file.originalname} to processing queue`);
+    res.status(200).send(queueFiles(req.files, applicants));
+  } catch (error) {
+    console.error("Error queueing files:", error);
+    res.status(500).send("Error queueing files for processing.");
+  }
+});
+
+// ===== Resumable chunked uploads =====
+// POST /uploads                 -> start (or resume) an upload, returns its id and current offset
+// GET  /uploads/:id             -> current offset, to resume after an interruption
+// PUT  /uploads/:id             -> append one chunk at the offset given in the Upload-Offset header
+// POST /uploads/:id/commit      -> verify size + SHA-256 and queue the file like /upload does
+const chunkDir = path.join(__dirname, "uploads", "partial");
+const MAX_CHUNK_SIZE = "16mb";
+// Uploads nobody has touched for this long are abandoned and swept from disk
+const UPLOAD_TTL_MS = parseInt(process.env.UPLOAD_TTL_HOURS || "24", 10) * 60 * 60 * 1000;
+const UPLOAD_SWEEP_INTERVAL_MS = 60 * 60 * 1000;
+
+const chunkPaths = (uploadId) => ({
+  data: path.join(chunkDir, `${uploadId}.part`),
+  meta: path.join(chunkDir, `${uploadId}.json`),
+});
+
+const currentOffset = (uploadId) => {
+  const { data } = chunkPaths(uploadId);
+  return fs.existsSync(data) ? fs.statSync(data).size : 0;
+};
+
+const readUploadMeta = (uploadId) => {
+  // Upload ids are hex digests; anything else could escape the partial directory
+  if (!/^[a-f0-9]{16,64}$/.test(uploadId)) return null;
+  const { meta } = chunkPaths(uploadId);
+  return fs.existsSync(meta) ? JSON.parse(fs.readFileSync(meta, "utf8")) : null;
+};
+
+// Last activity is the newest mtime of the metadata (touched on resume) and the data
+// (grows with every chunk), so an upload still in progress is never removed
+const sweepUploads = () => {
+  let entries;
+  try {
+    entries = fs.readdirSync(chunkDir);
+  } catch (error) {
+    return; // Nothing uploaded yet
+  }
+  const cutoff = Date.now() - UPLOAD_TTL_MS;
+  const ids = new Set(entries.map((name) => name.replace(/\.(part|json)$/, "")));
+  ids.forEach((uploadId) => {
+    const paths = chunkPaths(uploadId);
+    const mtimes = [paths.meta, paths.data]
+      .filter((p) => fs.existsSync(p))
+      .map((p) => fs.statSync(p).mtimeMs);
+    if (mtimes.length && Math.max(...mtimes) < cutoff) {
+      [paths.meta, paths.data].forEach((p) => fs.existsSync(p) && fs.unlinkSync(p));
+      console.log(`🧹 Removed abandoned upload ${uploadId}`);
     }
+  });
+};
+setInterval(() => {
+  try {
+    sweepUploads();
+  } catch (error) {
+    console.error("Error sweeping abandoned uploads:", error);
+  }
+}, UPLOAD_SWEEP_INTERVAL_MS).unref();
+
+app.post("/uploads", express.json(), (req, res) => {
+  // Same applicant forms as /upload: one "applicant", or an "applicants" map ({ Applicant1: ..., ... })
+  const { file_name, size, sha256, mime_type, applicant } = req.body || {};
+  const applicants = req.body && req.body.applicants ? req.body.applicants : applicant ? { Applicant1: applicant } : {};
+  if (!file_name || !Number.isInteger(size) || !/^[a-f0-9]{64}$/.test(sha256 || "")) {
+    return res.status(400).send({ message: "file_name, size and sha256 are required." });
+  }
 
-    // Print queue status after adding files
-    printQueueStatus();
+  // The same file for the same applicant always maps to the same upload, so a
+  // client that restarts picks up where it left off
+  const uploadId = crypto
+    .createHash("sha256")
+    .update(`${sha256}:${applicant ? applicant.applicant_id : JSON.stringify(applicants)}`)
+    .digest("hex")
+    .slice(0, 32);
+
+  fs.mkdirSync(chunkDir, { recursive: true });
+  const { meta } = chunkPaths(uploadId);
+  if (!fs.existsSync(meta)) {
+    fs.writeFileSync(
+      meta,
+      JSON.stringify({ file_name, size, sha256, mime_type, applicants, created_at: Date.now() })
+    );
+  } else {
+    // Resuming counts as activity for the sweep
+    const now = new Date();
+    fs.utimesSync(meta, now, now);
+  }
 
-    // Start processing the first document immediately if not already processing
-    if (!isProcessing && !n8nProcessing) {
-      processNextDocument();
-    } else {
-      console.log(
-        "A document is already processing. New files have been queued."
-      );
+  const offset = currentOffset(uploadId);
+  console.log(`📦 Upload ${uploadId} for ${file_name} at ${offset}/${size} bytes`);
+  res.status(200).send({ upload_id: uploadId, offset, size });
+});
+
+app.get("/uploads/:id", (req, res) => {
+  const meta = readUploadMeta(req.params.id);
+  if (!meta) return res.status(404).send({ message: "Unknown upload." });
+  res.status(200).send({ upload_id: req.params.id, offset: currentOffset(req.params.id), size: meta.size });
+});
+
+app.put(
+  "/uploads/:id",
+  express.raw({ type: "application/octet-stream", limit: MAX_CHUNK_SIZE }),
+  (req, res) => {
+    const meta = readUploadMeta(req.params.id);
+    if (!meta) return res.status(404).send({ message: "Unknown upload." });
+
+    const offset = currentOffset(req.params.id);
+    const clientOffset = parseInt(req.get("Upload-Offset"), 10);
+    if (clientOffset !== offset) {
+      // Client and server disagree (e.g. a chunk whose response was lost): tell it where to resume
+      return res.status(409).send({ message: "Offset mismatch.", offset });
+    }
+    if (!Buffer.isBuffer(req.body) || offset + req.body.length > meta.size) {
+      return res.status(400).send({ message: "Invalid chunk.", offset });
     }
 
-    // Respond immediately that files have been queued
-    res.status(200).send({
-      message: "All files have been queued for processing.",
-      queueStatus: {
-        totalFiles: req.files.length,
-        processing: isProcessing,
-        remainingInQueue: processingQueue.length,
-      },
-    });
+    fs.appendFileSync(chunkPaths(req.params.id).data, req.body);
+    res.status(200).send({ offset: offset + req.body.length, size: meta.size });
+  }
+);
+
+app.post("/uploads/:id/commit", (req, res) => {
+  const meta = readUploadMeta(req.params.id);
+  if (!meta) return res.status(404).send({ message: "Unknown upload." });
+
+  const paths = chunkPaths(req.params.id);
+  const offset = currentOffset(req.params.id);
+  if (offset !== meta.size) {
+    return res.status(409).send({ message: "Upload is incomplete.", offset });
+  }
+
+  const buffer = fs.readFileSync(paths.data);
+  const digest = crypto.createHash("sha256").update(buffer).digest("hex");
+  if (digest !== meta.sha256) {
+    // Corrupt upload: start again from zero
+    fs.unlinkSync(paths.data);
+    return res.status(422).send({ message: "Checksum mismatch.", offset: 0 });
+  }
+
+  try {
+    const file = { originalname: meta.file_name, mimetype: meta.mime_type, buffer, size: buffer.length };
+    // Sessions written before applicants were stored keep their single applicant
+    const result = queueFiles([file], meta.applicants || { Applicant1: meta.applicant });
+    fs.unlinkSync(paths.data);
+    fs.unlinkSync(paths.meta);
+    res.status(200).send(result);
   } catch (error) {
     console.error("Error queueing files:", error);
     res.status(500).send("Error queueing files for processing.");